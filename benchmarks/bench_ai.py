@@ -0,0 +1,50 @@
+"""
+Benchmarks for the dungeon master and AI players
+"""
+
+import random
+
+from engine import GameEngine
+from dungeon_master import AIDungeonMaster
+from ai_player import AIPlayer, AIvsAI
+
+
+def bench_describe_scene():
+    """Describe a scene with dynamic context"""
+    engine = GameEngine(player_name="Bench")
+    engine.initialize_world()
+    dm = AIDungeonMaster(rng=random.Random(0))
+    context = {"player_health": 20, "time_of_day": "night", "weather": "rain"}
+
+    def run():
+        dm.describe_scene(engine.current_scene, context)
+    return run
+
+
+def bench_choose_action():
+    """Pick an action in a scene with a hostile NPC"""
+    engine = GameEngine(player_name="Bench")
+    engine.initialize_world()
+    engine.process_action("1")
+    player = AIPlayer(playstyle="balanced", rng=random.Random(0))
+
+    def run():
+        player.choose_action(engine.current_scene, engine)
+        player.decision_history.clear()
+    return run
+
+
+def bench_run_match():
+    """Play a full AI vs AI match"""
+    random.seed(0)
+    tournament = AIvsAI()
+    player1, player2 = tournament.create_tournament([
+        {"name": "A", "playstyle": "aggressive"},
+        {"name": "B", "playstyle": "explorer"}
+    ])
+
+    def run():
+        tournament.run_match(player1, player2)
+        player1.decision_history.clear()
+        player2.decision_history.clear()
+    return run
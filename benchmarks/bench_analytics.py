@@ -0,0 +1,30 @@
+"""
+Benchmarks for the offline analytics pipeline
+"""
+
+import os
+import random
+import tempfile
+
+from ai_player import AIPlayer
+from analytics import analyze
+from engine import GameEngine
+
+
+def bench_analytics_1000_saves():
+    """Aggregate a directory of 1000 saved games in one process"""
+    directory = tempfile.TemporaryDirectory()
+    for i in range(1000):
+        engine = GameEngine(player_name=f"Bench{i}", rng=random.Random(i))
+        engine.initialize_world()
+        player = AIPlayer(rng=random.Random(i))
+        for _ in range(20):
+            if engine.state.value != "playing":
+                break
+            engine.process_action(player.choose_action(engine.current_scene, engine))
+        engine.save_game(os.path.join(directory.name, f"{i}.json"))
+
+    def run():
+        analyze([directory.name])
+    run.teardown = directory.cleanup
+    return run
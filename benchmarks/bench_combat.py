@@ -0,0 +1,26 @@
+"""
+Benchmarks for combat resolution
+"""
+
+import random
+
+from combat import resolve_batch, resolve_fight
+
+
+def bench_resolve_fight():
+    """Resolve one fight against a difficulty 2 enemy"""
+    rng = random.Random(0)
+
+    def run():
+        resolve_fight(100, 10, 40, 10, rng=rng)
+    return run
+
+
+def bench_resolve_batch_10k():
+    """Resolve 10,000 fights of mixed difficulty in one batch"""
+    enemy_health = [20 * (1 + i % 4) for i in range(10000)]
+    enemy_attack = [5 * (1 + i % 4) for i in range(10000)]
+
+    def run():
+        resolve_batch(100, 10, enemy_health, enemy_attack, seed=0)
+    return run
@@ -0,0 +1,25 @@
+"""
+Benchmarks for the endless generated world
+"""
+
+from endless_world import EndlessWorld
+
+
+def bench_endless_walk():
+    """Walk east through an endless world, generating chunks on the way"""
+    engine = EndlessWorld(seed=0, cache_chunks=16).new_session("Bench")
+    engine.record_history = False
+
+    def run():
+        engine.process_action("向东走")
+    return run
+
+
+def bench_endless_generate_chunk():
+    """Generate one 8x8 chunk of scenes"""
+    world = EndlessWorld(seed=0)
+    keys = iter(range(10 ** 9))
+
+    def run():
+        world._generate((next(keys), 0))
+    return run
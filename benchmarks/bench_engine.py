@@ -0,0 +1,130 @@
+"""
+Benchmarks for the game engine hot paths
+"""
+
+import os
+import tempfile
+
+from engine import GameEngine
+from worlds import make_world
+
+
+def _engine(world=None) -> GameEngine:
+    engine = GameEngine(player_name="Bench")
+    engine.initialize_world(world)
+    return engine
+
+
+def bench_process_action_move():
+    """Move back and forth between two scenes"""
+    engine = _engine()
+
+    def run():
+        engine.process_action("2")
+        engine.process_action("2")
+    return run
+
+
+def bench_process_action_search():
+    """Search a scene and look at the inventory"""
+    engine = _engine()
+
+    def run():
+        engine.process_action("3")
+        engine.process_action("4")
+    return run
+
+
+def bench_process_action_invalid():
+    """Reject input that matches no option"""
+    engine = _engine()
+
+    def run():
+        engine.process_action("不存在的选项")
+    return run
+
+
+def bench_get_scene_description():
+    """Render the current scene"""
+    engine = _engine()
+
+    def run():
+        engine._get_scene_description()
+    return run
+
+
+def _bench_initialize_world(size: int):
+    world = make_world(size)
+    engine = GameEngine(player_name="Bench")
+
+    def run():
+        engine.initialize_world(world)
+    return run
+
+
+def bench_initialize_world_default():
+    """Build the default world"""
+    engine = GameEngine(player_name="Bench")
+
+    def run():
+        engine.initialize_world()
+    return run
+
+
+def bench_initialize_world_100():
+    """Build a 100-scene world"""
+    return _bench_initialize_world(100)
+
+
+def bench_initialize_world_1000():
+    """Build a 1,000-scene world"""
+    return _bench_initialize_world(1000)
+
+
+def bench_initialize_world_10000():
+    """Build a 10,000-scene world"""
+    return _bench_initialize_world(10000)
+
+
+def bench_save_game():
+    """Save a game with a full history to disk"""
+    engine = _engine(make_world(100))
+    for _ in range(50):
+        engine.process_action("1")
+    directory = tempfile.TemporaryDirectory()
+    filename = os.path.join(directory.name, "save.json")
+
+    def run():
+        engine.save_game(filename)
+    run.teardown = directory.cleanup
+    return run
+
+
+def bench_load_game():
+    """Load a saved game from disk"""
+    world = make_world(100)
+    engine = _engine(world)
+    for _ in range(50):
+        engine.process_action("1")
+    directory = tempfile.TemporaryDirectory()
+    filename = os.path.join(directory.name, "save.json")
+    engine.save_game(filename)
+    target = _engine(world)
+
+    def run():
+        target.load_game(filename)
+    run.teardown = directory.cleanup
+    return run
+
+
+def bench_process_action_move_instrumented():
+    """Move back and forth with metrics enabled"""
+    from metrics import instrument
+
+    engine = _engine()
+    instrument(engine)
+
+    def run():
+        engine.process_action("2")
+        engine.process_action("2")
+    return run
@@ -0,0 +1,33 @@
+"""
+Benchmarks for the exhaustive world explorer
+"""
+
+from world_explorer import WorldExplorer, WorldModel
+from worlds import make_world
+
+
+def _world_with_victory(size: int):
+    world = make_world(size)
+    world["scenes"][f"scene_{size // 2}"]["options"].append(
+        {"text": "进入大门", "action": "move", "target": "victory"})
+    world["scenes"]["victory"] = {"id": "victory", "name": "胜利", "description": "", "options": []}
+    return world
+
+
+def bench_explore_12_scene_ring():
+    """Explore a 12-scene ring with items everywhere (~49k states)"""
+    explorer = WorldExplorer(_world_with_victory(12))
+
+    def run():
+        explorer.explore()
+    return run
+
+
+def bench_explore_successors():
+    """Expand one state of a 1000-scene world"""
+    model = WorldModel(_world_with_victory(1000))
+    state = model.initial
+
+    def run():
+        model.successors(state)
+    return run
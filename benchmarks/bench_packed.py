@@ -0,0 +1,41 @@
+"""
+Benchmarks for worlds shared through shared memory
+"""
+
+import atexit
+from multiprocessing import shared_memory
+
+from engine import GameEngine
+from packed_world import PackedWorld
+from worlds import make_world
+
+
+def _published(size: int) -> PackedWorld:
+    world = PackedWorld.publish(make_world(size))
+    atexit.register(world.close)
+    return world
+
+
+def bench_packed_attach_10000():
+    """Attach to a packed 10k-scene world and enter it, as a worker would"""
+    world = _published(10000)
+
+    def run():
+        attached = PackedWorld(shared_memory.SharedMemory(name=world.name), owner=False)
+        engine = GameEngine(player_name="Bench")
+        engine.initialize_world(attached.world_data, scenes=attached)
+        attached.close()
+    return run
+
+
+def bench_packed_process_action_move():
+    """Move between scenes decoded from a packed 10k-scene world"""
+    world = _published(10000)
+    world.cache_size = 16
+    engine = GameEngine(player_name="Bench")
+    engine.initialize_world(world.world_data, scenes=world)
+    engine.record_history = False
+
+    def run():
+        engine.process_action("1")
+    return run
@@ -0,0 +1,32 @@
+"""
+Benchmarks for free-text command parsing
+"""
+
+from engine import GameEngine
+from command_parser import CommandParser
+from worlds import make_world
+
+
+def bench_parse_default_world():
+    """Resolve free text in the starting scene of the default world"""
+    engine = GameEngine(player_name="Bench")
+    engine.initialize_world()
+    parser = CommandParser()
+    scene = engine.current_scene
+
+    def run():
+        parser.parse(scene, "进森林")
+    return run
+
+
+def bench_parse_large_world():
+    """Resolve free text in a precompiled 10,000-scene world"""
+    engine = GameEngine(player_name="Bench")
+    engine.initialize_world(make_world(10000))
+    parser = CommandParser()
+    parser.compile(engine.scenes)
+    scene = engine.scenes["scene_5000"]
+
+    def run():
+        parser.parse(scene, "去区域5001")
+    return run
@@ -0,0 +1,37 @@
+"""
+Benchmarks for quest tracking
+"""
+
+from engine import GameEngine
+from quests import QuestTracker
+from worlds import make_world
+
+
+def _quest_world(size: int, quests: int):
+    world = make_world(size)
+    world["quests"] = [
+        {"id": f"q{i}", "conditions": [{"enter": f"scene_{i % size}"}, {"item": f"宝物{i % size}_0"}]}
+        for i in range(quests)
+    ]
+    return world
+
+
+def _tracked_move(quests: int):
+    engine = GameEngine(player_name="Bench")
+    engine.initialize_world(_quest_world(10000, quests))
+    engine.record_history = False
+    QuestTracker(engine)
+
+    def run():
+        engine.process_action("1")
+    return run
+
+
+def bench_quest_move_10_quests():
+    """Move with quest tracking in a world with 10 quests"""
+    return _tracked_move(10)
+
+
+def bench_quest_move_10k_quests():
+    """Move with quest tracking in a world with 10,000 quests"""
+    return _tracked_move(10000)
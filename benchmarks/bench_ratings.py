@@ -0,0 +1,23 @@
+"""
+Benchmarks for playstyle ratings
+"""
+
+from ratings import PlaystyleRatings, bootstrap_win_rate
+
+
+def bench_elo_update():
+    """Record one match result"""
+    ratings = PlaystyleRatings()
+
+    def run():
+        ratings.update("balanced", "explorer", 1.0)
+    return run
+
+
+def bench_bootstrap_100k_matches():
+    """95% interval on the win rate over 100,000 matches, 2000 resamples"""
+    counts = [52000, 1000, 47000]
+
+    def run():
+        bootstrap_win_rate(counts, resamples=2000, seed=0)
+    return run
@@ -0,0 +1,33 @@
+"""
+Benchmarks for the save store
+"""
+
+import random
+import tempfile
+
+from engine import GameEngine
+from ai_player import AIPlayer
+from save_store import SaveStore
+
+
+def _played_engine(turns: int) -> GameEngine:
+    engine = GameEngine(player_name="Bench")
+    engine.initialize_world()
+    player = AIPlayer(playstyle="explorer", rng=random.Random(0))
+    for _ in range(turns):
+        if engine.state.value != "playing":
+            engine.initialize_world()
+        engine.process_action(player.choose_action(engine.current_scene, engine))
+    return engine
+
+
+def bench_save_store_autosave():
+    """Autosave into a deduplicating save store"""
+    engine = _played_engine(100)
+    directory = tempfile.TemporaryDirectory()
+    store = SaveStore(directory.name)
+
+    def run():
+        store.save(engine)
+    run.teardown = directory.cleanup
+    return run
@@ -0,0 +1,44 @@
+"""
+Benchmarks for the priority turn scheduler
+"""
+
+import random
+
+from ai_player import AIPlayer
+from engine import GameEngine
+from turn_scheduler import TurnScheduler
+
+
+def _engine(name: str) -> GameEngine:
+    engine = GameEngine(player_name=name)
+    engine.initialize_world()
+    return engine
+
+
+def bench_scheduler_interactive_turn():
+    """Submit and play one human turn while 1000 bots are waiting"""
+    scheduler = TurnScheduler()
+    for i in range(1000):
+        scheduler.add_bot(_engine(f"bot{i}"), AIPlayer(name=f"bot{i}", rng=random.Random(i), keep_history=False))
+    human = scheduler.add_session(_engine("Bench"))
+
+    def run():
+        scheduler.submit(human, "查看背包")
+        scheduler.run_once()
+    return run
+
+
+def bench_scheduler_bot_slice():
+    """Play one slice of bot turns, restarting games that end"""
+    scheduler = TurnScheduler()
+    engines = [_engine(f"bot{i}") for i in range(100)]
+    for i, engine in enumerate(engines):
+        scheduler.add_bot(engine, AIPlayer(name=f"bot{i}", rng=random.Random(i), keep_history=False))
+
+    def run():
+        if not scheduler.run_once():
+            for i, engine in enumerate(engines):
+                scheduler.remove(engine.game_id)
+                engines[i] = _engine(f"bot{i}")
+                scheduler.add_bot(engines[i], AIPlayer(name=f"bot{i}", rng=random.Random(i), keep_history=False))
+    return run
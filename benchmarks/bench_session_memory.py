@@ -0,0 +1,42 @@
+"""
+Benchmarks for per-session memory accounting
+"""
+
+import random
+
+from engine import GameEngine
+from ai_player import AIPlayer
+from session_memory import MemoryBudget, SessionHost, session_footprint
+
+
+def _played(turns: int):
+    engine = GameEngine(player_name="Bench", rng=random.Random(0))
+    engine.initialize_world()
+    player = AIPlayer(playstyle="explorer", rng=random.Random(0))
+    for _ in range(turns):
+        if engine.state.value != "playing":
+            engine.initialize_world()
+        engine.process_action(player.choose_action(engine.current_scene, engine))
+    return engine, player
+
+
+def bench_session_footprint_200():
+    """Measure a session with 200 actions of history and decisions"""
+    engine, player = _played(200)
+
+    def run():
+        session_footprint(engine, player)
+    return run
+
+
+def bench_session_host_process_action():
+    """Play through a SessionHost that checks the budget every 32 actions"""
+    engine, _ = _played(0)
+    engine.record_history = False
+    host = SessionHost(MemoryBudget(session_bytes=1 << 16))
+    game_id = host.add(engine)
+    commands = iter(["1", "2"] * 10 ** 8)
+
+    def run():
+        host.process_action(game_id, next(commands))
+    return run
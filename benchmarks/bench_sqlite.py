@@ -0,0 +1,51 @@
+"""
+Benchmarks for the SQLite session store
+"""
+
+import os
+import tempfile
+
+from engine import GameEngine
+from sqlite_store import SQLiteStore
+
+
+def _store():
+    """A store in a temporary directory, and a teardown that removes both"""
+    directory = tempfile.TemporaryDirectory()
+    store = SQLiteStore(os.path.join(directory.name, "sessions.db"))
+
+    def teardown():
+        store.close()
+        directory.cleanup()
+    return store, teardown
+
+
+def bench_sqlite_process_action_persisted():
+    """Process an action while a SQLite store records it"""
+    store, teardown = _store()
+    engine = GameEngine(player_name="Bench")
+    engine.initialize_world()
+    engine.record_history = False
+    store.attach(engine)
+
+    def run():
+        engine.process_action("查看背包")
+    run.teardown = teardown
+    return run
+
+
+def bench_sqlite_sessions_in_scene():
+    """Find the sessions in one scene among 10,000 stored sessions"""
+    store, teardown = _store()
+    for i in range(10000):
+        engine = GameEngine(player_name=f"P{i}")
+        engine.initialize_world()
+        if i % 100 == 0:
+            engine.process_action("1")
+        store.save_session(engine)
+    store.flush()
+
+    def run():
+        store.sessions_in_scene("deep_forest")
+    run.teardown = teardown
+    return run
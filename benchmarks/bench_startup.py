@@ -0,0 +1,32 @@
+"""
+Cold-start benchmarks for the command-line interface
+"""
+
+import os
+import subprocess
+import sys
+
+CLI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "cli.py")
+
+
+def _cli_process(args, stdin: str = ""):
+    def run():
+        subprocess.run([sys.executable, CLI] + args, input=stdin, capture_output=True,
+                       text=True, check=True)
+    return run
+
+
+def bench_cli_startup_help():
+    """Start the CLI and print usage"""
+    return _cli_process(["--help"])
+
+
+bench_cli_startup_help.budget_s = 0.15
+
+
+def bench_cli_startup_play():
+    """Start an interactive game and quit on the first prompt"""
+    return _cli_process(["--mode", "play"], stdin="q\n")
+
+
+bench_cli_startup_play.budget_s = 0.25
@@ -0,0 +1,42 @@
+"""
+Benchmarks for delta state sync
+"""
+
+from engine import GameEngine, apply_sync
+from worlds import make_world
+
+
+def bench_sync_after_move():
+    """Play a move in a 10k-scene world and sync a client to it"""
+    engine = GameEngine(player_name="Bench")
+    engine.initialize_world(make_world(10000, items_per_scene=20))
+    engine.record_history = False
+    client = apply_sync({}, engine.sync())
+
+    def run():
+        engine.process_action("1")
+        apply_sync(client, engine.sync(client["version"]))
+    return run
+
+
+def bench_sync_unchanged():
+    """Sync a client that is already up to date"""
+    engine = GameEngine(player_name="Bench")
+    engine.initialize_world()
+    engine.player.inventory.extend(f"物品{i}" for i in range(1000))
+    client = apply_sync({}, engine.sync())
+
+    def run():
+        engine.sync(client["version"])
+    return run
+
+
+def bench_get_status():
+    """Build the status dict the CLI and batch mode report"""
+    engine = GameEngine(player_name="Bench")
+    engine.initialize_world()
+    engine.player.inventory.extend(f"物品{i}" for i in range(20))
+
+    def run():
+        engine.get_status()
+    return run
@@ -0,0 +1,26 @@
+"""
+Benchmarks for the world clock's timer wheel
+"""
+
+import random
+
+from world_clock import TimerWheel
+
+
+def _noop():
+    pass
+
+
+def bench_timer_wheel_1m_pending():
+    """Schedule one timer and advance one tick with a million timers pending"""
+    rng = random.Random(0)
+    wheel = TimerWheel()
+    for _ in range(10 ** 6):
+        wheel.schedule(rng.randint(1, 10 ** 6), _noop)
+    delays = [rng.randint(1, 10 ** 6) for _ in range(4096)]
+    position = iter(range(10 ** 9))
+
+    def run():
+        wheel.schedule(delays[next(position) & 4095], _noop)
+        wheel.advance(1)
+    return run
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner for AI Text Adventure
+
+Discovers bench_* functions in benchmarks/bench_*.py, times them, writes the
+results as JSON with machine metadata and compares them with a baseline.
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+sys.path.insert(0, BENCH_DIR)
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def discover(name_filter: str = "") -> List[Tuple[str, Callable]]:
+    """Find benchmark setup functions"""
+    found = []
+    for filename in sorted(os.listdir(BENCH_DIR)):
+        if not (filename.startswith("bench_") and filename.endswith(".py")):
+            continue
+        module = importlib.import_module(filename[:-3])
+        for attr in sorted(vars(module)):
+            if attr.startswith("bench_") and callable(getattr(module, attr)):
+                name = attr[len("bench_"):]
+                if name_filter in name:
+                    found.append((name, getattr(module, attr)))
+    return found
+
+
+def time_benchmark(setup: Callable, min_time: float, repeat: int) -> Dict:
+    """Time one benchmark, calibrating the loop count to min_time
+
+    A run function with a teardown attribute has it called afterwards,
+    e.g. to remove the temporary files its setup created.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        run = setup()
+        try:
+            loops = 1
+            while True:
+                start = time.perf_counter()
+                for _ in range(loops):
+                    run()
+                elapsed = time.perf_counter() - start
+                if elapsed >= min_time or loops >= 1_000_000:
+                    break
+                loops *= 10 if elapsed < min_time / 10 else 2
+
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                for _ in range(loops):
+                    run()
+                samples.append((time.perf_counter() - start) / loops)
+        finally:
+            teardown = getattr(run, "teardown", None)
+            if teardown is not None:
+                teardown()
+
+    result = {
+        "loops": loops,
+        "repeat": repeat,
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.mean(samples)
+    }
+    budget = getattr(setup, "budget_s", None)
+    if budget is not None:
+        result["budget_s"] = budget
+    return result
+
+
+def machine_metadata() -> Dict:
+    """Describe the machine and revision the results come from"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """List regressions against the baseline and exceeded budgets"""
+    problems = []
+    for name, result in results.items():
+        budget = result.get("budget_s")
+        if budget is not None and result["min_s"] > budget:
+            problems.append(f"{name}: {result['min_s'] * 1e3:.2f}ms exceeds budget {budget * 1e3:.2f}ms")
+
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = result["min_s"] / base["min_s"]
+        if ratio > 1 + threshold:
+            problems.append(f"{name}: {ratio:.2f}x slower than baseline")
+    return problems
+
+
+def format_time(seconds: float) -> str:
+    """Format a duration with a readable unit"""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.2f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.2f}s"
+
+
+def main(argv: List[str] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Run AI Text Adventure benchmarks")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--out", default=None, help="Write results JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per sample")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get("results", {})
+
+    results = {}
+    for name, setup in discover(args.filter):
+        result = time_benchmark(setup, args.min_time, args.repeat)
+        results[name] = result
+
+        line = f"{name:<36} {format_time(result['min_s']):>12}"
+        if name in baseline:
+            line += f"  ({result['min_s'] / baseline[name]['min_s']:.2f}x baseline)"
+        print(line)
+
+    report = {"metadata": machine_metadata(), "results": results}
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.update_baseline:
+        # Merge so that a filtered run only replaces the benchmarks it ran
+        merged = {"metadata": report["metadata"], "results": {**baseline, **results}}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False, indent=2)
+        print(f"✅ Baseline updated: {args.baseline}")
+        return 0
+
+    problems = compare(results, baseline, args.threshold)
+    for problem in problems:
+        print(f"❌ {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
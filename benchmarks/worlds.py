@@ -0,0 +1,31 @@
+"""
+Synthetic worlds of configurable size for benchmarks
+"""
+
+from typing import Dict
+
+
+def make_world(size: int, items_per_scene: int = 1) -> Dict:
+    """Build a ring of `size` scenes, each linking to its neighbours"""
+    scenes = {}
+    for i in range(size):
+        scene_id = f"scene_{i}"
+        scenes[scene_id] = {
+            "id": scene_id,
+            "name": f"区域{i}",
+            "description": f"这是第{i}号区域，道路向两侧延伸。",
+            "options": [
+                {"text": f"前往区域{(i + 1) % size}", "action": "move", "target": f"scene_{(i + 1) % size}"},
+                {"text": f"返回区域{(i - 1) % size}", "action": "move", "target": f"scene_{(i - 1) % size}"},
+                {"text": "检查周围环境", "action": "search"},
+                {"text": "查看背包", "action": "inventory"}
+            ],
+            "items": [f"宝物{i}_{j}" for j in range(items_per_scene)],
+            "npcs": ["哥布林"] if i % 7 == 0 else []
+        }
+    return {
+        "name": f"环形世界{size}",
+        "description": "用于性能测试的合成世界",
+        "start_scene": "scene_0",
+        "scenes": scenes
+    }
@@ -8,16 +8,19 @@ __author__ = "JarvisAI-CN"
 
 from .engine import GameEngine, GameState, Player, Scene
 from .dungeon_master import AIDungeonMaster, StoryTeller
-from .ai_player import AIPlayer, AutoPlayer, AIvsAI
+from .timeline import Timeline
+from .ai_player import AIPlayer, MCTSPlayer, AutoPlayer, AIvsAI
 
 __all__ = [
     "GameEngine",
     "GameState",
     "Player",
     "Scene",
+    "Timeline",
     "AIDungeonMaster",
     "StoryTeller",
     "AIPlayer",
+    "MCTSPlayer",
     "AutoPlayer",
     "AIvsAI"
 ]
@@ -3,19 +3,32 @@ AI Player - Autonomous gameplay
 AI agent that can play the game autonomously
 """
 
+import math
 import random
+import time
 from typing import Dict, List, Optional
 from engine import GameEngine, Scene, GameState
+from events import ActionProcessed, EventBus
+
+PLAYSTYLES = ("aggressive", "cautious", "balanced", "explorer")
 
 
 class AIPlayer:
-    """AI agent that plays text adventure games"""
+    """AI agent that plays text adventure games
+
+    Every decision is kept in decision_history for get_decision_stats();
+    long-running bots can pass keep_history=False to keep none.
+    """
 
-    def __init__(self, name: str = "AI Hero", playstyle: str = "balanced"):
+    def __init__(self, name: str = "AI Hero", playstyle: str = "balanced", rng: random.Random = None,
+                 keep_history: bool = True):
         self.name = name
+        self.rng = rng if rng is not None else random
         self.playstyle = playstyle  # aggressive, cautious, balanced, explorer
+        self.keep_history = keep_history
         self.decision_history = []
         self.personality_traits = self._generate_personality()
+        self.metrics = None
 
     def _generate_personality(self) -> Dict:
         """Generate personality traits based on playstyle"""
@@ -49,6 +62,17 @@ class AIPlayer:
 
     def choose_action(self, scene: Scene, game_state: GameEngine) -> str:
         """Choose an action based on scene and game state"""
+        if self.metrics is None:
+            return self._choose_action(scene, game_state)
+
+        start = time.perf_counter()
+        decision = self._choose_action(scene, game_state)
+        self.metrics.observe("ai_choose_action_seconds", time.perf_counter() - start,
+                             playstyle=self.playstyle, player=type(self).__name__)
+        return decision
+
+    def _choose_action(self, scene: Scene, game_state: GameEngine) -> str:
+        """Pick an action using the personality-driven heuristics"""
         if not scene or not scene.options:
             return "等待"
 
@@ -84,7 +108,7 @@ class AIPlayer:
 
         # Priority 2: Combat decisions
         if situation["has_hostile_npcs"]:
-            roll = random.random()
+            roll = self.rng.random()
             if roll < self.personality_traits["fight_chance"]:
                 # Fight
                 for opt in scene.options:
@@ -104,23 +128,25 @@ class AIPlayer:
 
         # Priority 4: Talk to NPCs
         if situation["has_friendly_npcs"]:
-            if random.random() < self.personality_traits["talk_chance"]:
+            if self.rng.random() < self.personality_traits["talk_chance"]:
                 for opt in scene.options:
                     if "交谈" in opt["text"] or "对话" in opt["text"]:
                         return opt["text"]
 
         # Priority 5: Exploration
-        if random.random() < self.personality_traits["explore_chance"]:
+        if self.rng.random() < self.personality_traits["explore_chance"]:
             # Pick a move option
             move_options = [opt for opt in scene.options if opt.get("action") == "move"]
             if move_options:
-                return random.choice(move_options)["text"]
+                return self.rng.choice(move_options)["text"]
 
         # Default: Random choice
-        return random.choice(scene.options)["text"]
+        return self.rng.choice(scene.options)["text"]
 
     def _record_decision(self, scene: Scene, situation: Dict, decision: str):
         """Record decision for learning"""
+        if not self.keep_history:
+            return
         self.decision_history.append({
             "scene": scene.id,
             "situation": situation,
@@ -133,6 +159,10 @@ class AIPlayer:
         if self.decision_history:
             self.decision_history[-1]["success"] = success
 
+    def on_action_processed(self, event: ActionProcessed):
+        """Event bus handler that records the outcome of the last decision"""
+        self.update_decision_outcome(event.success)
+
     def get_decision_stats(self) -> Dict:
         """Get statistics about decisions"""
         if not self.decision_history:
@@ -159,12 +189,125 @@ class AIPlayer:
             return "explorer"  # Can explore freely
 
 
+class _SearchNode:
+    """Node in the MCTS search tree, children keyed by option index"""
+
+    __slots__ = ("children", "visits", "value")
+
+    def __init__(self):
+        self.children: Dict[int, "_SearchNode"] = {}
+        self.visits = 0
+        self.value = 0.0
+
+
+class MCTSPlayer(AIPlayer):
+    """AI player that plans with Monte Carlo tree search over engine forks"""
+
+    def __init__(self, name: str = "MCTS Hero", playstyle: str = "balanced",
+                 simulations: int = 200, rollout_depth: int = 10, exploration: float = 1.4,
+                 rng: random.Random = None, keep_history: bool = True):
+        super().__init__(name, playstyle, rng, keep_history)
+        self.simulations = simulations
+        self.rollout_depth = rollout_depth
+        self.exploration = exploration
+        self.total_simulations = 0
+        self.total_search_time = 0.0
+
+    def _choose_action(self, scene: Scene, game_state: GameEngine) -> str:
+        """Choose the option with the most visits after a tree search"""
+        if not scene or not scene.options:
+            return "等待"
+
+        root = _SearchNode()
+        start = time.perf_counter()
+        for _ in range(self.simulations):
+            fork = game_state.fork(record_history=False, rng=random.Random(self.rng.getrandbits(64)))
+            self._simulate(root, fork, 0)
+        self.total_search_time += time.perf_counter() - start
+        self.total_simulations += self.simulations
+
+        # No simulations, or the game ended while the scene still has options
+        if not root.children:
+            return super()._choose_action(scene, game_state)
+
+        best_index = max(root.children, key=lambda index: root.children[index].visits)
+        decision = scene.options[best_index]["text"]
+
+        situation = self._analyze_situation(scene, game_state)
+        self._record_decision(scene, situation, decision)
+
+        return decision
+
+    def _simulate(self, node: _SearchNode, engine: GameEngine, depth: int) -> float:
+        """Run one selection/expansion/rollout pass and backpropagate"""
+        scene = engine.current_scene
+        if engine.state != GameState.PLAYING or not scene or not scene.options or depth >= self.rollout_depth:
+            reward = self._evaluate(engine)
+        else:
+            untried = [i for i in range(len(scene.options)) if i not in node.children]
+            if untried:
+                index = self.rng.choice(untried)
+                child = node.children[index] = _SearchNode()
+                engine.process_action(str(index + 1))
+                reward = self._rollout(engine, depth + 1)
+                child.visits += 1
+                child.value += reward
+            else:
+                index = self._select(node)
+                engine.process_action(str(index + 1))
+                reward = self._simulate(node.children[index], engine, depth + 1)
+
+        node.visits += 1
+        node.value += reward
+        return reward
+
+    def _select(self, node: _SearchNode) -> int:
+        """Pick the child with the best UCT score"""
+        log_visits = math.log(node.visits)
+
+        def uct(index: int) -> float:
+            child = node.children[index]
+            return child.value / child.visits + self.exploration * math.sqrt(log_visits / child.visits)
+
+        return max(node.children, key=uct)
+
+    def _rollout(self, engine: GameEngine, depth: int) -> float:
+        """Play random options until the depth limit and score the result"""
+        while depth < self.rollout_depth and engine.state == GameState.PLAYING:
+            scene = engine.current_scene
+            if not scene or not scene.options:
+                break
+            engine.process_action(str(self.rng.randrange(len(scene.options)) + 1))
+            depth += 1
+        return self._evaluate(engine)
+
+    def _evaluate(self, engine: GameEngine) -> float:
+        """Score a state, using the AIvsAI scoring plus an exploration bonus"""
+        if engine.state == GameState.LOST:
+            return 0.0
+        visited = sum(1 for s in engine.scenes.delta.values() if s.visited)
+        score = engine.player.health + len(engine.player.inventory) * 10 + visited * 5
+        if engine.state == GameState.WON:
+            score += 100
+        return score / 100
+
+    def get_search_stats(self) -> Dict:
+        """Get search throughput statistics"""
+        return {
+            "simulations": self.total_simulations,
+            "search_time": self.total_search_time,
+            "simulations_per_second": (self.total_simulations / self.total_search_time
+                                       if self.total_search_time else 0)
+        }
+
+
 class AutoPlayer:
     """Automated player for AI vs AI mode"""
 
-    def __init__(self, ai_player: AIPlayer, max_turns: int = 50):
+    def __init__(self, ai_player: AIPlayer, max_turns: int = 50, verbose: bool = True):
         self.ai_player = ai_player
         self.max_turns = max_turns
+        self.verbose = verbose
         self.turn_count = 0
 
     def play_auto_game(self, game_engine: GameEngine) -> List[Dict]:
@@ -172,6 +315,19 @@ class AutoPlayer:
         game_log = []
         self.turn_count = 0
 
+        # Decision outcomes arrive through the engine's event bus
+        if game_engine.events is None:
+            game_engine.events = EventBus()
+        subscription = game_engine.events.subscribe(ActionProcessed, self.ai_player.on_action_processed)
+        try:
+            self._play_turns(game_engine, game_log)
+        finally:
+            game_engine.events.unsubscribe(subscription)
+
+        return game_log
+
+    def _play_turns(self, game_engine: GameEngine, game_log: List[Dict]):
+        """Run the turn loop until the game ends or max_turns is reached"""
         while game_engine.state == GameState.PLAYING and self.turn_count < self.max_turns:
             self.turn_count += 1
 
@@ -197,11 +353,10 @@ class AutoPlayer:
             result, new_scene = game_engine.process_action(action)
 
             # Print progress
-            print(f"[Turn {self.turn_count}] {scene.name}: {action}")
-            print(f"  Result: {result[:50]}...")
-            print(f"  Health: {game_engine.player.health}")
-
-        return game_log
+            if self.verbose:
+                print(f"[Turn {self.turn_count}] {scene.name}: {action}")
+                print(f"  Result: {result[:50]}...")
+                print(f"  Health: {game_engine.player.health}")
 
     def generate_story_from_log(self, game_log: List[Dict]) -> str:
         """Generate a story from game log"""
@@ -219,8 +374,10 @@ class AutoPlayer:
 class AIvsAI:
     """Manager for AI vs AI gameplay"""
 
-    def __init__(self):
+    def __init__(self, verbose: bool = True):
         self.players = []
+        self.ratings = None
+        self.verbose = verbose
 
     def create_tournament(self, player_configs: List[Dict]) -> List[Dict]:
         """Create tournament with different AI players"""
@@ -246,14 +403,14 @@ class AIvsAI:
         game2.initialize_world()
 
         # Play games
-        auto_player1 = AutoPlayer(player1)
-        auto_player2 = AutoPlayer(player2)
+        auto_player1 = AutoPlayer(player1, verbose=self.verbose)
+        auto_player2 = AutoPlayer(player2, verbose=self.verbose)
 
         log1 = auto_player1.play_auto_game(game1)
         log2 = auto_player2.play_auto_game(game2)
 
         # Compare results
-        return {
+        result = {
             "player1": {
                 "name": player1.name,
                 "playstyle": player1.playstyle,
@@ -270,6 +427,9 @@ class AIvsAI:
             },
             "winner": self._determine_winner(game1, game2)
         }
+        if self.ratings is not None:
+            self.ratings.record(result)
+        return result
 
     def _determine_winner(self, game1: GameEngine, game2: GameEngine) -> str:
         """Determine winner of match"""
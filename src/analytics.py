@@ -0,0 +1,453 @@
+"""
+Analytics - Offline aggregates over saved games and logs
+Streams directories of saves, recordings and JSON Lines logs through a process pool
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ratings import match_score
+from replay import load_world, start_engine, world_hash
+
+# Files handed to a worker at a time
+CHUNK_FILES = 256
+
+# World and funnel used by _analyze_files, set once per process by _init_worker
+_context: Dict = {}
+
+# What a well-formed JSON file or line with the wrong shapes inside raises
+_MALFORMED = (AttributeError, KeyError, TypeError, ValueError)
+
+
+class Aggregates:
+    """Partial analytics that merge by addition
+
+    Everything is a count or a Counter keyed by something the world
+    defines (scene ids, option texts, action types, outcomes, playstyles),
+    so a partial stays the same size however many files it covers and
+    partials from different workers can be merged in any order.
+
+    Scene turns count actions taken in each scene; scene sessions count
+    sessions that reached it. The funnel counts sessions that reached
+    every stage up to each one.
+    """
+
+    def __init__(self, stages: Tuple[str, ...] = ()):
+        self.stages = tuple(stages)
+        self.files: Counter = Counter()
+        self.errors = 0
+        self.sessions = 0
+        self.turns = 0
+        self.scene_turns: Counter = Counter()
+        self.scene_sessions: Counter = Counter()
+        self.action_types: Counter = Counter()
+        self.options: Counter = Counter()
+        self.outcomes: Counter = Counter()
+        self.funnel = [0] * len(self.stages)
+        self.playstyles: Dict[str, Counter] = {}
+
+    def add_turn(self, scene_id: Optional[str], action_type: Optional[str] = None, text: Optional[str] = None):
+        """Count one action taken in a scene"""
+        self.turns += 1
+        if scene_id:
+            self.scene_turns[scene_id] += 1
+        if action_type:
+            self.action_types[action_type] += 1
+        if text:
+            self.options[text] += 1
+
+    def add_session(self, visited: Set[str], state: Optional[str]):
+        """Count one session by the scenes it reached and how it ended"""
+        self.sessions += 1
+        self.scene_sessions.update(visited)
+        if state:
+            self.outcomes[state] += 1
+        for stage, scene_id in enumerate(self.stages):
+            if scene_id not in visited:
+                break
+            self.funnel[stage] += 1
+
+    def add_match(self, result: Dict):
+        """Count an AIvsAI.run_match() result for both playstyles
+
+        A malformed result raises before anything is counted.
+        """
+        score = match_score(result)
+        sides = []
+        for player, points in ((result["player1"], score), (result["player2"], 1.0 - score)):
+            side = (player.get("playstyle", "unknown"), points, player.get("turns", 0), player.get("final_health", 0))
+            if not all(isinstance(value, (int, float)) for value in side[2:]):
+                raise TypeError("turns and final_health must be numbers")
+            hash(side[0])
+            sides.append(side)
+
+        for playstyle, points, turns, final_health in sides:
+            counts = self.playstyles.setdefault(playstyle, Counter())
+            counts["games"] += 1
+            counts["wins" if points == 1.0 else "losses" if points == 0.0 else "draws"] += 1
+            counts["turns"] += turns
+            counts["final_health"] += final_health
+
+    def merge(self, other: "Aggregates") -> "Aggregates":
+        """Add another partial into this one"""
+        if other.stages != self.stages:
+            raise ValueError("Cannot merge aggregates with different funnels")
+        self.files.update(other.files)
+        self.errors += other.errors
+        self.sessions += other.sessions
+        self.turns += other.turns
+        self.scene_turns.update(other.scene_turns)
+        self.scene_sessions.update(other.scene_sessions)
+        self.action_types.update(other.action_types)
+        self.options.update(other.options)
+        self.outcomes.update(other.outcomes)
+        self.funnel = [a + b for a, b in zip(self.funnel, other.funnel)]
+        for playstyle, counts in other.playstyles.items():
+            self.playstyles.setdefault(playstyle, Counter()).update(counts)
+        return self
+
+    def report(self, top: int = 20) -> Dict:
+        """Heatmap, action mix, funnel and playstyle outcomes as JSON-compatible data"""
+        def share(count: int, total: int) -> float:
+            return count / total if total else 0.0
+
+        scenes = sorted(set(self.scene_turns) | set(self.scene_sessions),
+                        key=lambda scene_id: (-self.scene_turns[scene_id], scene_id))
+        funnel = []
+        for stage, count in zip(self.stages, self.funnel):
+            previous = funnel[-1]["sessions"] if funnel else self.sessions
+            funnel.append({"scene": stage, "sessions": count, "conversion": share(count, previous),
+                           "overall": share(count, self.sessions)})
+
+        playstyles = []
+        for playstyle, counts in sorted(self.playstyles.items()):
+            games = counts["games"]
+            playstyles.append({
+                "playstyle": playstyle, "games": games, "wins": counts["wins"],
+                "losses": counts["losses"], "draws": counts["draws"],
+                "win_rate": share(counts["wins"] + 0.5 * counts["draws"], games),
+                "mean_turns": share(counts["turns"], games),
+                "mean_final_health": share(counts["final_health"], games)
+            })
+
+        return {
+            "files": dict(self.files),
+            "errors": self.errors,
+            "sessions": self.sessions,
+            "turns": self.turns,
+            "scene_heatmap": [{"scene": scene_id, "turns": self.scene_turns[scene_id],
+                               "sessions": self.scene_sessions[scene_id],
+                               "share": share(self.scene_turns[scene_id], self.turns)}
+                              for scene_id in scenes],
+            "actions": [{"action": action, "count": count, "share": share(count, self.turns)}
+                        for action, count in self.action_types.most_common()],
+            "top_options": [{"option": text, "count": count} for text, count in self.options.most_common(top)],
+            "outcomes": dict(self.outcomes),
+            "funnel": funnel,
+            "playstyles": playstyles
+        }
+
+
+def victory_funnel(world_data: Dict) -> Tuple[str, ...]:
+    """Scenes on a shortest path from the start to the victory scene
+
+    Just the start and the victory scene if no path exists.
+    """
+    scenes = world_data.get("scenes", {})
+    start = world_data.get("start_scene", "forest_entrance")
+    victory = world_data.get("victory_scene", "victory")
+    previous = {start: None}
+    frontier = deque([start])
+    while frontier and victory not in previous:
+        scene_id = frontier.popleft()
+        for option in scenes.get(scene_id, {}).get("options", []):
+            target = option.get("target")
+            if option.get("action") == "move" and target in scenes and target not in previous:
+                previous[target] = scene_id
+                frontier.append(target)
+
+    if victory not in previous:
+        return (start, victory)
+    path = [victory]
+    while previous[path[-1]] is not None:
+        path.append(previous[path[-1]])
+    return tuple(reversed(path))
+
+
+def iter_files(paths: Iterable[str]) -> Iterator[str]:
+    """Expand files and directories into .json and .jsonl paths, lazily"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith((".json", ".jsonl")):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def _chunks(paths: Iterator[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Per-file analysis, run in pool workers
+
+def _init_worker(world_data: Dict, stages: Tuple[str, ...]):
+    scenes = world_data.get("scenes", {})
+    _context.update(
+        world_data=world_data,
+        world_hash=world_hash(world_data),
+        stages=stages,
+        start=world_data.get("start_scene", "forest_entrance"),
+        # Turn logs may name scenes by display name rather than id
+        scene_ids={**{scene.get("name"): scene_id for scene_id, scene in scenes.items()},
+                   **{scene_id: scene_id for scene_id in scenes}}
+    )
+
+
+# The _add_* helpers read everything in a record and hash what becomes a
+# counter key before counting anything, so one that raises for a malformed
+# record leaves no trace
+
+def _add_history(totals: Aggregates, history: List[Dict], current_scene: Optional[str],
+                 state: Optional[str], visited: Iterable[str] = ()):
+    turns = []
+    for record in history:
+        option = record.get("option") or {}
+        turns.append((record.get("scene"), option.get("action"), option.get("text")))
+    hash((tuple(turns), current_scene, state))
+    visited = set(visited)
+
+    visited.add(_context["start"])
+    for scene_id, action_type, text in turns:
+        totals.add_turn(scene_id, action_type, text)
+        visited.add(scene_id)
+    if current_scene:
+        visited.add(current_scene)
+    visited.discard(None)
+    totals.add_session(visited, state)
+
+
+def _add_save(totals: Aggregates, save: Dict):
+    """A GameEngine.save_game() file; only its last 20 actions are kept"""
+    _add_history(totals, save.get("history", []), save.get("current_scene"), save.get("state"),
+                 save.get("scenes_visited", []))
+
+
+def _add_recording(totals: Aggregates, recording: Dict):
+    """A replay recording, re-run to recover the scenes behind its inputs"""
+    if recording.get("world_hash") != _context["world_hash"]:
+        totals.files["recording_other_world"] += 1
+        return
+    engine = start_engine(recording, _context["world_data"])
+    for action in recording.get("inputs", []):
+        engine.process_action(action)
+    _add_history(totals, engine.history, engine.current_scene.id if engine.current_scene else None,
+                 engine.state.value)
+
+
+def _add_batch_result(totals: Aggregates, result: Dict):
+    """A batch mode result line; the transcript has the scene after each input"""
+    status = result.get("status") or {}
+    scenes = [step.get("scene") for step in result.get("transcript", [])]
+    hash((tuple(scenes), status.get("current_scene"), status.get("state")))
+
+    scene_id = _context["start"]
+    visited = {scene_id}
+    for scene in scenes:
+        totals.add_turn(scene_id, None, None)
+        scene_id = scene or scene_id
+        visited.add(scene_id)
+    if status.get("current_scene"):
+        visited.add(status["current_scene"])
+    totals.add_session(visited, status.get("state"))
+
+
+def _add_turn(totals: Aggregates, record: Dict, sessions: Dict[str, Tuple[Set[str], List[Optional[str]]]]):
+    """A per-turn log record, grouped into its session by game id"""
+    option = record.get("option") or {}
+    scene_id = _context["scene_ids"].get(record["scene"], record["scene"])
+    action_type = record.get("action_type") or option.get("action")
+    hash((scene_id, action_type, option.get("text"), record.get("state")))
+
+    totals.add_turn(scene_id, action_type, option.get("text"))
+    key = str(record.get("game_id", record.get("session", record.get("id", ""))))
+    visited, state = sessions.setdefault(key, ({_context["start"]}, [None]))
+    visited.add(scene_id)
+    if record.get("state"):
+        state[0] = record["state"]
+
+
+def _add_jsonl(totals: Aggregates, f) -> str:
+    """Match results, batch results or turn records, one per line
+
+    Malformed lines count as errors. Turn records are grouped into
+    sessions within one file only, so a session whose turns are spread
+    over several files (or over chunks handled by different workers) is
+    counted once per file.
+    """
+    # Turn records of one session may be interleaved with others'
+    sessions: Dict[str, Tuple[Set[str], List[Optional[str]]]] = {}
+    kind = "jsonl"
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            totals.errors += 1
+            continue
+        try:
+            if "winner" in record and "player1" in record:
+                totals.add_match(record)
+                kind = "match_results"
+            elif "status" in record or "transcript" in record:
+                _add_batch_result(totals, record)
+                kind = "batch_results"
+            elif "scene" in record and "action" in record:
+                _add_turn(totals, record, sessions)
+                kind = "turn_logs"
+            else:
+                totals.errors += 1
+        except _MALFORMED:
+            totals.errors += 1
+    for visited, state in sessions.values():
+        totals.add_session(visited, state[0])
+    return kind
+
+
+def _analyze_files(paths: List[str]) -> Aggregates:
+    """Aggregate a chunk of files into one partial"""
+    totals = Aggregates(_context["stages"])
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if path.endswith(".jsonl"):
+                    totals.files[_add_jsonl(totals, f)] += 1
+                    continue
+                data = json.load(f)
+        except (OSError, ValueError):
+            totals.errors += 1
+            continue
+
+        try:
+            if not isinstance(data, dict):
+                totals.errors += 1
+            elif "inputs" in data and "world_hash" in data:
+                _add_recording(totals, data)
+                totals.files["recordings"] += 1
+            elif "player" in data and "state" in data:
+                _add_save(totals, data)
+                totals.files["saves"] += 1
+            else:
+                totals.files["other"] += 1
+        except _MALFORMED:
+            totals.errors += 1
+    return totals
+
+
+def analyze(paths: Iterable[str], world_data: Dict = None, workers: int = 1,
+            stages: Tuple[str, ...] = None, chunk_files: int = CHUNK_FILES) -> Aggregates:
+    """Aggregate every save, recording and JSON Lines log under paths
+
+    Directories are walked lazily and at most two chunks of paths per
+    worker are in flight, so memory stays flat however many files there
+    are. Recordings are only replayed against the world they were made
+    in. The funnel defaults to the shortest path to the victory scene.
+    """
+    if world_data is None:
+        world_data = load_world(None)
+    if stages is None:
+        stages = victory_funnel(world_data)
+    stages = tuple(stages)
+
+    totals = Aggregates(stages)
+    chunks = _chunks(iter_files(paths), chunk_files)
+    if workers <= 1:
+        _init_worker(world_data, stages)
+        for chunk in chunks:
+            totals.merge(_analyze_files(chunk))
+        return totals
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(world_data, stages)) as pool:
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(_analyze_files, chunk))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    totals.merge(future.result())
+        for future in pending:
+            totals.merge(future.result())
+    return totals
+
+
+def print_report(report: Dict, top: int = 10):
+    files = ", ".join(f"{kind} {count}" for kind, count in sorted(report["files"].items()))
+    print(f"files: {files or 'none'}  errors: {report['errors']}  "
+          f"sessions: {report['sessions']}  turns: {report['turns']}")
+
+    if report["scene_heatmap"]:
+        print(f"\n{'scene':<24} {'turns':>9} {'share':>7} {'sessions':>9}")
+        for row in report["scene_heatmap"][:top]:
+            print(f"{row['scene']:<24} {row['turns']:>9} {row['share']:>7.1%} {row['sessions']:>9}")
+
+    if report["actions"]:
+        print(f"\n{'action':<24} {'count':>9} {'share':>7}")
+        for row in report["actions"]:
+            print(f"{row['action']:<24} {row['count']:>9} {row['share']:>7.1%}")
+
+    if report["sessions"]:
+        print(f"\n{'funnel stage':<24} {'sessions':>9} {'step':>7} {'overall':>8}")
+        for row in report["funnel"]:
+            print(f"{row['scene']:<24} {row['sessions']:>9} {row['conversion']:>7.1%} {row['overall']:>8.1%}")
+        print("outcomes: " + ", ".join(f"{state} {count}" for state, count in sorted(report["outcomes"].items())))
+
+    if report["playstyles"]:
+        print(f"\n{'playstyle':<12} {'games':>8} {'win rate':>9} {'turns':>7} {'health':>7}")
+        for row in report["playstyles"]:
+            print(f"{row['playstyle']:<12} {row['games']:>8} {row['win_rate']:>9.3f} "
+                  f"{row['mean_turns']:>7.1f} {row['mean_final_health']:>7.1f}")
+
+
+def main(argv: List[str] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Aggregate saves, recordings and JSON Lines logs")
+    parser.add_argument("paths", nargs="+", help="Files or directories to scan")
+    parser.add_argument("--world", default=None, help="World JSON file the games were played in")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--funnel", default=None, help="Comma-separated funnel scenes (default: path to victory)")
+    parser.add_argument("--top", type=int, default=10, help="Rows per table")
+    parser.add_argument("--out", default=None, help="Write the full report JSON here")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    stages = tuple(args.funnel.split(",")) if args.funnel else None
+    totals = analyze(args.paths, load_world(args.world), args.workers, stages)
+    report = totals.report(top=args.top)
+    report["seconds"] = time.perf_counter() - start
+
+    print_report(report, args.top)
+    print(f"\n{report['seconds']:.2f}s")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Batch - Headless scripted playthroughs
+Runs command scripts without prompts and emits JSON Lines results
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from engine import DEFAULT_WORLD, GameEngine, GameState
+from packed_world import PackedWorld
+
+QUIT_COMMANDS = ("quit", "exit", "q")
+
+# Sessions sent to a worker at a time
+BATCH_CHUNK = 16
+
+
+@lru_cache(maxsize=16)
+def _load_world(path: str) -> Dict:
+    """Load a world file once per worker process"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _script_commands(lines: Iterable[str]) -> List[str]:
+    """Parse a plain command script: one command per line, # for comments"""
+    commands = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            commands.append(line)
+    return commands
+
+
+def read_sessions(paths: List[str], stdin: TextIO = None) -> Iterator[Dict]:
+    """Read session specs from script files, JSON Lines files or stdin ("-")
+
+    A .jsonl file or stdin holds one session per line as
+    {"id": ..., "player": ..., "commands": [...], "world": optional path,
+    "seed": optional combat seed}.
+    Any other file is a single session with one command per line. A line
+    that is not a JSON object becomes a session that only reports the
+    problem, so one bad line does not stop the batch.
+    """
+    for path in paths:
+        if path == "-" or path.endswith(".jsonl"):
+            stream = (stdin or sys.stdin) if path == "-" else open(path, 'r', encoding='utf-8')
+            try:
+                for number, line in enumerate(stream, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        session = json.loads(line)
+                    except ValueError as e:
+                        session = {"invalid": f"JSONDecodeError: {e}"}
+                    if not isinstance(session, dict):
+                        session = {"invalid": f"TypeError: expected a JSON object, got {type(session).__name__}"}
+                    session.setdefault("id", f"{path}:{number}")
+                    yield session
+            finally:
+                if stream is not stdin and stream is not sys.stdin:
+                    stream.close()
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                yield {"id": path, "commands": _script_commands(f)}
+
+
+def run_session(session: Dict, transcript: bool = True) -> Dict:
+    """Play one scripted session and describe the outcome"""
+    start = time.perf_counter()
+    result = {"id": session.get("id"), "ok": True}
+    if "invalid" in session:
+        result.update({"ok": False, "error": session["invalid"], "elapsed": 0.0})
+        return result
+
+    try:
+        engine = GameEngine(player_name=session.get("player", "Hero"),
+                            rng=random.Random(session.get("seed", 0)))
+        packed = session.get("packed_world")
+        if packed is not None:
+            engine.initialize_world(packed.world_data, scenes=packed)
+        else:
+            engine.initialize_world(_load_world(session["world"]) if session.get("world") else DEFAULT_WORLD)
+
+        commands = session.get("commands", [])
+        steps = []
+        executed = 0
+        for command in commands:
+            if engine.state != GameState.PLAYING or command.lower() in QUIT_COMMANDS:
+                break
+            text, scene = engine.process_action(command)
+            executed += 1
+            if transcript:
+                steps.append({"input": command, "result": text, "scene": scene.id if scene else None})
+
+        result.update({
+            "commands": len(commands),
+            "executed": executed,
+            "accepted": len(engine.history),
+            "status": engine.get_status()
+        })
+        if transcript:
+            result["transcript"] = steps
+    except Exception as e:
+        result.update({"ok": False, "error": f"{type(e).__name__}: {e}"})
+
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def _run_session_quiet(session: Dict) -> Dict:
+    return run_session(session, transcript=False)
+
+
+def _chunks(sessions: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for session in sessions:
+        chunk.append(session)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _run_chunk(runner: Callable[[Dict], Dict], sessions: List[Dict]) -> List[Dict]:
+    return [runner(session) for session in sessions]
+
+
+def run_batch(sessions: Iterable[Dict], workers: int = 1, transcript: bool = True) -> Iterator[Dict]:
+    """Run sessions, in parallel worker processes when workers > 1
+
+    Results are yielded in input order. Only a few chunks of sessions per
+    worker are read ahead, so input of any size streams through. Worker
+    processes read world files from one shared memory copy per world
+    instead of parsing them each.
+    """
+    runner = run_session if transcript else _run_session_quiet
+    if workers <= 1:
+        for session in sessions:
+            yield runner(session)
+        return
+
+    packed: Dict[str, Optional[PackedWorld]] = {}
+
+    def with_packed_worlds(sessions: Iterable[Dict]) -> Iterator[Dict]:
+        for session in sessions:
+            path = session.get("world")
+            if path and path not in packed:
+                try:
+                    packed[path] = PackedWorld.publish(_load_world(path))
+                except (OSError, ValueError):
+                    # Let the worker report the broken world file
+                    packed[path] = None
+            yield dict(session, packed_world=packed[path]) if path and packed[path] else session
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # A sliding window of chunks rather than pool.map(), which would
+            # read and queue every session before yielding the first result
+            pending = deque()
+            for chunk in _chunks(with_packed_worlds(sessions), BATCH_CHUNK):
+                pending.append(pool.submit(_run_chunk, runner, chunk))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+    finally:
+        for world in packed.values():
+            if world is not None:
+                world.close()
+
+
+def main_batch(paths: List[str], workers: int = 1, output: str = None, transcript: bool = True) -> int:
+    """Run scripted sessions and write one JSON result per line"""
+    out = open(output, 'w', encoding='utf-8') if output else sys.stdout
+    failures = 0
+    try:
+        for result in run_batch(read_sessions(paths or ["-"]), workers or os.cpu_count(), transcript):
+            failures += not result["ok"]
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if failures else 0
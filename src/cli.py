@@ -4,9 +4,9 @@ Command Line Interface for AI Text Adventure
 
 import sys
 import argparse
-from engine import GameEngine, GameState
-from dungeon_master import AIDungeonMaster
-from ai_player import AIPlayer, AutoPlayer, AIvsAI
+
+# Game modules are imported inside the modes that need them so that each
+# short-lived CLI process only pays for what its --mode uses.
 
 
 class GameCLI:
@@ -14,7 +14,15 @@ class GameCLI:
 
     def __init__(self):
         self.engine = None
-        self.dm = AIDungeonMaster()
+        self._dm = None
+
+    @property
+    def dm(self):
+        """Dungeon master, created on first use"""
+        if self._dm is None:
+            from dungeon_master import AIDungeonMaster
+            self._dm = AIDungeonMaster()
+        return self._dm
 
     def print_banner(self):
         """Print game banner"""
@@ -25,15 +33,28 @@ class GameCLI:
 ╚═════════════════════════════════════════════════════════╝
 """)
 
-    def start_interactive_game(self, player_name: str = "Hero"):
-        """Start interactive game"""
+    def start_interactive_game(self, player_name: str = "Hero", endless_seed: int = None):
+        """Start interactive game, in an endless generated world if a seed is given"""
+        from engine import GameEngine, GameState
+        from quests import QuestTracker
+        from world_clock import WorldClock
+
         self.print_banner()
         print(self.dm.introduce_game())
         print()
 
         # Initialize game
-        self.engine = GameEngine(player_name=player_name)
-        self.engine.initialize_world()
+        if endless_seed is not None:
+            from endless_world import EndlessWorld
+            self.engine = EndlessWorld(seed=endless_seed).new_session(player_name)
+        else:
+            self.engine = GameEngine(player_name=player_name)
+            self.engine.initialize_world()
+        quests = QuestTracker(self.engine)
+        for message in quests.take_messages():
+            print(message)
+        clock = WorldClock()
+        clock.attach(self.engine)
 
         # Game loop
         while self.engine.state == GameState.PLAYING:
@@ -45,9 +66,9 @@ class GameCLI:
             # Describe scene
             description = self.dm.describe_scene(scene, {
                 "player_health": self.engine.player.health,
-                "time_of_day": "day"
+                **clock.context()
             })
-            print(f"\n📍 {scene.name}")
+            print(f"\n📍 {scene.name}  🕰️ {clock.clock_text()}")
             print(description)
             print()
 
@@ -64,22 +85,29 @@ class GameCLI:
             # Process action
             result, new_scene = self.engine.process_action(action)
             print(f"\n{result}")
+            for message in quests.take_messages() + clock.take_messages():
+                print(message)
 
             # Check win/lose conditions
             if self.engine.state == GameState.WON:
                 print(self.dm.congratulate_victory(self.engine.player.name))
                 break
             elif self.engine.state == GameState.LOST:
-                print("\n💀 游戏结束..."
+                print("\n💀 游戏结束...")
                 break
 
     def start_ai_vs_ai(self):
         """Start AI vs AI mode"""
+        from ai_player import AIvsAI
+
         self.print_banner()
         print("\n🤖 AI对战模式\n")
 
         # Create different AI players
+        from ratings import PlaystyleRatings
+
         tournament = AIvsAI()
+        tournament.ratings = PlaystyleRatings()
         players_config = [
             {"name": "勇者A", "playstyle": "aggressive"},
             {"name": "智者B", "playstyle": "cautious"},
@@ -111,8 +139,15 @@ class GameCLI:
 
             print(f"\n🏆 胜者: {result['winner']}")
 
+        print("\n📈 风格评分 (Elo):")
+        for row in tournament.ratings.leaderboard():
+            print(f"  {row['playstyle']}: {row['rating']:.0f} ({row['wins']}胜 {row['draws']}平 {row['losses']}负)")
+
     def watch_ai_play(self, playstyle: str = "balanced"):
         """Watch AI play the game"""
+        from engine import GameEngine
+        from ai_player import AIPlayer, AutoPlayer
+
         self.print_banner()
         print(f"\n🤖 AI玩家模式 (风格: {playstyle})\n")
 
@@ -175,18 +210,31 @@ class GameCLI:
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description="AI Text Adventure Game")
-    parser.add_argument("--mode", choices=["play", "ai-vs-ai", "watch-ai"], default="play",
+    parser.add_argument("--mode", choices=["play", "ai-vs-ai", "watch-ai", "batch"], default="play",
                        help="Game mode")
     parser.add_argument("--player", default="Hero", help="Player name")
     parser.add_argument("--playstyle", choices=["aggressive", "cautious", "balanced", "explorer"],
                        default="balanced", help="AI playstyle")
+    parser.add_argument("--endless", action="store_true", help="Play mode: endless generated world")
+    parser.add_argument("--seed", type=int, default=0, help="Play mode: seed of the endless world")
+    parser.add_argument("--script", nargs="*", default=["-"],
+                       help="Batch mode: command scripts or .jsonl session files, - for stdin")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Batch mode: worker processes (0 = one per CPU)")
+    parser.add_argument("--output", default=None, help="Batch mode: write results here instead of stdout")
+    parser.add_argument("--no-transcript", action="store_true",
+                       help="Batch mode: omit per-command results")
 
     args = parser.parse_args()
 
+    if args.mode == "batch":
+        from batch import main_batch
+        sys.exit(main_batch(args.script, args.workers, args.output, not args.no_transcript))
+
     cli = GameCLI()
 
     if args.mode == "play":
-        cli.start_interactive_game(args.player)
+        cli.start_interactive_game(args.player, args.seed if args.endless else None)
     elif args.mode == "ai-vs-ai":
         cli.start_ai_vs_ai()
     elif args.mode == "watch-ai":
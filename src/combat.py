@@ -0,0 +1,156 @@
+"""
+Combat - Turn-based fight resolution
+Resolves single fights for play and thousands at once for balance simulations
+"""
+
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, batches fall back to pure Python
+    np = None
+
+# Creatures by difficulty tier
+CREATURES = {
+    1: ["小史莱姆", "野鼠", "迷路的旅人"],
+    2: ["哥布林", "狼", "强盗"],
+    3: ["兽人", "巨蜘蛛", "黑暗骑士"],
+    4: ["幼龙", "恶魔", "古老巫妖"]
+}
+_CREATURE_TIERS = {creature: tier for tier, names in CREATURES.items() for creature in names}
+
+PLAYER_ATTACK = 10
+MAX_ROUNDS = 50
+
+
+def encounter_stats(difficulty: int) -> Dict[str, int]:
+    """Health and attack of an enemy of the given difficulty"""
+    return {"health": difficulty * 20, "attack": difficulty * 5}
+
+
+def creature_difficulty(name: str) -> int:
+    """Difficulty tier of a named creature, 1 for unknown NPCs"""
+    return _CREATURE_TIERS.get(name, 1)
+
+
+def roll_damage(attack: int, rng=random) -> int:
+    """Damage of one hit: uniform between half and one and a half times attack"""
+    low = attack // 2
+    return low + int(rng.random() * (attack + 1))
+
+
+@dataclass
+class FightResult:
+    """Outcome of one fight"""
+    player_won: bool
+    rounds: int
+    player_health: int
+    enemy_health: int
+
+
+def resolve_fight(player_health: int, player_attack: int, enemy_health: int, enemy_attack: int,
+                  rng=random, max_rounds: int = MAX_ROUNDS) -> FightResult:
+    """Fight until one side drops; the player strikes first each round
+
+    A fight still undecided after max_rounds counts as lost.
+    """
+    rounds = 0
+    while rounds < max_rounds:
+        rounds += 1
+        enemy_health -= roll_damage(player_attack, rng)
+        if enemy_health <= 0:
+            return FightResult(True, rounds, player_health, 0)
+        player_health -= roll_damage(enemy_attack, rng)
+        if player_health <= 0:
+            return FightResult(False, rounds, 0, enemy_health)
+    return FightResult(False, rounds, player_health, enemy_health)
+
+
+Stat = Union[int, Sequence[int]]
+
+
+@dataclass
+class BatchResult:
+    """Outcomes of many fights, one list entry per fight"""
+    player_won: List[bool]
+    rounds: List[int]
+    player_health: List[int]
+
+    def __len__(self) -> int:
+        return len(self.player_won)
+
+    def summary(self) -> Dict:
+        """Win rate and averages over all fights"""
+        count = len(self) or 1
+        return {
+            "fights": len(self),
+            "win_rate": sum(self.player_won) / count,
+            "mean_rounds": sum(self.rounds) / count,
+            "mean_player_health": sum(self.player_health) / count
+        }
+
+
+def _broadcast(value: Stat, count: int) -> List[int]:
+    return [value] * count if isinstance(value, int) else list(value)
+
+
+def resolve_batch(player_health: Stat, player_attack: Stat, enemy_health: Stat, enemy_attack: Stat,
+                  count: int = None, seed: Optional[int] = None, max_rounds: int = MAX_ROUNDS,
+                  use_numpy: bool = None) -> BatchResult:
+    """Resolve many independent fights at once
+
+    Each stat is a single value shared by every fight or one value per
+    fight. With numpy every round is rolled for all remaining fights in one
+    vectorized step; without it fights are resolved one by one with the
+    same rules.
+    """
+    if count is None:
+        count = next((len(s) for s in (player_health, player_attack, enemy_health, enemy_attack)
+                      if not isinstance(s, int)), 1)
+    stats = [_broadcast(s, count) for s in (player_health, player_attack, enemy_health, enemy_attack)]
+    if any(len(s) != count for s in stats):
+        raise ValueError("Per-fight stats must all have the same length")
+
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy:
+        return _resolve_batch_numpy(*stats, seed=seed, max_rounds=max_rounds)
+
+    rng = random.Random(seed)
+    results = [resolve_fight(*fight, rng=rng, max_rounds=max_rounds) for fight in zip(*stats)]
+    return BatchResult([r.player_won for r in results], [r.rounds for r in results],
+                       [r.player_health for r in results])
+
+
+def _resolve_batch_numpy(player_health, player_attack, enemy_health, enemy_attack,
+                         seed: Optional[int], max_rounds: int) -> BatchResult:
+    rng = np.random.default_rng(seed)
+    player_health = np.array(player_health, dtype=np.int64)
+    enemy_health = np.array(enemy_health, dtype=np.int64)
+    player_low = np.array(player_attack, dtype=np.int64) // 2
+    player_high = player_low + np.array(player_attack, dtype=np.int64) + 1
+    enemy_low = np.array(enemy_attack, dtype=np.int64) // 2
+    enemy_high = enemy_low + np.array(enemy_attack, dtype=np.int64) + 1
+
+    count = len(player_health)
+    player_won = np.zeros(count, dtype=bool)
+    rounds = np.zeros(count, dtype=np.int64)
+    active = np.arange(count)
+
+    for _ in range(max_rounds):
+        if not active.size:
+            break
+        rounds[active] += 1
+        enemy_health[active] -= rng.integers(player_low[active], player_high[active])
+        won = enemy_health[active] <= 0
+        player_won[active[won]] = True
+        active = active[~won]
+
+        player_health[active] -= rng.integers(enemy_low[active], enemy_high[active])
+        lost = player_health[active] <= 0
+        player_health[active[lost]] = 0
+        active = active[~lost]
+
+    return BatchResult(player_won.tolist(), rounds.tolist(), player_health.tolist())
@@ -0,0 +1,229 @@
+"""
+Command Parser - Natural-language input matching
+Resolves free-text input to a scene option through a tokenized index
+"""
+
+import math
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from engine import Scene
+
+# Phrases rewritten to a canonical form on both sides before tokenizing
+SYNONYMS = {
+    "查看": "检查",
+    "观察": "检查",
+    "搜索": "检查",
+    "搜寻": "检查",
+    "前往": "走",
+    "进入": "进",
+    "回到": "返回",
+    "撤退": "逃跑",
+    "攻击": "战斗",
+    "look": "search",
+    "examine": "search",
+    "go": "move",
+    "walk": "move",
+    "attack": "fight",
+    "run": "flee",
+    "bag": "inventory",
+    "items": "inventory",
+    "exit": "quit",
+}
+
+# Words that name an action type, matched against each option's "action"
+ACTION_VERBS = {
+    "search": ("检查", "寻找", "找", "search"),
+    "move": ("走", "去", "进", "move"),
+    "fight": ("战斗", "打", "武器", "fight"),
+    "flee": ("逃跑", "逃", "flee"),
+    "inventory": ("背包", "inventory"),
+    "quit": ("退出", "quit"),
+    "restart": ("重新", "再玩", "restart"),
+}
+
+_RUNS = re.compile(r"[㐀-鿿]+|[a-z0-9]+")
+
+
+def _alternation(phrases) -> "re.Pattern":
+    """Regex matching any phrase, longest first"""
+    return re.compile("|".join(sorted(map(re.escape, phrases), key=len, reverse=True)))
+
+
+_SYNONYM_PATTERN = _alternation(SYNONYMS)
+_VERB_ACTIONS = {verb: action for action, verbs in ACTION_VERBS.items() for verb in verbs}
+_VERB_PATTERN = _alternation(_VERB_ACTIONS)
+
+# Relative weight of token kinds
+_UNIGRAM = 1.0
+_BIGRAM = 2.0
+_WORD = 2.0
+_ACTION = 1.5
+
+
+def normalize(text: str) -> str:
+    """Lowercase and rewrite synonyms"""
+    return _SYNONYM_PATTERN.sub(lambda m: SYNONYMS[m.group(0)], text.lower())
+
+
+def tokenize(text: str) -> Dict[str, float]:
+    """Character n-grams for Chinese text, words for everything else
+
+    Action verbs become a single "@action" token instead of text tokens.
+    """
+    return _tokenize_normalized(normalize(text))
+
+
+def _tokenize_normalized(text: str) -> Dict[str, float]:
+    tokens: Dict[str, float] = {}
+
+    def verb(match) -> str:
+        tokens["@" + _VERB_ACTIONS[match.group(0)]] = _ACTION
+        return " "
+
+    text = _VERB_PATTERN.sub(verb, text)
+    for run in _RUNS.findall(text):
+        if run[0] >= "㐀":
+            for i, char in enumerate(run):
+                tokens[char] = _UNIGRAM
+                if i + 1 < len(run):
+                    tokens[run[i:i + 2]] = _BIGRAM
+        else:
+            tokens[run] = _WORD
+    return tokens
+
+
+@dataclass
+class ParseMatch:
+    """An option that free-text input could refer to"""
+    index: int
+    option: Dict
+    score: float
+
+
+class _SceneIndex:
+    """Inverted index over one scene's options"""
+
+    __slots__ = ("options", "postings", "norms", "chars")
+
+    def __init__(self, options: List[Dict]):
+        self.options = options
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        self.norms: List[float] = []
+
+        documents = []
+        for opt in options:
+            tokens = tokenize(opt.get("text", ""))
+            action = opt.get("action")
+            if action:
+                # The option's own action is its only verb: verbs in its text
+                # ("寻找其他路径" is a move) would match inputs meant for others
+                tokens = {token: weight for token, weight in tokens.items() if not token.startswith("@")}
+                tokens["@" + action] = _ACTION
+            documents.append(tokens)
+
+        document_frequency: Dict[str, int] = {}
+        for tokens in documents:
+            for token in tokens:
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+
+        count = len(documents)
+        for index, tokens in enumerate(documents):
+            norm = 0.0
+            for token, weight in tokens.items():
+                weight *= math.log(1 + count / document_frequency[token])
+                self.postings.setdefault(token, []).append((index, weight))
+                norm += weight
+            self.norms.append(norm or 1.0)
+
+        # Every character of a text token, so input sharing none can be
+        # rejected without tokenizing it
+        self.chars = frozenset(char for token in self.postings if not token.startswith("@") for char in token)
+
+
+class CommandParser:
+    """Resolves free text to options in time independent of world size
+
+    Each scene's options are compiled once into an inverted index and cached
+    by option list, so edited scenes are recompiled on their next lookup.
+    Input that fits two options about equally well, such as a bare verb
+    in a scene with two exits, is ambiguous and resolves to nothing.
+    """
+
+    def __init__(self, min_score: float = 0.35, cache_size: int = 10000, margin: float = 0.05):
+        self.min_score = min_score
+        self.margin = margin
+        self.cache_size = cache_size
+        self._indexes: "OrderedDict[int, _SceneIndex]" = OrderedDict()
+        # Engines on many threads share DEFAULT_PARSER and its cache
+        self._lock = threading.Lock()
+
+    def compile(self, scenes) -> int:
+        """Precompile the index for every scene of a world"""
+        for scene in scenes.values():
+            self._index(scene)
+        return len(self._indexes)
+
+    def _index(self, scene: "Scene") -> _SceneIndex:
+        key = id(scene.options)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None and index.options is scene.options:
+                self._indexes.move_to_end(key)
+                return index
+
+        # Compiled outside the lock; two threads may both compile a new scene
+        index = _SceneIndex(scene.options)
+        with self._lock:
+            self._indexes[key] = index
+            self._indexes.move_to_end(key)
+            if len(self._indexes) > self.cache_size:
+                self._indexes.popitem(last=False)
+        return index
+
+    def rank(self, scene: "Scene", text: str) -> List[ParseMatch]:
+        """Score every option the input shares tokens with, best first"""
+        text = normalize(text)
+        index = self._index(scene)
+        if index.chars.isdisjoint(text) and _VERB_PATTERN.search(text) is None:
+            return []
+        query = _tokenize_normalized(text)
+        if not query:
+            return []
+
+        scores: Dict[int, float] = {}
+        query_weight = 0.0
+        for token, weight in query.items():
+            postings = index.postings.get(token)
+            if postings is None:
+                if not token.startswith("@"):
+                    query_weight += weight
+                continue
+            best = max(w for _, w in postings)
+            query_weight += weight
+            for option_index, option_weight in postings:
+                scores[option_index] = scores.get(option_index, 0.0) + weight * option_weight / best
+
+        matches = []
+        for option_index, matched in scores.items():
+            # Blend how much of the input and how much of the option matched
+            coverage = matched / query_weight if query_weight else 0.0
+            precision = min(1.0, matched / index.norms[option_index])
+            score = 0.7 * coverage + 0.3 * precision
+            matches.append(ParseMatch(option_index, index.options[option_index], score))
+
+        matches.sort(key=lambda m: (-m.score, m.index))
+        return matches
+
+    def parse(self, scene: "Scene", text: str) -> Optional[ParseMatch]:
+        """Best match above min_score that leads the runner-up by margin, or None"""
+        matches = self.rank(scene, text)
+        if not matches or matches[0].score < self.min_score:
+            return None
+        if len(matches) > 1 and matches[0].score - matches[1].score < self.margin:
+            return None
+        return matches[0]
@@ -4,46 +4,66 @@ Uses AI to create immersive game scenarios
 """
 
 import random
+import time
 from typing import Dict, List, Optional
+from combat import CREATURES, encounter_stats
 from engine import Scene, GameEngine
+from events import ActionProcessed, Event, Moved
+
+# Story element tables are shared by every dungeon master and never mutated
+STORY_ELEMENTS = {
+    "locations": {
+        "forest": ["ancient trees", "mystical fog", "hidden paths", "wild creatures"],
+        "castle": ["stone walls", "towering spires", "dark dungeons", "royal guards"],
+        "village": ["thatched cottages", "busy market", "friendly villagers", "mysterious stranger"],
+        "cave": ["glowing crystals", "underground lake", "ancient drawings", "echoing sounds"]
+    },
+    "creatures": {
+        "friendly": ["wise owl", "helpful fairy", "talking tree", "magical creature"],
+        "neutral": ["wandering merchant", "lost traveler", "mysterious hermit"],
+        "hostile": ["fierce goblin", "ancient dragon", "dark sorcerer", "wild beast"]
+    },
+    "items": {
+        "treasure": ["golden coin", "ancient artifact", "magic ring", "precious gem"],
+        "utility": ["old map", "rusty key", "healing potion", "mysterious note"],
+        "weapon": ["sharp sword", "magic staff", "ancient bow", "protective shield"]
+    },
+    "events": {
+        "discovery": ["You discover a hidden passage", "You find an ancient artifact", "You uncover a secret"],
+        "danger": ["A creature attacks!", "A trap triggers!", "The ground shakes!"],
+        "mystery": ["You hear strange sounds", "You see a shadow move", "You feel watched"]
+    }
+}
 
 
 class AIDungeonMaster:
     """AI-powered game master for dynamic storytelling"""
 
-    def __init__(self):
+    def __init__(self, rng: random.Random = None):
+        self.rng = rng if rng is not None else random
         self.personalities = ["epic", "mysterious", "humorous", "dark"]
-        self.current_personality = random.choice(self.personalities)
+        self.current_personality = self.rng.choice(self.personalities)
         self.story_elements = self._load_story_elements()
+        self.metrics = None
+        self.narrative: List[str] = []
 
     def _load_story_elements(self) -> Dict:
         """Load story elements for dynamic generation"""
-        return {
-            "locations": {
-                "forest": ["ancient trees", "mystical fog", "hidden paths", "wild creatures"],
-                "castle": ["stone walls", "towering spires", "dark dungeons", "royal guards"],
-                "village": ["thatched cottages", "busy market", "friendly villagers", "mysterious stranger"],
-                "cave": ["glowing crystals", "underground lake", "ancient drawings", "echoing sounds"]
-            },
-            "creatures": {
-                "friendly": ["wise owl", "helpful fairy", "talking tree", "magical creature"],
-                "neutral": ["wandering merchant", "lost traveler", "mysterious hermit"],
-                "hostile": ["fierce goblin", "ancient dragon", "dark sorcerer", "wild beast"]
-            },
-            "items": {
-                "treasure": ["golden coin", "ancient artifact", "magic ring", "precious gem"],
-                "utility": ["old map", "rusty key", "healing potion", "mysterious note"],
-                "weapon": ["sharp sword", "magic staff", "ancient bow", "protective shield"]
-            },
-            "events": {
-                "discovery": ["You discover a hidden passage", "You find an ancient artifact", "You uncover a secret"],
-                "danger": ["A creature attacks!", "A trap triggers!", "The ground shakes!"],
-                "mystery": ["You hear strange sounds", "You see a shadow move", "You feel watched"]
-            }
-        }
+        return STORY_ELEMENTS
 
     def describe_scene(self, scene: Scene, context: Dict = None) -> str:
         """Generate an engaging scene description"""
+        if self.metrics is None:
+            return self._describe_scene(scene, context)
+
+        start = time.perf_counter()
+        description = self._describe_scene(scene, context)
+        self.metrics.observe("dm_describe_scene_seconds", time.perf_counter() - start,
+                             personality=self.current_personality)
+        return description
+
+    def _describe_scene(self, scene: Scene, context: Dict = None) -> str:
+        """Build the scene description"""
         if not context:
             context = {}
 
@@ -173,36 +193,59 @@ class AIDungeonMaster:
         }
 
         action_responses = responses.get(action, ["你执行了操作。"])
-        return random.choice(action_responses)
-
-    def create_random_scene(self, scene_id: str, location_type: str = "forest") -> Scene:
-        """Generate a random scene based on location type"""
+        return self.rng.choice(action_responses)
+
+    def narrate_events(self, events: List[Event]) -> List[str]:
+        """Turn a batch of engine events into narrative lines
+
+        Meant to be subscribed to an EventBus in batched or async mode.
+        """
+        lines = []
+        for event in events:
+            if isinstance(event, Moved):
+                lines.append(StoryTeller.format_action(f"前往 {event.to_scene}"))
+            elif isinstance(event, ActionProcessed) and event.action_type in ("fight", "flee", "search"):
+                lines.append(self.resolve_action(event.action_type, None))
+        self.narrative.extend(lines)
+        return lines
+
+    def create_random_scene(self, scene_id: str, location_type: str = "forest",
+                            exits: Dict[str, str] = None) -> Scene:
+        """Generate a random scene based on location type
+
+        `exits` maps option text to target scene ids; without it the scene
+        has a single "继续前进" exit to the scene "next".
+        """
         elements = self.story_elements
 
         # Get location elements
         loc_features = elements["locations"].get(location_type, elements["locations"]["forest"])
 
+        if exits is None:
+            exits = {"继续前进": "next"}
+
         # Create scene
         scene = Scene(
             id=scene_id,
             name=f"随机{location_type}",
-            description=f"你来到一个地方，{' '.join(random.sample(loc_features, 2))}。",
+            description=f"你来到一个地方，{' '.join(self.rng.sample(loc_features, 2))}。",
             options=[
-                {"text": "继续前进", "action": "move", "target": "next"},
+                {"text": text, "action": "move", "target": target} for text, target in exits.items()
+            ] + [
                 {"text": "仔细观察", "action": "search"},
                 {"text": "休息", "action": "rest"}
             ]
         )
 
         # Add random items
-        if random.random() > 0.5:
+        if self.rng.random() > 0.5:
             all_items = elements["items"]["treasure"] + elements["items"]["utility"]
-            scene.items = [random.choice(all_items)]
+            scene.items = [self.rng.choice(all_items)]
 
         # Add random NPC
-        if random.random() > 0.6:
+        if self.rng.random() > 0.6:
             all_creatures = elements["creatures"]["friendly"] + elements["creatures"]["hostile"]
-            scene.npcs = [random.choice(all_creatures)]
+            scene.npcs = [self.rng.choice(all_creatures)]
 
         return scene
 
@@ -229,19 +272,11 @@ class AIDungeonMaster:
 
     def generate_encounter(self, difficulty: int = 1) -> Dict:
         """Generate a random encounter"""
-        creatures = {
-            1: ["小史莱姆", "野鼠", "迷路的旅人"],
-            2: ["哥布林", "狼", "强盗"],
-            3: ["兽人", "巨蜘蛛", "黑暗骑士"],
-            4: ["幼龙", "恶魔", "古老巫妖"]
-        }
-
-        creature = random.choice(creatures.get(min(difficulty, 4), creatures[4]))
+        creature = self.rng.choice(CREATURES.get(min(difficulty, 4), CREATURES[4]))
 
         return {
             "creature": creature,
-            "health": difficulty * 20,
-            "attack": difficulty * 5,
+            **encounter_stats(difficulty),
             "description": f"一只{creature}出现了！"
         }
 
@@ -0,0 +1,271 @@
+"""
+Endless World - Procedurally generated, unbounded worlds
+Scenes are generated per chunk from a seed and their coordinates as players move
+"""
+
+import json
+import os
+import random
+import shutil
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import replace
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from engine import GameEngine, Scene
+from dungeon_master import AIDungeonMaster, STORY_ELEMENTS
+
+LOCATION_NAMES = {"forest": "森林", "castle": "城堡", "village": "村庄", "cave": "洞穴"}
+
+# Exit option text and coordinate offset for each direction
+DIRECTIONS = (("向北走", 0, 1), ("向南走", 0, -1), ("向东走", 1, 0), ("向西走", -1, 0))
+
+
+def scene_id(x: int, y: int) -> str:
+    """Scene id of the scene at (x, y)"""
+    return f"{x},{y}"
+
+
+def parse_scene_id(scene_id: str) -> Optional[Tuple[int, int]]:
+    """Coordinates of an endless-world scene id, or None"""
+    try:
+        x, y = scene_id.split(",")
+        return int(x), int(y)
+    except (AttributeError, ValueError):
+        return None
+
+
+class EndlessWorld(Mapping):
+    """Unbounded grid of scenes, generated a chunk at a time
+
+    Every chunk is generated from the world seed and its coordinates, so it
+    comes out the same whenever it is generated again. At most cache_chunks
+    chunks are kept in memory. Generated scenes are shared by every session
+    and never changed; what a player changes (visited scenes, taken items,
+    defeated NPCs) belongs to their session, see _SessionScenes. Sessions
+    spill changes to spill_dir when they have too many; without one, those
+    changes are dropped.
+
+    As a Mapping it answers lookups for any coordinate but only iterates
+    the scenes currently in memory.
+    """
+
+    def __init__(self, seed: int = 0, chunk_size: int = 8, cache_chunks: int = 64,
+                 spill_dir: str = None):
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.cache_chunks = cache_chunks
+        self.spill_dir = spill_dir
+        self._chunks: "OrderedDict[Tuple[int, int], Dict[str, Scene]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"generated": 0, "evicted": 0, "spilled": 0, "reloaded": 0}
+        self.world_data = {
+            "name": "无尽世界",
+            "description": "一个随着脚步不断延伸的世界",
+            "start_scene": scene_id(0, 0),
+            "scenes": {},
+            "seed": seed
+        }
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def chunk_key(self, scene_id_: str) -> Tuple[int, int]:
+        """The chunk a scene id belongs to"""
+        x, y = parse_scene_id(scene_id_)
+        return x // self.chunk_size, y // self.chunk_size
+
+    def _chunk(self, key: Tuple[int, int]) -> Dict[str, Scene]:
+        with self._lock:
+            chunk = self._chunks.get(key)
+            if chunk is not None:
+                self._chunks.move_to_end(key)
+                return chunk
+
+        # Generated outside the lock; a chunk generated twice comes out the same
+        chunk = self._generate(key)
+        with self._lock:
+            self.stats["generated"] += 1
+            chunk = self._chunks.setdefault(key, chunk)
+            self._chunks.move_to_end(key)
+            if len(self._chunks) > self.cache_chunks:
+                self._chunks.popitem(last=False)
+                self.stats["evicted"] += 1
+        return chunk
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _generate(self, key: Tuple[int, int]) -> Dict[str, Scene]:
+        """Generate every scene of a chunk, deterministically"""
+        cx, cy = key
+        dm = AIDungeonMaster(rng=random.Random(f"{self.seed}:{cx}:{cy}"))
+        locations = sorted(STORY_ELEMENTS["locations"])
+
+        scenes = {}
+        for x in range(cx * self.chunk_size, (cx + 1) * self.chunk_size):
+            for y in range(cy * self.chunk_size, (cy + 1) * self.chunk_size):
+                location = dm.rng.choice(locations)
+                exits = {text: scene_id(x + dx, y + dy) for text, dx, dy in DIRECTIONS}
+                scene = dm.create_random_scene(scene_id(x, y), location, exits=exits)
+                scenes[scene.id] = replace(scene, name=f"{LOCATION_NAMES.get(location, location)} ({x}, {y})")
+        return scenes
+
+    def __getitem__(self, key: str) -> Scene:
+        if parse_scene_id(key) is None:
+            raise KeyError(key)
+        return self._chunk(self.chunk_key(key))[key]
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and parse_scene_id(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            chunks = list(self._chunks.values())
+        for chunk in chunks:
+            yield from chunk
+
+    def __len__(self) -> int:
+        return len(self._chunks) * self.chunk_size ** 2
+
+    def cache_stats(self) -> Dict:
+        """Chunk cache occupancy and traffic"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats.update({"cached_chunks": len(self._chunks), "cached_scenes": len(self)})
+        return stats
+
+    def new_session(self, player_name: str = "Hero", max_delta: int = 256) -> "EndlessGameEngine":
+        """Create a player session in this world"""
+        return EndlessGameEngine(self, player_name, max_delta)
+
+
+class _SessionScenes(Mapping):
+    """One session's view of an EndlessWorld: its own changed scenes over the generated ones
+
+    Changed scenes are grouped by chunk, and at most the world's
+    cache_chunks groups stay in memory. The least recently used group is
+    written to spill_dir/<session_id>/ and read back on its next lookup,
+    or dropped without a spill_dir. Spilled changes are kept until close(),
+    so the directory grows with the number of chunks the player changed.
+    """
+
+    def __init__(self, world: EndlessWorld, session_id: str):
+        self.world = world
+        self.session_id = session_id
+        self._changed: "OrderedDict[Tuple[int, int], Dict[str, Scene]]" = OrderedDict()
+        self._spilled: Set[Tuple[int, int]] = set()
+        self._lock = threading.Lock()
+
+    def _spill_path(self, key: Tuple[int, int]) -> str:
+        return os.path.join(self.world.spill_dir, self.session_id, f"{key[0]}_{key[1]}.json")
+
+    def _changes(self, key: Tuple[int, int], create: bool = False) -> Optional[Dict[str, Scene]]:
+        with self._lock:
+            return self._changes_locked(key, create)
+
+    def _changes_locked(self, key: Tuple[int, int], create: bool) -> Optional[Dict[str, Scene]]:
+        changes = self._changed.get(key)
+        if changes is not None:
+            self._changed.move_to_end(key)
+            return changes
+
+        if key in self._spilled:
+            self._spilled.discard(key)
+            with open(self._spill_path(key), 'r', encoding='utf-8') as f:
+                changes = {scene_id_: Scene(**scene_data) for scene_id_, scene_data in json.load(f).items()}
+            self.world._count("reloaded")
+        elif create:
+            changes = {}
+        else:
+            return None
+
+        self._changed[key] = changes
+        if len(self._changed) > self.world.cache_chunks:
+            self._spill(*self._changed.popitem(last=False))
+        return changes
+
+    def _spill(self, key: Tuple[int, int], changes: Dict[str, Scene]):
+        if not self.world.spill_dir:
+            return
+        path = self._spill_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({scene_id_: vars(scene) for scene_id_, scene in changes.items()},
+                               ensure_ascii=False))
+        self._spilled.add(key)
+        self.world._count("spilled")
+
+    def close(self):
+        """Forget this session's changes and remove its spill files"""
+        with self._lock:
+            self._changed.clear()
+            self._spilled.clear()
+            if self.world.spill_dir:
+                shutil.rmtree(os.path.join(self.world.spill_dir, self.session_id), ignore_errors=True)
+
+    def store(self, scenes: Iterable[Scene]):
+        """Keep this session's modified scenes"""
+        for scene in scenes:
+            self._changes(self.world.chunk_key(scene.id), create=True)[scene.id] = scene
+
+    def __getitem__(self, key: str) -> Scene:
+        if parse_scene_id(key) is None:
+            raise KeyError(key)
+        changes = self._changes(self.world.chunk_key(key))
+        if changes is not None and key in changes:
+            return changes[key]
+        return self.world[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.world
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.world
+
+    def __len__(self) -> int:
+        return len(self.world)
+
+
+class EndlessGameEngine(GameEngine):
+    """Game engine exploring an EndlessWorld
+
+    Scenes the player changes collect in the scene delta as usual. Once the
+    delta holds more than max_delta scenes, all but the current scene are
+    handed to the session's own _SessionScenes, so memory stays bounded
+    however far the player travels and other sessions never see them.
+    Snapshots only cover changes still in the delta. Call close() when the
+    session ends to remove its spill files; a restart removes them too.
+    """
+
+    _KEPT_ON_RESTART = GameEngine._KEPT_ON_RESTART + ("world", "max_delta")
+
+    def __init__(self, world: EndlessWorld, player_name: str = "Hero", max_delta: int = 256):
+        super().__init__(player_name)
+        self.world = world
+        self.max_delta = max_delta
+        self.initialize_world()
+
+    def initialize_world(self, world_data: Dict = None, scenes: Dict[str, Scene] = None):
+        """Enter the endless world at its origin"""
+        # A restart starts a fresh session, the old one's changes are gone
+        if getattr(self, "session_scenes", None) is not None:
+            self.session_scenes.close()
+        self.session_scenes = _SessionScenes(self.world, self.game_id)
+        super().initialize_world(self.world.world_data, scenes=self.session_scenes)
+
+    def process_action(self, action: str):
+        """Process an action, then move older scene changes out of the delta"""
+        result = super().process_action(action)
+        if len(self.scenes.delta) > self.max_delta:
+            current = self.current_scene.id if self.current_scene else None
+            older = [scene for scene in self.scenes.delta.values() if scene.id != current]
+            self.session_scenes.store(older)
+            for scene in older:
+                del self.scenes.delta[scene.id]
+        return result
+
+    def close(self):
+        """End the session and remove its spill files"""
+        self.session_scenes.close()
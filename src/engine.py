@@ -5,11 +5,24 @@ Core game logic and state management
 
 import json
 import random
+import time
+import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from dataclasses import dataclass, asdict, fields, replace
 from enum import Enum
 
+from combat import PLAYER_ATTACK, creature_difficulty, encounter_stats, resolve_fight
+from command_parser import CommandParser
+from events import ActionProcessed, ItemFound, Moved, NpcDefeated, StateChanged
+
+
+# Results of actions that were accepted but achieved nothing
+RESULT_BLOCKED = "无法前往该方向"
+RESULT_NOTHING_FOUND = "什么都没发现"
+RESULT_NO_ENEMY = "这里没有敌人"
+
 
 class GameState(Enum):
     """Game states"""
@@ -34,6 +47,23 @@ class Player:
             self.inventory = []
         if self.quests is None:
             self.quests = []
+        self.__dict__["_dirty"] = set()
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        dirty = self.__dict__.get("_dirty")
+        if dirty is not None:
+            dirty.add(name)
+
+    def mark_dirty(self, *names: str):
+        """Record in-place changes to list fields, which assignment tracking misses"""
+        self._dirty.update(names)
+
+    def take_dirty(self) -> Set[str]:
+        """Fields changed since the last call"""
+        dirty = self._dirty
+        self.__dict__["_dirty"] = set()
+        return dirty
 
 
 @dataclass
@@ -56,148 +86,378 @@ class Scene:
             self.npcs = []
 
 
+# The default world is defined once at module level and its Scene table is
+# built on first use. Loaded worlds are read-only, so every engine shares both.
+DEFAULT_WORLD = {
+    "name": "神秘王国",
+    "description": "一个充满魔法和冒险的奇幻世界",
+    "start_scene": "forest_entrance",
+    "scenes": {
+        "forest_entrance": {
+            "id": "forest_entrance",
+            "name": "森林入口",
+            "description": "你站在一片神秘森林的入口。古树参天，阳光透过树叶洒下斑驳的光影。远处的树林中传来奇怪的声音。",
+            "options": [
+                {"text": "走进森林深处", "action": "move", "target": "deep_forest"},
+                {"text": "寻找其他路径", "action": "move", "target": "path"},
+                {"text": "检查周围环境", "action": "search"},
+                {"text": "查看背包", "action": "inventory"}
+            ],
+            "items": ["地图"],
+            "npcs": []
+        },
+        "deep_forest": {
+            "id": "deep_forest",
+            "name": "森林深处",
+            "description": "你深入森林，周围的光线变暗。突然，你听到前方有动静！",
+            "options": [
+                {"text": "悄悄接近", "action": "sneak"},
+                {"text": "大声喝问", "action": "shout"},
+                {"text": "转身逃跑", "action": "flee"},
+                {"text": "拔出武器", "action": "fight"}
+            ],
+            "items": [],
+            "npcs": ["哥布林"]
+        },
+        "path": {
+            "id": "path",
+            "name": "小路",
+            "description": "你发现了一条隐蔽的小路，通向远处的一座小山。路上似乎有人走过的痕迹。",
+            "options": [
+                {"text": "沿着小路前进", "action": "move", "target": "hill"},
+                {"text": "返回森林入口", "action": "move", "target": "forest_entrance"},
+                {"text": "检查痕迹", "action": "search"}
+            ],
+            "items": [],
+            "npcs": []
+        },
+        "victory": {
+            "id": "victory",
+            "name": "胜利",
+            "description": "恭喜！你完成了冒险！",
+            "options": [
+                {"text": "再玩一次", "action": "restart"},
+                {"text": "退出游戏", "action": "quit"}
+            ],
+            "items": [],
+            "npcs": []
+        }
+    },
+    "quests": [
+        {
+            "id": "find_map",
+            "name": "寻找地图",
+            "description": "在森林入口附近找到一张地图",
+            "conditions": [{"item": "地图"}],
+            "rewards": {"gold": 10}
+        },
+        {
+            "id": "clear_forest",
+            "name": "清理森林",
+            "description": "深入森林，击败盘踞在那里的哥布林",
+            "conditions": [{"enter": "deep_forest"}, {"defeat": "哥布林"}],
+            "rewards": {"gold": 30, "health": 10}
+        }
+    ],
+    "triggers": [
+        {
+            "id": "path_footprints",
+            "on": {"enter": "path"},
+            "effects": {"message": "你注意到小路上有新鲜的脚印，通向远处的小山。"}
+        }
+    ]
+}
+
+_default_scenes: Optional[Dict[str, "Scene"]] = None
+
+# Fields sent to clients by GameEngine.sync()
+PLAYER_SYNC_FIELDS = tuple(f.name for f in fields(Player))
+SCENE_SYNC_FIELDS = ("name", "description", "options", "items", "npcs")
+
+# Free-text fallback shared by all engines; its per-scene indexes are cached
+DEFAULT_PARSER = CommandParser()
+
+
+class SceneTable(Mapping):
+    """Scene lookup layered as an immutable base world plus a small delta
+
+    Scenes are treated as values: the engine never mutates a Scene in place,
+    it stores a modified copy in the delta instead. This lets forks and
+    snapshots share the base world and copy only the delta.
+    """
+
+    def __init__(self, base: Mapping, delta: Dict[str, Scene] = None):
+        self.base = base
+        self.delta = delta if delta is not None else {}
+
+    def __getitem__(self, scene_id: str) -> Scene:
+        scene = self.delta.get(scene_id)
+        if scene is None:
+            return self.base[scene_id]
+        return scene
+
+    def __contains__(self, scene_id) -> bool:
+        return scene_id in self.delta or scene_id in self.base
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.base
+        for scene_id in self.delta:
+            if scene_id not in self.base:
+                yield scene_id
+
+    def __len__(self) -> int:
+        return len(self.base) + sum(1 for scene_id in self.delta if scene_id not in self.base)
+
+    def put(self, scene: Scene):
+        """Store a modified scene in the delta"""
+        self.delta[scene.id] = scene
+
+    def fork(self) -> "SceneTable":
+        """Copy the delta and share the base"""
+        return SceneTable(self.base, dict(self.delta))
+
+
+@dataclass(frozen=True)
+class EngineSnapshot:
+    """Point-in-time engine state, see GameEngine.snapshot()"""
+    player: Player
+    state: GameState
+    scene_id: Optional[str]
+    scenes: SceneTable
+    history: List[Dict]
+    history_length: int
+    game_id: str
+    rng_state: Optional[tuple] = None
+
+
+def _log_change(changes: Dict[str, int], key: str, version: int):
+    """Move a key to the end of the change log with a new version"""
+    changes.pop(key, None)
+    changes[key] = version
+
+
 class GameEngine:
     """Main game engine"""
 
-    def __init__(self, player_name: str = "Hero"):
+    # Attributes carried over when the game restarts
+    _KEPT_ON_RESTART = ("clock", "rng", "timeline", "metrics", "events", "parser", "version")
+
+    def __init__(self, player_name: str = "Hero", clock: Callable[[], datetime] = None,
+                 rng: random.Random = None):
+        self.clock = clock or datetime.now
+        self.rng = rng or random.Random()
         self.player = Player(name=player_name)
         self.state = GameState.START
         self.current_scene: Optional[Scene] = None
         self.history: List[Dict] = []
-        self.game_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
+        # The timestamp keeps ids readable, the random suffix keeps them unique
+        self.game_id = f"{self.clock().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:12]}"
+        self.record_history = True
+        self._history_shared = False
+        self.timeline = None
+        self.metrics = None
+        self.events = None
+        self.parser = DEFAULT_PARSER
+
+        # Edited worlds handed over by another thread, see queue_world_patch()
+        self._world_patches: List[Tuple] = []
+
         # World data
-        self.scenes = {}
+        self.scenes = SceneTable({})
         self.world_data = {}
 
-    def initialize_world(self, world_data: Dict = None):
-        """Initialize game world"""
+        # State sync: changes are versioned when a client syncs, see sync()
+        self.version = 0
+        self._sync_base = 0
+        self._changes: Dict[str, int] = {}
+        self._synced_player = self.player
+        self._synced_state = self.state
+        self._synced_scene: Optional[Scene] = None
+
+    def initialize_world(self, world_data: Dict = None, scenes: Dict[str, Scene] = None):
+        """Initialize game world, optionally sharing a prebuilt scene table"""
         if world_data is None:
             world_data = self._generate_default_world()
 
         self.world_data = world_data
-        self.scenes = {
-            scene_id: Scene(**scene_data)
-            for scene_id, scene_data in world_data.get("scenes", {}).items()
-        }
+        self.scenes = SceneTable(scenes if scenes is not None else self._build_scenes(world_data))
 
         # Start at first scene
         first_scene_id = world_data.get("start_scene", "forest_entrance")
         if first_scene_id in self.scenes:
             self.current_scene = self.scenes[first_scene_id]
 
-        self.state = GameState.PLAYING
+        self._set_state(GameState.PLAYING)
+        self._reset_sync()
 
     def _generate_default_world(self) -> Dict:
         """Generate a default fantasy world"""
-        return {
-            "name": "神秘王国",
-            "description": "一个充满魔法和冒险的奇幻世界",
-            "start_scene": "forest_entrance",
-            "scenes": {
-                "forest_entrance": {
-                    "id": "forest_entrance",
-                    "name": "森林入口",
-                    "description": "你站在一片神秘森林的入口。古树参天，阳光透过树叶洒下斑驳的光影。远处的树林中传来奇怪的声音。",
-                    "options": [
-                        {"text": "走进森林深处", "action": "move", "target": "deep_forest"},
-                        {"text": "寻找其他路径", "action": "move", "target": "path"},
-                        {"text": "检查周围环境", "action": "search"},
-                        {"text": "查看背包", "action": "inventory"}
-                    ],
-                    "items": ["地图"],
-                    "npcs": []
-                },
-                "deep_forest": {
-                    "id": "deep_forest",
-                    "name": "森林深处",
-                    "description": "你深入森林，周围的光线变暗。突然，你听到前方有动静！",
-                    "options": [
-                        {"text": "悄悄接近", "action": "sneak"},
-                        {"text": "大声喝问", "action": "shout"},
-                        {"text": "转身逃跑", "action": "flee"},
-                        {"text": "拔出武器", "action": "fight"}
-                    ],
-                    "items": [],
-                    "npcs": ["哥布林"]
-                },
-                "path": {
-                    "id": "path",
-                    "name": "小路",
-                    "description": "你发现了一条隐蔽的小路，通向远处的一座小山。路上似乎有人走过的痕迹。",
-                    "options": [
-                        {"text": "沿着小路前进", "action": "move", "target": "hill"},
-                        {"text": "返回森林入口", "action": "move", "target": "forest_entrance"},
-                        {"text": "检查痕迹", "action": "search"}
-                    ],
-                    "items": [],
-                    "npcs": []
-                },
-                "victory": {
-                    "id": "victory",
-                    "name": "胜利",
-                    "description": "恭喜！你完成了冒险！",
-                    "options": [
-                        {"text": "再玩一次", "action": "restart"},
-                        {"text": "退出游戏", "action": "quit"}
-                    ],
-                    "items": [],
-                    "npcs": []
-                }
-            }
+        return DEFAULT_WORLD
+
+    @staticmethod
+    def _build_scenes(world_data: Dict) -> Dict[str, Scene]:
+        """Build the base scene table, reusing the prebuilt default world"""
+        global _default_scenes
+
+        if world_data is DEFAULT_WORLD and _default_scenes is not None:
+            return _default_scenes
+
+        scenes = {
+            scene_id: Scene(**scene_data)
+            for scene_id, scene_data in world_data.get("scenes", {}).items()
         }
+        if world_data is DEFAULT_WORLD:
+            _default_scenes = scenes
+        return scenes
 
     def process_action(self, action: str) -> Tuple[str, Optional[Scene]]:
         """Process player action and return result"""
+        if self._world_patches:
+            self._apply_world_patches()
         if not self.current_scene:
             return "游戏未初始化", None
 
+        start = time.perf_counter() if self.metrics is not None else 0.0
+
         # Find the option matching the action
-        option = None
-        for opt in self.current_scene.options:
-            if action.lower() in opt["text"].lower() or action == str(self.current_scene.options.index(opt) + 1):
-                option = opt
-                break
+        option = self._match_option(action)
 
         if not option:
-            return "无效的选择，请重试", self.current_scene
+            result = "无效的选择，请重试", self.current_scene
+            action_type = "invalid"
+        else:
+            # Record action
+            scene_id = self.current_scene.id
+            self._record_action(action, option)
+
+            # Process the action
+            result = self._dispatch(option)
+            action_type = option.get("action", "")
+
+            if self.timeline is not None:
+                self.timeline.record(action)
+
+            if self.events is not None:
+                self.events.publish(ActionProcessed(
+                    self.game_id, scene_id, action, action_type, result[0],
+                    result[0] not in (RESULT_BLOCKED, RESULT_NOTHING_FOUND, RESULT_NO_ENEMY)
+                    and self.state != GameState.LOST
+                ))
+
+        if self.metrics is not None:
+            self.metrics.observe("engine_action_seconds", time.perf_counter() - start,
+                                 action=action_type or "unknown")
+
+        return result
 
-        # Record action
-        self._record_action(action, option)
+    def _match_option(self, action: str) -> Optional[Dict]:
+        """Find the current scene option an input refers to"""
+        for opt in self.current_scene.options:
+            if action.lower() in opt["text"].lower() or action == str(self.current_scene.options.index(opt) + 1):
+                return opt
+
+        # Fall back to the natural-language parser for free text
+        if self.parser is not None:
+            match = self.parser.parse(self.current_scene, action)
+            if match is not None:
+                return match.option
+        return None
 
-        # Process the action
+    def _dispatch(self, option: Dict) -> Tuple[str, Optional[Scene]]:
+        """Apply a matched option to the game state"""
         action_type = option.get("action", "")
 
         if action_type == "move":
             target = option.get("target")
             if target and target in self.scenes:
+                from_scene = self.current_scene.id
                 self.current_scene = self.scenes[target]
-                self.current_scene.visited = True
+                self._mark_visited()
+                if self.events is not None:
+                    self.events.publish(Moved(self.game_id, from_scene, target))
+                if target == self.world_data.get("victory_scene", "victory"):
+                    self._set_state(GameState.WON)
                 return self._get_scene_description(), self.current_scene
-            return "无法前往该方向", self.current_scene
+            return RESULT_BLOCKED, self.current_scene
 
         elif action_type == "search":
             items_found = self._search_area()
             if items_found:
                 self.player.inventory.extend(items_found)
+                self.player.mark_dirty("inventory")
+                if self.metrics is not None:
+                    self.metrics.inc("engine_items_found_total", len(items_found))
+                if self.events is not None:
+                    self.events.publish(ItemFound(self.game_id, self.current_scene.id, tuple(items_found)))
                 return f"你发现了: {', '.join(items_found)}", self.current_scene
-            return "什么都没发现", self.current_scene
+            return RESULT_NOTHING_FOUND, self.current_scene
+
+        elif action_type == "fight":
+            return self._fight(), self.current_scene
 
         elif action_type == "inventory":
             return f"背包: {', '.join(self.player.inventory) if self.player.inventory else '空'}", self.current_scene
 
         elif action_type == "quit":
-            self.state = GameState.QUIT
+            self._set_state(GameState.QUIT)
             return "游戏结束", None
 
         elif action_type == "restart":
-            self.__init__(self.player.name)
-            self.initialize_world()
+            self._restart()
             return "游戏重新开始！", self.current_scene
 
         else:
             return f"执行了: {option['text']}", self.current_scene
 
+    def _fight(self) -> str:
+        """Fight the first NPC in the current scene"""
+        if not self.current_scene.npcs:
+            return RESULT_NO_ENEMY
+
+        npc = self.current_scene.npcs[0]
+        difficulty = creature_difficulty(npc)
+        enemy = encounter_stats(difficulty)
+        outcome = resolve_fight(self.player.health, PLAYER_ATTACK, enemy["health"], enemy["attack"],
+                                rng=self.rng)
+        self.player.health = outcome.player_health
+        if self.metrics is not None:
+            self.metrics.inc("engine_fights_total", outcome="won" if outcome.player_won else "lost")
+
+        if not outcome.player_won:
+            self._set_state(GameState.LOST)
+            return f"你被{npc}击败了……"
+
+        reward = difficulty * 10
+        self.player.gold += reward
+        scene_id = self.current_scene.id
+        self._defeat_npc(npc)
+        if self.events is not None:
+            self.events.publish(NpcDefeated(self.game_id, scene_id, npc))
+        return f"经过{outcome.rounds}回合的战斗，你击败了{npc}！获得{reward}金币，剩余生命{outcome.player_health}"
+
+    def _defeat_npc(self, npc: str):
+        """Remove a defeated NPC from the current scene"""
+        self._update_scene(npcs=[n for n in self.current_scene.npcs if n != npc])
+
+    def _set_state(self, state: GameState):
+        """Change the game state and announce it"""
+        old_state, self.state = self.state, state
+        if self.events is not None and old_state != state:
+            self.events.publish(StateChanged(self.game_id, old_state.value, state.value))
+
+    def _restart(self):
+        """Start over in the same world, keeping attached components
+
+        The base scene table is reused rather than rebuilt from world_data,
+        which for a PackedWorld carries no scenes.
+        """
+        kept = {name: getattr(self, name) for name in self._KEPT_ON_RESTART}
+        world_data = self.world_data
+        base = self.scenes.base if world_data else None
+        GameEngine.__init__(self, self.player.name)
+        self.__dict__.update(kept)
+        self.initialize_world(world_data or None, scenes=base)
+
     def _get_scene_description(self) -> str:
         """Get current scene description with dynamic elements"""
         if not self.current_scene:
@@ -224,24 +484,282 @@ class GameEngine:
         """Search current area for items"""
         if self.current_scene and self.current_scene.items:
             items = self.current_scene.items.copy()
-            self.current_scene.items = []
+            self._update_scene(items=[])
             return items
         return []
 
+    def _mark_visited(self):
+        """Mark the current scene as visited"""
+        if not self.current_scene.visited:
+            self._update_scene(visited=True)
+
+    def _update_scene(self, **changes):
+        """Replace the current scene with a modified copy"""
+        self.current_scene = replace(self.current_scene, **changes)
+        self.scenes.put(self.current_scene)
+
+    def modify_scene(self, scene_id: str, change: Callable[[Scene], Scene]) -> Optional[Scene]:
+        """Replace any scene with change(scene), e.g. for timed world events"""
+        if scene_id not in self.scenes:
+            return None
+        scene = change(self.scenes[scene_id])
+        self.scenes.put(scene)
+        if self.current_scene is not None and self.current_scene.id == scene_id:
+            self.current_scene = scene
+        return scene
+
     def _record_action(self, action: str, option: Dict):
         """Record action to history"""
+        if not self.record_history:
+            return
+        if self._history_shared:
+            self.history = list(self.history)
+            self._history_shared = False
         self.history.append({
-            "time": datetime.now().isoformat(),
+            "time": self.clock().isoformat(),
             "scene": self.current_scene.id if self.current_scene else None,
             "action": action,
             "option": option
         })
 
+    def trim_history(self, keep: int) -> int:
+        """Drop all but the last `keep` history records, returning how many were dropped"""
+        dropped = max(0, len(self.history) - keep)
+        if dropped:
+            # A new list, so snapshots and forks sharing the old one are unaffected
+            self.history = self.history[dropped:]
+            self._history_shared = False
+        return dropped
+
+    def queue_world_patch(self, world_data: Dict, old_base: Mapping, base: Mapping,
+                          changed: Dict[str, List[str]], removed: List[str]):
+        """Hand over an edited world from another thread
+
+        The patch is applied by the session's own thread before its next
+        action, and only if the session is still on old_base.
+        """
+        self._world_patches.append((world_data, old_base, base, changed, removed))
+
+    def world_base(self) -> Mapping:
+        """The base scene table this session is on once queued patches are applied"""
+        patches = self._world_patches
+        return patches[-1][2] if patches else self.scenes.base
+
+    def _apply_world_patches(self):
+        # A patch stays queued until applied, so world_base() is right throughout
+        while self._world_patches:
+            world_data, old_base, base, changed, removed = self._world_patches[0]
+            if self.scenes.base is old_base:
+                self.apply_world_patch(world_data, changed, removed, base)
+            self._world_patches.pop(0)
+
+    def apply_world_patch(self, world_data: Dict, changed: Dict[str, List[str]], removed: List[str],
+                          base: Mapping = None):
+        """Adopt an edited world, switching to a new base scene table if given
+
+        `changed` maps scene ids to the authored fields that changed. Runtime
+        state in the delta is kept unless the authored value was edited.
+        """
+        self.world_data = world_data
+        if base is not None:
+            self.scenes.base = base
+        delta = self.scenes.delta
+
+        for scene_id in removed:
+            delta.pop(scene_id, None)
+
+        for scene_id, fields in changed.items():
+            runtime = delta.get(scene_id)
+            if runtime is None:
+                continue
+            authored = self.scenes.base[scene_id]
+            keep = {"visited": runtime.visited}
+            for name in ("items", "npcs"):
+                if name not in fields:
+                    keep[name] = getattr(runtime, name)
+            delta[scene_id] = replace(authored, **keep)
+
+        if self.current_scene:
+            current = self.scenes.get(self.current_scene.id)
+            if current is None:
+                current = self.scenes.get(world_data.get("start_scene", "forest_entrance"))
+            self.current_scene = current
+
+    def _reset_sync(self):
+        """Start a new sync base, so every client gets the full state next"""
+        self.player.take_dirty()
+        self.version += 1
+        self._sync_base = self.version
+        self._changes.clear()
+        self._synced_player = self.player
+        self._synced_state = self.state
+        self._synced_scene = self.current_scene
+
+    def _commit_changes(self):
+        """Log what changed since the last commit under a new version
+
+        Runs when a client syncs, so playing costs nothing extra and changes
+        between syncs share a version. Scenes are replaced rather than
+        mutated, so a changed current scene is found by identity and only
+        its sync fields are compared.
+        """
+        player = self.player
+        scene = self.current_scene
+        if (player is self._synced_player and not player._dirty
+                and self.state is self._synced_state and scene is self._synced_scene):
+            return
+        if player is not self._synced_player:
+            self._reset_sync()
+            return
+
+        changes = self._changes
+        version = self.version + 1
+        if player._dirty:
+            for name in player.take_dirty():
+                if name in PLAYER_SYNC_FIELDS:
+                    _log_change(changes, "player." + name, version)
+        if self.state is not self._synced_state:
+            self._synced_state = self.state
+            _log_change(changes, "state", version)
+        if scene is not self._synced_scene:
+            previous, self._synced_scene = self._synced_scene, scene
+            if previous is None or scene is None or previous.id != scene.id:
+                _log_change(changes, "scene", version)
+            else:
+                for name in SCENE_SYNC_FIELDS:
+                    if getattr(previous, name) != getattr(scene, name):
+                        _log_change(changes, "scene." + name, version)
+
+        if changes and next(reversed(changes.values())) == version:
+            self.version = version
+
+    @staticmethod
+    def _sync_value(value):
+        return list(value) if isinstance(value, list) else value
+
+    def _scene_sync_value(self, name: str):
+        if name == "options":
+            return [opt["text"] for opt in self.current_scene.options]
+        return self._sync_value(getattr(self.current_scene, name))
+
+    def _scene_sync_dict(self) -> Optional[Dict]:
+        if self.current_scene is None:
+            return None
+        scene = {"id": self.current_scene.id}
+        scene.update((name, self._scene_sync_value(name)) for name in SCENE_SYNC_FIELDS)
+        return scene
+
+    def _player_dict(self) -> Dict:
+        """Player fields as a dict, copying only the lists"""
+        return {name: self._sync_value(getattr(self.player, name)) for name in PLAYER_SYNC_FIELDS}
+
+    def sync(self, since: int = 0) -> Dict:
+        """State changes after version `since`, for a client that has applied it
+
+        A client starts with since=0, applies the result with apply_sync()
+        and passes back its "version" next time. The reply holds only the
+        changed player fields, the state if it changed, and the current
+        scene (whole after a move, else only its changed fields). It is
+        "full" when the client predates a restart or world change.
+        """
+        self._commit_changes()
+        if since < self._sync_base:
+            return {
+                "version": self.version,
+                "full": True,
+                "state": self.state.value,
+                "player": self._player_dict(),
+                "scene": self._scene_sync_dict()
+            }
+
+        delta: Dict = {"version": self.version}
+        player: Dict = {}
+        scene: Dict = {}
+        moved = False
+        for key, version in reversed(self._changes.items()):
+            if version <= since:
+                break
+            if key == "state":
+                delta["state"] = self.state.value
+            elif key == "scene":
+                moved = True
+            elif key.startswith("player."):
+                player[key[7:]] = self._sync_value(getattr(self.player, key[7:]))
+            elif self.current_scene is not None:
+                scene[key[6:]] = self._scene_sync_value(key[6:])
+        if player:
+            delta["player"] = player
+        if moved:
+            delta["scene"] = self._scene_sync_dict()
+        elif scene:
+            delta["scene"] = scene
+        return delta
+
+    def fork(self, record_history: bool = True, rng: random.Random = None) -> "GameEngine":
+        """Create a cheap independent copy for look-ahead search
+
+        The world is shared, only the scene delta and player are copied and
+        history is shared by reference until either side appends to it.
+        The fork rolls with its own rng (fresh unless one is given), so
+        look-ahead cannot see this game's upcoming combat rolls and does
+        not consume them.
+        """
+        child = GameEngine.__new__(GameEngine)
+        child.__dict__.update(self.__dict__)
+        child.player = self._copy_player(self.player)
+        child.scenes = self.scenes.fork()
+        child.rng = rng if rng is not None else random.Random()
+        child._changes = dict(self._changes)
+        child._synced_player = child.player
+        child.record_history = record_history
+        child.timeline = None
+        child.metrics = None
+        child.events = None
+        child._history_shared = True
+        child._world_patches = []
+        self._history_shared = True
+        return child
+
+    def snapshot(self) -> EngineSnapshot:
+        """Capture the current state for a later restore()"""
+        return EngineSnapshot(
+            player=self._copy_player(self.player),
+            state=self.state,
+            scene_id=self.current_scene.id if self.current_scene else None,
+            scenes=self.scenes.fork(),
+            history=self.history,
+            history_length=len(self.history),
+            game_id=self.game_id,
+            rng_state=self.rng.getstate()
+        )
+
+    def restore(self, snapshot: EngineSnapshot):
+        """Return to a state captured by snapshot()"""
+        self.player = self._copy_player(snapshot.player)
+        self.state = snapshot.state
+        self.game_id = snapshot.game_id
+        if snapshot.rng_state is not None:
+            self.rng.setstate(snapshot.rng_state)
+        self.scenes = snapshot.scenes.fork()
+        self.current_scene = self.scenes.get(snapshot.scene_id) if snapshot.scene_id else None
+
+        if len(snapshot.history) == snapshot.history_length:
+            self.history = snapshot.history
+            self._history_shared = True
+        else:
+            self.history = snapshot.history[:snapshot.history_length]
+            self._history_shared = False
+
+    @staticmethod
+    def _copy_player(player: Player) -> Player:
+        """Copy a player including its mutable lists"""
+        return replace(player, inventory=list(player.inventory), quests=list(player.quests))
+
     def get_status(self) -> Dict:
         """Get current game status"""
         return {
             "state": self.state.value,
-            "player": asdict(self.player),
+            "player": self._player_dict(),
             "current_scene": self.current_scene.id if self.current_scene else None,
             "history_length": len(self.history)
         }
@@ -292,3 +810,19 @@ class GameEngine:
 
         summary += f"\n总行动数: {len(self.history)}"
         return summary
+
+
+def apply_sync(state: Dict, delta: Dict) -> Dict:
+    """Merge a GameEngine.sync() reply into a client's copy of the state"""
+    if delta.get("full"):
+        state.clear()
+    state["version"] = delta["version"]
+    for key in ("state", "player", "scene"):
+        if key not in delta:
+            continue
+        value = delta[key]
+        if key == "state" or value is None or "id" in value or not isinstance(state.get(key), dict):
+            state[key] = value
+        else:
+            state[key].update(value)
+    return state
@@ -0,0 +1,196 @@
+"""
+Events - In-process event bus for the game engine
+Typed engine events with synchronous, batched and async-drained subscribers
+"""
+
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+
+@dataclass(frozen=True)
+class Event:
+    """Base class for engine events"""
+    game_id: str
+
+
+@dataclass(frozen=True)
+class ActionProcessed(Event):
+    """An input matched an option and was applied"""
+    scene_id: str
+    action: str
+    action_type: str
+    result: str
+    success: bool
+
+
+@dataclass(frozen=True)
+class Moved(Event):
+    """The player entered another scene"""
+    from_scene: str
+    to_scene: str
+
+
+@dataclass(frozen=True)
+class ItemFound(Event):
+    """The player picked up items"""
+    scene_id: str
+    items: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class NpcDefeated(Event):
+    """The player won a fight against an NPC"""
+    scene_id: str
+    npc: str
+
+
+@dataclass(frozen=True)
+class QuestStarted(Event):
+    """A quest became active"""
+    quest_id: str
+
+
+@dataclass(frozen=True)
+class QuestCompleted(Event):
+    """All of a quest's conditions were met"""
+    quest_id: str
+
+
+@dataclass(frozen=True)
+class StateChanged(Event):
+    """The game state changed, e.g. to won, lost or quit"""
+    old_state: str
+    new_state: str
+
+
+SYNC = "sync"
+BATCHED = "batched"
+ASYNC = "async"
+
+_STOP = object()
+
+
+class Subscription:
+    """A handler registered for one event type"""
+
+    def __init__(self, bus: "EventBus", event_type: Type[Event], handler: Callable,
+                 mode: str, batch_size: int):
+        self.bus = bus
+        self.event_type = event_type
+        self.handler = handler
+        self.mode = mode
+        self.batch_size = batch_size
+        self.buffer: List[Event] = []
+        self.queue: Optional[queue.SimpleQueue] = None
+        self.thread: Optional[threading.Thread] = None
+
+        if mode == ASYNC:
+            self.queue = queue.SimpleQueue()
+            self.thread = threading.Thread(target=self._drain, daemon=True)
+            self.thread.start()
+
+    def deliver(self, event: Event):
+        if self.mode == SYNC:
+            self.handler(event)
+        elif self.mode == BATCHED:
+            self.buffer.append(event)
+            if len(self.buffer) >= self.batch_size:
+                self.flush()
+        else:
+            self.queue.put(event)
+
+    def flush(self):
+        """Hand buffered events to a batched handler"""
+        if self.buffer:
+            batch, self.buffer = self.buffer, []
+            self.handler(batch)
+
+    def _drain(self):
+        """Worker loop for async subscribers: deliver whatever has queued up"""
+        while True:
+            event = self.queue.get()
+            batch = []
+            while event is not _STOP:
+                batch.append(event)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    event = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self.handler(batch)
+                except Exception as e:
+                    self.bus.errors.append(e)
+            if event is _STOP:
+                return
+
+    def close(self):
+        """Deliver everything pending and stop the worker"""
+        if self.mode == BATCHED:
+            self.flush()
+        elif self.mode == ASYNC and self.thread is not None:
+            self.queue.put(_STOP)
+            self.thread.join()
+            self.thread = None
+
+
+class EventBus:
+    """Routes engine events to subscribers
+
+    Sync handlers get each event on the publishing thread. Batched handlers
+    get lists of events once batch_size have accumulated or on flush().
+    Async handlers get lists of events on their own worker thread, which
+    keeps slow consumers off the turn's critical path.
+    """
+
+    def __init__(self):
+        self._subscriptions: List[Subscription] = []
+        self._routes: Dict[type, Tuple[Subscription, ...]] = {}
+        self.errors: List[Exception] = []
+
+    def subscribe(self, event_type: Type[Event], handler: Callable, mode: str = SYNC,
+                  batch_size: int = 100) -> Subscription:
+        """Register a handler for an event type and its subclasses"""
+        if mode not in (SYNC, BATCHED, ASYNC):
+            raise ValueError(f"Unknown subscription mode: {mode}")
+        subscription = Subscription(self, event_type, handler, mode, batch_size)
+        self._subscriptions.append(subscription)
+        self._routes.clear()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscription, delivering anything it still holds"""
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+            self._routes.clear()
+            subscription.close()
+
+    def publish(self, event: Event):
+        """Deliver an event to every matching subscriber"""
+        event_class = type(event)
+        route = self._routes.get(event_class)
+        if route is None:
+            route = self._routes[event_class] = tuple(
+                s for s in self._subscriptions if issubclass(event_class, s.event_type)
+            )
+        for subscription in route:
+            subscription.deliver(event)
+
+    def flush(self):
+        """Deliver buffered events to batched subscribers"""
+        for subscription in self._subscriptions:
+            subscription.flush()
+
+    def close(self):
+        """Drain, stop and remove every subscription
+
+        Events published afterwards reach no one until handlers subscribe again.
+        """
+        subscriptions, self._subscriptions = self._subscriptions, []
+        self._routes.clear()
+        for subscription in subscriptions:
+            subscription.close()
@@ -0,0 +1,212 @@
+"""
+Load Generator - Find a host's scaling limit
+Drives N simulated AIPlayer clients and reports turn latency percentiles
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from engine import DEFAULT_WORLD, GameEngine, GameState
+from ai_player import PLAYSTYLES, AIPlayer
+from shared_world import SharedWorld
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class LoadGenerator:
+    """Runs simulated clients at increasing concurrency levels
+
+    Each client is an AIPlayer with its own session that thinks for
+    think_time seconds (with ±50% jitter) between turns. In "isolated" mode
+    every client has a private world; in "shared" mode all clients play in
+    one SharedWorld and contend for its scenes.
+    """
+
+    def __init__(self, world_data: Dict = None, mode: str = "isolated", think_time: float = 0.0,
+                 seed: int = 0):
+        if mode not in ("isolated", "shared"):
+            raise ValueError(f"Unknown load mode: {mode}")
+        self.world_data = world_data if world_data is not None else DEFAULT_WORLD
+        self.mode = mode
+        self.think_time = think_time
+        self.seed = seed
+
+    def _new_session(self, shared_world: SharedWorld, name: str) -> GameEngine:
+        if shared_world is not None:
+            return shared_world.new_session(name)
+        engine = GameEngine(player_name=name)
+        engine.initialize_world(self.world_data)
+        return engine
+
+    def _client(self, index: int, shared_world: SharedWorld, deadline: List[float],
+                latencies: List[float], errors: List[Dict], start_barrier: threading.Barrier):
+        """Play one client until the deadline, recording the exception that ends it early"""
+        started = False
+        try:
+            rng = random.Random(self.seed * 100003 + index)
+            player = AIPlayer(name=f"bot{index}", playstyle=PLAYSTYLES[index % len(PLAYSTYLES)], rng=rng,
+                              keep_history=False)
+            engine = self._new_session(shared_world, player.name)
+            start_barrier.wait()
+            started = True
+            deadline = deadline[0]
+
+            while time.perf_counter() < deadline:
+                if engine.state != GameState.PLAYING or not engine.current_scene:
+                    engine = self._new_session(shared_world, player.name)
+                action = player.choose_action(engine.current_scene, engine)
+
+                start = time.perf_counter()
+                engine.process_action(action)
+                latencies.append(time.perf_counter() - start)
+
+                if self.think_time:
+                    time.sleep(self.think_time * rng.uniform(0.5, 1.5))
+        except Exception as error:
+            errors.append({"client": index, "turns": len(latencies), "error": f"{type(error).__name__}: {error}"})
+            # The other clients must still be released if setup failed
+            if not started:
+                start_barrier.wait()
+
+    def run_level(self, clients: int, duration: float) -> Dict:
+        """Run `clients` concurrent clients for `duration` seconds"""
+        shared_world = SharedWorld(self.world_data) if self.mode == "shared" else None
+        per_client: List[List[float]] = [[] for _ in range(clients)]
+        errors: List[Dict] = []
+        barrier = threading.Barrier(clients + 1)
+        # Set before the barrier releases the clients, read by them after it
+        deadline = [0.0]
+
+        threads = [
+            threading.Thread(target=self._client, args=(i, shared_world, deadline, per_client[i], errors, barrier),
+                             daemon=True)
+            for i in range(clients)
+        ]
+        for thread in threads:
+            thread.start()
+
+        start = time.perf_counter()
+        deadline[0] = start + duration
+        barrier.wait()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(value for values in per_client for value in values)
+        level = {
+            "clients": clients,
+            "turns": len(latencies),
+            "seconds": elapsed,
+            "turns_per_second": len(latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 0.50) * 1e3,
+            "p90_ms": percentile(latencies, 0.90) * 1e3,
+            "p99_ms": percentile(latencies, 0.99) * 1e3,
+            "max_ms": latencies[-1] * 1e3 if latencies else 0.0,
+            "failed_clients": len(errors),
+            "errors": sorted(errors, key=lambda error: error["client"])
+        }
+        if shared_world is not None:
+            level["contention"] = shared_world.contention_stats()
+        return level
+
+    def ramp(self, levels: List[int], duration: float,
+             on_level: Callable[[Dict], None] = None) -> Dict:
+        """Run each concurrency level in turn and build a report"""
+        results = []
+        for clients in levels:
+            results.append(self.run_level(clients, duration))
+            if on_level is not None:
+                on_level(results[-1])
+
+        return {
+            "metadata": {
+                "timestamp": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count()
+            },
+            "config": {
+                "mode": self.mode,
+                "think_time": self.think_time,
+                "duration": duration,
+                "seed": self.seed,
+                "world": self.world_data.get("name")
+            },
+            "levels": results
+        }
+
+
+def compare_reports(current: Dict, previous: Dict) -> List[str]:
+    """Describe the change per concurrency level between two reports"""
+    previous_levels = {level["clients"]: level for level in previous.get("levels", [])}
+    lines = []
+    for level in current["levels"]:
+        before = previous_levels.get(level["clients"])
+        if before is None:
+            continue
+        lines.append(
+            f"{level['clients']:>5} clients: p99 {before['p99_ms']:.3f} -> {level['p99_ms']:.3f} ms, "
+            f"{before['turns_per_second']:.0f} -> {level['turns_per_second']:.0f} turns/sec"
+        )
+    return lines
+
+
+def main(argv: List[str] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Load-test the game engine with simulated clients")
+    parser.add_argument("--levels", default="1,2,4,8,16", help="Comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per level")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean think time between turns")
+    parser.add_argument("--mode", choices=["isolated", "shared"], default="isolated",
+                        help="Private worlds per client, or one shared world")
+    parser.add_argument("--world", default=None, help="World JSON file")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--out", default=None, help="Write the report JSON here")
+    parser.add_argument("--compare", default=None, help="Previous report to compare against")
+    args = parser.parse_args(argv)
+
+    world_data = None
+    if args.world:
+        with open(args.world, 'r', encoding='utf-8') as f:
+            world_data = json.load(f)
+
+    generator = LoadGenerator(world_data, args.mode, args.think_ms / 1e3, args.seed)
+    levels = [int(level) for level in args.levels.split(",") if level]
+
+    def print_level(level: Dict):
+        print(f"{level['clients']:>7} {level['turns_per_second']:>10.0f} {level['p50_ms']:>9.3f} "
+              f"{level['p90_ms']:>9.3f} {level['p99_ms']:>9.3f}")
+        for error in level["errors"]:
+            print(f"        客户端 {error['client']} 在第 {error['turns']} 回合后出错: {error['error']}")
+
+    print(f"{'clients':>7} {'turns/s':>10} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}")
+    report = generator.ramp(levels, args.duration, on_level=print_level)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            for line in compare_reports(report, json.load(f)):
+                print(line)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Packed World - Read-only worlds in shared memory
+Packs scenes, options and a string pool into one block that worker processes attach to
+"""
+
+import json
+import struct
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterator, List, Optional
+
+from engine import Scene
+
+MAGIC = b"TAW1"
+NONE = 0xFFFFFFFF
+
+# magic, strings, scenes, options, refs, hash slots, meta string, pool bytes
+_HEADER = struct.Struct("=4sIIIIIII")
+_SCENE_FIELDS = 10  # key, id, name, description, options start/count, items start/count, npcs start/count
+_OPTION_FIELDS = 4  # text, action, target, other keys as JSON
+
+# Blocks attached in this process, by name
+_attached: Dict[str, "PackedWorld"] = {}
+
+
+class _StringPool:
+    """Deduplicating string table used while packing"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.strings: List[bytes] = []
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        number = self.index.get(value)
+        if number is None:
+            number = self.index[value] = len(self.strings)
+            self.strings.append(value.encode("utf-8"))
+        return number
+
+
+def _slot(key: bytes, slots: int) -> int:
+    # crc32 rather than hash(): string hashes differ between processes
+    return zlib.crc32(key) & (slots - 1)
+
+
+def pack_world(world_data: Dict) -> bytes:
+    """Serialize a world into the packed layout"""
+    pool = _StringPool()
+    scene_rows = array("I")
+    option_rows = array("I")
+    refs = array("I")
+
+    scenes = list(world_data.get("scenes", {}).items())
+    for key, scene in scenes:
+        options = scene.get("options") or []
+        items = scene.get("items") or []
+        npcs = scene.get("npcs") or []
+        scene_rows.extend((
+            pool.add(key), pool.add(scene["id"]),
+            pool.add(scene.get("name", "")), pool.add(scene.get("description", "")),
+            len(option_rows) // _OPTION_FIELDS, len(options),
+            len(refs), len(items), len(refs) + len(items), len(npcs)
+        ))
+        for option in options:
+            extra = {k: v for k, v in option.items() if k not in ("text", "action", "target")}
+            option_rows.extend((
+                pool.add(option.get("text", "")), pool.add(option.get("action", "")),
+                pool.add(option.get("target")),
+                pool.add(json.dumps(extra, ensure_ascii=False)) if extra else NONE
+            ))
+        refs.extend(pool.add(item) for item in items)
+        refs.extend(pool.add(npc) for npc in npcs)
+
+    # Open-addressing table from scene id to scene number + 1, at most half full
+    slots = 1
+    while slots < 2 * max(1, len(scenes)):
+        slots *= 2
+    table = array("I", bytes(4 * slots))
+    for number, (key, _) in enumerate(scenes):
+        slot = _slot(key.encode("utf-8"), slots)
+        while table[slot]:
+            slot = (slot + 1) & (slots - 1)
+        table[slot] = number + 1
+
+    meta = pool.add(json.dumps({k: v for k, v in world_data.items() if k != "scenes"}, ensure_ascii=False))
+
+    offsets = array("I", [0])
+    for value in pool.strings:
+        offsets.append(offsets[-1] + len(value))
+    header = _HEADER.pack(MAGIC, len(pool.strings), len(scenes), len(option_rows) // _OPTION_FIELDS,
+                          len(refs), slots, meta, offsets[-1])
+    return b"".join((header, offsets.tobytes(), scene_rows.tobytes(), option_rows.tobytes(),
+                     refs.tobytes(), table.tobytes(), *pool.strings))
+
+
+class PackedWorld(Mapping):
+    """Scene table read straight from a packed world in shared memory
+
+    publish() packs a world into a new shared memory block; attach() maps
+    an existing block by name. Pickling a PackedWorld only sends the block
+    name, and each process attaches once, so handing one to pool workers
+    costs the same for any world size. Scenes are decoded on lookup and the
+    most recent cache_size of them are kept per process, in a cache that
+    threads of that process can share.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool, cache_size: int = 1024):
+        self._shm = shm
+        self.name = shm.name
+        self.owner = owner
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Scene]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        buf = shm.buf
+        magic, strings, scenes, options, refs, slots, meta, pool_size = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a packed world: {shm.name}")
+        position = _HEADER.size
+
+        def section(count: int) -> memoryview:
+            nonlocal position
+            view = buf[position:position + 4 * count].cast("I")
+            position += 4 * count
+            return view
+
+        self._offsets = section(strings + 1)
+        self._scenes = section(scenes * _SCENE_FIELDS)
+        self._options = section(options * _OPTION_FIELDS)
+        self._refs = section(refs)
+        self._table = section(slots)
+        self._pool = buf[position:position + pool_size]
+        self._count = scenes
+        self.world_data = json.loads(self._string(meta))
+        self.world_data["scenes"] = {}
+
+    @classmethod
+    def publish(cls, world_data: Dict, cache_size: int = 1024) -> "PackedWorld":
+        """Pack a world into a new shared memory block owned by this process"""
+        data = pack_world(world_data)
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        shm.buf[:len(data)] = data
+        return cls(shm, owner=True, cache_size=cache_size)
+
+    @classmethod
+    def attach(cls, name: str) -> "PackedWorld":
+        """Map a published block read-only, once per process"""
+        world = _attached.get(name)
+        if world is None:
+            try:
+                shm = shared_memory.SharedMemory(name=name, track=False)
+            except TypeError:
+                # Before Python 3.13 attaching registers the block with the
+                # resource tracker, which would unlink it when this process exits
+                shm = shared_memory.SharedMemory(name=name)
+                resource_tracker.unregister(shm._name, "shared_memory")
+            world = _attached[name] = cls(shm, owner=False)
+        return world
+
+    def __reduce__(self):
+        return PackedWorld.attach, (self.name,)
+
+    def _string(self, number: int) -> Optional[str]:
+        if number == NONE:
+            return None
+        return bytes(self._pool[self._offsets[number]:self._offsets[number + 1]]).decode("utf-8")
+
+    def _strings(self, start: int, count: int) -> List[str]:
+        return [self._string(self._refs[i]) for i in range(start, start + count)]
+
+    def _find(self, scene_id: str) -> int:
+        key = scene_id.encode("utf-8")
+        slots = len(self._table)
+        slot = _slot(key, slots)
+        while True:
+            entry = self._table[slot]
+            if not entry:
+                return -1
+            number = entry - 1
+            string = self._scenes[number * _SCENE_FIELDS]
+            if self._pool[self._offsets[string]:self._offsets[string + 1]] == key:
+                return number
+            slot = (slot + 1) & (slots - 1)
+
+    def _decode(self, number: int) -> Scene:
+        row = self._scenes[number * _SCENE_FIELDS:(number + 1) * _SCENE_FIELDS]
+        options = []
+        for i in range(row[4], row[4] + row[5]):
+            text, action, target, extra = self._options[i * _OPTION_FIELDS:(i + 1) * _OPTION_FIELDS]
+            option = {"text": self._string(text), "action": self._string(action)}
+            if target != NONE:
+                option["target"] = self._string(target)
+            if extra != NONE:
+                option.update(json.loads(self._string(extra)))
+            options.append(option)
+        return Scene(
+            id=self._string(row[1]),
+            name=self._string(row[2]),
+            description=self._string(row[3]),
+            options=options,
+            items=self._strings(row[6], row[7]),
+            npcs=self._strings(row[8], row[9])
+        )
+
+    def __getitem__(self, scene_id: str) -> Scene:
+        with self._lock:
+            scene = self._cache.get(scene_id)
+            if scene is not None:
+                self._cache.move_to_end(scene_id)
+                return scene
+        number = self._find(scene_id) if isinstance(scene_id, str) else -1
+        if number < 0:
+            raise KeyError(scene_id)
+        # Decoded outside the lock; if two threads race, both get the first copy
+        scene = self._decode(number)
+        with self._lock:
+            scene = self._cache.setdefault(scene_id, scene)
+            self._cache.move_to_end(scene_id)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return scene
+
+    def __contains__(self, scene_id) -> bool:
+        return scene_id in self._cache or (isinstance(scene_id, str) and self._find(scene_id) >= 0)
+
+    def __iter__(self) -> Iterator[str]:
+        for number in range(self._count):
+            yield self._string(self._scenes[number * _SCENE_FIELDS])
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def size(self) -> int:
+        """Bytes in the shared block"""
+        return self._shm.size
+
+    def close(self):
+        """Detach, and free the block if this process published it"""
+        for view in (self._offsets, self._scenes, self._options, self._refs, self._table, self._pool):
+            view.release()
+        with self._lock:
+            self._cache.clear()
+        self._shm.close()
+        if self.owner:
+            # Workers sharing our resource tracker may have dropped the
+            # registration when they attached; unlink() expects it back
+            resource_tracker.register(self._shm._name, "shared_memory")
+            self._shm.unlink()
+        _attached.pop(self.name, None)
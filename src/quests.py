@@ -0,0 +1,224 @@
+"""
+Quests - Quest and trigger rules driven by engine events
+Conditions are indexed by event kind and entity so each event only visits rules it can affect
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple, Union
+
+from engine import GameEngine
+from events import EventBus, ItemFound, Moved, NpcDefeated, QuestCompleted, QuestStarted, StateChanged
+
+# Condition kinds and the events that satisfy them:
+#   {"enter": scene_id}  the player moved into the scene (Moved)
+#   {"item": name}       the player holds the item (ItemFound, item rewards)
+#   {"defeat": npc}      the player defeated the NPC (NpcDefeated)
+CONDITION_KINDS = ("enter", "item", "defeat")
+
+Condition = Tuple[str, str]
+
+
+def parse_condition(spec: Dict) -> Condition:
+    """Turn {"kind": entity} into a (kind, entity) pair"""
+    if len(spec) != 1:
+        raise ValueError(f"A condition needs exactly one of {CONDITION_KINDS}: {spec}")
+    kind, entity = next(iter(spec.items()))
+    if kind not in CONDITION_KINDS:
+        raise ValueError(f"Unknown condition kind: {kind}")
+    return kind, entity
+
+
+@dataclass(frozen=True)
+class Quest:
+    """Goal completed once all of its conditions hold"""
+    id: str
+    name: str
+    description: str = ""
+    conditions: Tuple[Condition, ...] = ()
+    rewards: Dict = field(default_factory=dict)
+    auto: bool = True
+
+
+@dataclass(frozen=True)
+class Trigger:
+    """Effects applied when a single condition is met"""
+    id: str
+    condition: Condition
+    effects: Dict = field(default_factory=dict)
+    once: bool = True
+
+
+Rule = Union[Quest, Trigger]
+
+
+class QuestBook:
+    """A world's quests and triggers compiled into a condition index
+
+    The index maps (kind, entity) to the rules and condition positions that
+    mention it. Books are read-only, so one book can serve every session of
+    a world.
+    """
+
+    def __init__(self, world_data: Dict):
+        self.quests: Dict[str, Quest] = {}
+        self.triggers: Dict[str, Trigger] = {}
+        self.index: Dict[Condition, List[Tuple[Rule, int]]] = {}
+
+        for spec in world_data.get("quests", []):
+            quest = Quest(
+                id=spec["id"],
+                name=spec.get("name", spec["id"]),
+                description=spec.get("description", ""),
+                conditions=tuple(parse_condition(c) for c in spec.get("conditions", [])),
+                rewards=spec.get("rewards", {}),
+                auto=spec.get("auto", True)
+            )
+            self.quests[quest.id] = quest
+            for position, condition in enumerate(quest.conditions):
+                self.index.setdefault(condition, []).append((quest, position))
+
+        for spec in world_data.get("triggers", []):
+            trigger = Trigger(
+                id=spec["id"],
+                condition=parse_condition(spec["on"]),
+                effects=spec.get("effects", {}),
+                once=spec.get("once", True)
+            )
+            self.triggers[trigger.id] = trigger
+            self.index.setdefault(trigger.condition, []).append((trigger, 0))
+
+    def rules_for(self, kind: str, entity: str) -> List[Tuple[Rule, int]]:
+        """Rules with a condition on this entity"""
+        return self.index.get((kind, entity), [])
+
+
+class QuestTracker:
+    """Tracks one session's quests by listening to its engine's events
+
+    Active quest ids are kept in Player.quests. Progress starts over when
+    the game is (re)started.
+    """
+
+    def __init__(self, engine: GameEngine, book: QuestBook = None):
+        self.engine = engine
+        self.book = book if book is not None else QuestBook(engine.world_data)
+        self.progress: Dict[str, Set[int]] = {}
+        self.completed: List[str] = []
+        self.fired: Set[str] = set()
+        self.messages: List[str] = []
+        self.evaluations = 0
+
+        if engine.events is None:
+            engine.events = EventBus()
+        bus = engine.events
+        self._subscriptions = [
+            bus.subscribe(Moved, lambda e: self._handle("enter", e.to_scene)),
+            bus.subscribe(ItemFound, self._on_items_found),
+            bus.subscribe(NpcDefeated, lambda e: self._handle("defeat", e.npc)),
+            bus.subscribe(StateChanged, self._on_state_changed)
+        ]
+        self.reset()
+
+    def detach(self):
+        """Stop tracking"""
+        for subscription in self._subscriptions:
+            self.engine.events.unsubscribe(subscription)
+        self._subscriptions = []
+
+    def reset(self):
+        """Forget all progress and start the automatic quests"""
+        self.progress.clear()
+        self.completed.clear()
+        self.fired.clear()
+        player = self.engine.player
+        player.quests[:] = [quest_id for quest_id in player.quests if quest_id not in self.book.quests]
+        player.mark_dirty("quests")
+        for quest in self.book.quests.values():
+            if quest.auto:
+                self.start(quest.id)
+
+    def start(self, quest_id: str) -> bool:
+        """Make a quest active, returning False if it already is or was completed"""
+        quest = self.book.quests[quest_id]
+        if quest_id in self.progress or quest_id in self.completed:
+            return False
+
+        self.progress[quest_id] = set()
+        self.engine.player.quests.append(quest_id)
+        self.engine.player.mark_dirty("quests")
+        self.messages.append(f"📜 新任务: {quest.name}")
+        self._publish(QuestStarted(self.engine.game_id, quest_id))
+
+        # Items may already be in the backpack
+        inventory = self.engine.player.inventory
+        for position, (kind, entity) in enumerate(quest.conditions):
+            if kind == "item" and entity in inventory:
+                self.progress[quest_id].add(position)
+        self._check(quest)
+        return True
+
+    def active(self) -> List[Quest]:
+        """Quests in progress"""
+        return [self.book.quests[quest_id] for quest_id in self.progress]
+
+    def _on_items_found(self, event: ItemFound):
+        for item in event.items:
+            self._handle("item", item)
+
+    def _on_state_changed(self, event: StateChanged):
+        if event.old_state == "start" and event.new_state == "playing":
+            self.reset()
+
+    def _handle(self, kind: str, entity: str):
+        """Evaluate only the rules indexed under this condition"""
+        for rule, position in self.book.rules_for(kind, entity):
+            self.evaluations += 1
+            if isinstance(rule, Trigger):
+                if rule.once and rule.id in self.fired:
+                    continue
+                self.fired.add(rule.id)
+                self._apply(rule.effects)
+            else:
+                satisfied = self.progress.get(rule.id)
+                if satisfied is not None:
+                    satisfied.add(position)
+                    self._check(rule)
+
+    def _check(self, quest: Quest):
+        satisfied = self.progress.get(quest.id)
+        if satisfied is None or len(satisfied) < len(quest.conditions):
+            return
+        inventory = self.engine.player.inventory
+        if any(kind == "item" and entity not in inventory for kind, entity in quest.conditions):
+            return
+
+        del self.progress[quest.id]
+        self.engine.player.quests.remove(quest.id)
+        self.engine.player.mark_dirty("quests")
+        self.completed.append(quest.id)
+        self.messages.append(f"🏅 完成任务: {quest.name}")
+        self._publish(QuestCompleted(self.engine.game_id, quest.id))
+        self._apply(quest.rewards)
+
+    def _apply(self, effects: Dict):
+        """Apply rewards or trigger effects to the player"""
+        player = self.engine.player
+        if effects.get("message"):
+            self.messages.append(effects["message"])
+        player.gold += effects.get("gold", 0)
+        player.health += effects.get("health", 0)
+        for item in effects.get("items", []):
+            player.inventory.append(item)
+            player.mark_dirty("inventory")
+            self._handle("item", item)
+        for quest_id in effects.get("start", []):
+            self.start(quest_id)
+
+    def _publish(self, event):
+        if self.engine.events is not None:
+            self.engine.events.publish(event)
+
+    def take_messages(self) -> List[str]:
+        """Messages since the last call, e.g. to print after a turn"""
+        messages, self.messages = self.messages, []
+        return messages
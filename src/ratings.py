@@ -0,0 +1,250 @@
+"""
+Ratings - Elo ratings and win-rate confidence intervals for AI matches
+Aggregates streams of AIvsAI results per playstyle
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, bootstraps fall back to pure Python
+    np = None
+
+# Outcome counts are kept as [wins, draws, losses]
+WIN, DRAW, LOSS = 0, 1, 2
+
+
+def match_score(result: Dict) -> float:
+    """Score of player1 in an AIvsAI.run_match() result: 1, 0.5 or 0"""
+    winner = result["winner"]
+    if winner == "draw":
+        return 0.5
+    return 1.0 if winner == result["player1"]["name"] else 0.0
+
+
+def win_rate(counts: Sequence[int]) -> float:
+    """Share of points scored, counting draws as half a win"""
+    games = sum(counts)
+    return (counts[WIN] + 0.5 * counts[DRAW]) / games if games else 0.0
+
+
+def _binomial(rng: random.Random, n: int, p: float) -> int:
+    """Binomial draw in time independent of n
+
+    Exact by inversion when the variance is small, walking the
+    probabilities up from zero successes of the rarer outcome (about
+    n * p steps, under 50), and normal-approximated when it is large.
+    """
+    if p <= 0.0 or n <= 0:
+        return 0
+    if p >= 1.0:
+        return n
+    if p > 0.5:
+        return n - _binomial(rng, n, 1.0 - p)
+    variance = n * p * (1 - p)
+    if variance < 25:
+        u = rng.random()
+        ratio = p / (1 - p)
+        probability = math.exp(n * math.log1p(-p))
+        k = 0
+        while u > probability and k < n:
+            u -= probability
+            probability *= ratio * (n - k) / (k + 1)
+            k += 1
+        return k
+    return min(n, max(0, round(rng.gauss(n * p, math.sqrt(variance)))))
+
+
+def _resampled_win_rates(counts: Sequence[int], resamples: int, seed: Optional[int]) -> List[float]:
+    """Win rates of bootstrap resamples of the outcomes behind counts
+
+    Resampling n outcomes with replacement is a multinomial draw over the
+    observed outcome shares, which numpy and _binomial() both make in time
+    that does not depend on n.
+    """
+    games = sum(counts)
+    if not games:
+        return [0.0] * resamples
+    shares = [count / games for count in counts]
+
+    if np is not None:
+        draws = np.random.default_rng(seed).multinomial(games, shares, size=resamples)
+        return ((draws[:, WIN] + 0.5 * draws[:, DRAW]) / games).tolist()
+
+    rng = random.Random(seed)
+    draw_share = shares[DRAW] / (1 - shares[WIN]) if shares[WIN] < 1 else 0.0
+    rates = []
+    for _ in range(resamples):
+        wins = _binomial(rng, games, shares[WIN])
+        draws_ = _binomial(rng, games - wins, draw_share)
+        rates.append((wins + 0.5 * draws_) / games)
+    return rates
+
+
+def _interval(values: List[float], confidence: float) -> Tuple[float, float]:
+    values = sorted(values)
+    tail = (1 - confidence) / 2
+    low = values[int(tail * (len(values) - 1))]
+    high = values[int(math.ceil((1 - tail) * (len(values) - 1)))]
+    return low, high
+
+
+def bootstrap_win_rate(counts: Sequence[int], resamples: int = 2000, confidence: float = 0.95,
+                       seed: Optional[int] = None) -> Tuple[float, float, float]:
+    """Win rate with a bootstrap confidence interval: (rate, low, high)"""
+    low, high = _interval(_resampled_win_rates(counts, resamples, seed), confidence)
+    return win_rate(counts), low, high
+
+
+def compare_win_rates(before: Sequence[int], after: Sequence[int], resamples: int = 2000,
+                      confidence: float = 0.95, seed: Optional[int] = None) -> Dict:
+    """Bootstrap the change in win rate between two sets of outcome counts
+
+    The change is significant when the interval excludes zero.
+    """
+    rates_before = _resampled_win_rates(before, resamples, seed)
+    rates_after = _resampled_win_rates(after, resamples, None if seed is None else seed + 1)
+    low, high = _interval([a - b for a, b in zip(rates_after, rates_before)], confidence)
+    return {
+        "before": win_rate(before),
+        "after": win_rate(after),
+        "difference": win_rate(after) - win_rate(before),
+        "low": low,
+        "high": high,
+        "significant": low > 0 or high < 0
+    }
+
+
+class PlaystyleRatings:
+    """Incremental Elo ratings and outcome counts per playstyle"""
+
+    def __init__(self, k: float = 16.0, initial: float = 1500.0):
+        self.k = k
+        self.initial = initial
+        self.ratings: Dict[str, float] = {}
+        self.outcomes: Dict[str, List[int]] = {}
+
+    def expected(self, a: str, b: str) -> float:
+        """Expected score of a against b"""
+        rating_a = self.ratings.get(a, self.initial)
+        rating_b = self.ratings.get(b, self.initial)
+        return 1.0 / (1.0 + 10 ** ((rating_b - rating_a) / 400))
+
+    def update(self, a: str, b: str, score: float):
+        """Record one game in which a scored `score` against b"""
+        expected = self.expected(a, b)
+        change = self.k * (score - expected)
+        self.ratings[a] = self.ratings.get(a, self.initial) + change
+        self.ratings[b] = self.ratings.get(b, self.initial) - change
+
+        for key, points in ((a, score), (b, 1.0 - score)):
+            counts = self.outcomes.setdefault(key, [0, 0, 0])
+            counts[WIN if points == 1.0 else LOSS if points == 0.0 else DRAW] += 1
+
+    def record(self, result: Dict):
+        """Record an AIvsAI.run_match() result"""
+        self.update(result["player1"]["playstyle"], result["player2"]["playstyle"], match_score(result))
+
+    def consume(self, results: Iterable[Dict]) -> "PlaystyleRatings":
+        """Record a stream of match results"""
+        for result in results:
+            self.record(result)
+        return self
+
+    def leaderboard(self, resamples: int = 2000, confidence: float = 0.95,
+                    seed: Optional[int] = None) -> List[Dict]:
+        """Playstyles by rating, with win-rate confidence intervals"""
+        rows = []
+        for key, rating in sorted(self.ratings.items(), key=lambda item: item[1], reverse=True):
+            counts = self.outcomes[key]
+            rate, low, high = bootstrap_win_rate(counts, resamples, confidence, seed)
+            rows.append({
+                "playstyle": key,
+                "rating": rating,
+                "games": sum(counts),
+                "wins": counts[WIN],
+                "draws": counts[DRAW],
+                "losses": counts[LOSS],
+                "win_rate": rate,
+                "low": low,
+                "high": high
+            })
+        return rows
+
+
+def read_results(paths: Iterable[str]) -> Iterable[Dict]:
+    """Read match results from JSON Lines files"""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def play_matches(count: int, seed: int = 0, ratings: PlaystyleRatings = None) -> Iterable[Dict]:
+    """Play random pairings of the AI playstyles"""
+    from ai_player import PLAYSTYLES, AIPlayer, AIvsAI
+
+    rng = random.Random(seed)
+    tournament = AIvsAI(verbose=False)
+    tournament.ratings = ratings
+    for _ in range(count):
+        style1, style2 = rng.sample(PLAYSTYLES, 2)
+        yield tournament.run_match(AIPlayer(name="A", playstyle=style1, rng=rng),
+                                   AIPlayer(name="B", playstyle=style2, rng=rng))
+
+
+def print_leaderboard(rows: List[Dict], confidence: float):
+    print(f"{'playstyle':<12} {'rating':>7} {'games':>8} {'win rate':>9}  {confidence:.0%} interval")
+    for row in rows:
+        print(f"{row['playstyle']:<12} {row['rating']:>7.0f} {row['games']:>8} {row['win_rate']:>9.3f}  "
+              f"[{row['low']:.3f}, {row['high']:.3f}]")
+
+
+def main(argv: List[str] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Rate AI playstyles from AI vs AI match results")
+    parser.add_argument("results", nargs="*", help="JSON Lines files of match results")
+    parser.add_argument("--play", type=int, default=0, help="Play this many matches instead of reading results")
+    parser.add_argument("--out", default=None, help="With --play, also write the results here")
+    parser.add_argument("--against", nargs="*", default=None,
+                        help="Earlier results to compare each playstyle's win rate against")
+    parser.add_argument("--resamples", type=int, default=2000, help="Bootstrap resamples")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Interval confidence")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args(argv)
+
+    ratings = PlaystyleRatings()
+    if args.play:
+        out = open(args.out, 'w', encoding='utf-8') if args.out else None
+        try:
+            for result in play_matches(args.play, args.seed, ratings):
+                if out:
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        finally:
+            if out:
+                out.close()
+    else:
+        ratings.consume(read_results(args.results))
+
+    print_leaderboard(ratings.leaderboard(args.resamples, args.confidence, args.seed), args.confidence)
+
+    if args.against is not None:
+        before = PlaystyleRatings().consume(read_results(args.against))
+        print()
+        for key in sorted(set(ratings.outcomes) & set(before.outcomes)):
+            change = compare_win_rates(before.outcomes[key], ratings.outcomes[key],
+                                       args.resamples, args.confidence, args.seed)
+            verdict = "significant" if change["significant"] else "not significant"
+            print(f"{key:<12} {change['before']:.3f} -> {change['after']:.3f} "
+                  f"({change['difference']:+.3f}, [{change['low']:+.3f}, {change['high']:+.3f}], {verdict})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
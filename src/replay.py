@@ -0,0 +1,245 @@
+"""
+Replay - Deterministic session recording and replay
+Re-executes recorded sessions headlessly for regression checks and benchmarks
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from engine import DEFAULT_WORLD, GameEngine, GameState
+from ai_player import AIPlayer
+
+RECORDING_VERSION = 2
+
+
+def _digest(data) -> str:
+    """Hash JSON-compatible data in a canonical form"""
+    encoded = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def world_hash(world_data: Dict) -> str:
+    """Hash a world definition"""
+    return _digest(world_data)
+
+
+def state_hash(engine: GameEngine) -> str:
+    """Hash the parts of an engine's state that actions can change"""
+    return _digest({
+        "state": engine.state.value,
+        "player": asdict(engine.player),
+        "current_scene": engine.current_scene.id if engine.current_scene else None,
+        "scenes": {
+            scene_id: [scene.items, scene.npcs, scene.visited]
+            for scene_id, scene in sorted(engine.scenes.delta.items())
+        },
+        "history_length": len(engine.history)
+    })
+
+
+class LogicalClock:
+    """Deterministic clock that advances one second per call"""
+
+    def __init__(self, start: datetime = datetime(2000, 1, 1)):
+        self.start = start
+        self.ticks = 0
+
+    def __call__(self) -> datetime:
+        now = self.start + timedelta(seconds=self.ticks)
+        self.ticks += 1
+        return now
+
+
+def load_world(path: Optional[str]) -> Dict:
+    """Load a world file, or the default world when no path is given"""
+    if path is None:
+        return DEFAULT_WORLD
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class SessionRecorder:
+    """Captures the seed, world hash and input stream of a session"""
+
+    def __init__(self, world_data: Dict = None, seed: int = None, player_name: str = "Hero"):
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.world_data = world_data if world_data is not None else load_world(None)
+        self.player_name = player_name
+        self.inputs: List[str] = []
+
+        self.engine = GameEngine(player_name=player_name, clock=LogicalClock(),
+                                 rng=random.Random(self.seed))
+        self.engine.initialize_world(self.world_data)
+
+    def process_action(self, action: str):
+        """Forward an action to the engine and capture it"""
+        self.inputs.append(action)
+        return self.engine.process_action(action)
+
+    def to_dict(self) -> Dict:
+        """Get the recording as JSON-compatible data"""
+        return {
+            "version": RECORDING_VERSION,
+            "seed": self.seed,
+            "player": self.player_name,
+            "world_hash": world_hash(self.world_data),
+            "inputs": list(self.inputs),
+            "final_state_hash": state_hash(self.engine)
+        }
+
+    def save(self, filename: str) -> str:
+        """Write the recording to a file"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        return filename
+
+
+def record_ai_session(world_data: Dict = None, seed: int = None, playstyle: str = "balanced",
+                      max_turns: int = 50) -> SessionRecorder:
+    """Record a headless session played by an AIPlayer"""
+    recorder = SessionRecorder(world_data, seed, player_name="AI Hero")
+    ai_player = AIPlayer(name="AI Hero", playstyle=playstyle, rng=recorder.rng)
+    engine = recorder.engine
+
+    for _ in range(max_turns):
+        if engine.state != GameState.PLAYING or not engine.current_scene:
+            break
+        recorder.process_action(ai_player.choose_action(engine.current_scene, engine))
+
+    return recorder
+
+
+@dataclass
+class ReplayResult:
+    """Outcome of replaying one recording"""
+    source: str
+    ok: bool
+    turns: int
+    seconds: float
+    expected_hash: str
+    actual_hash: str
+    error: str = ""
+
+    @property
+    def turns_per_second(self) -> float:
+        return self.turns / self.seconds if self.seconds else 0.0
+
+
+def start_engine(recording: Dict, world_data: Dict) -> GameEngine:
+    """A fresh engine seeded and clocked the way the recording was made
+
+    Raises ValueError for recordings of another format version, whose
+    inputs would not reproduce the same game.
+    """
+    version = recording.get("version")
+    if version != RECORDING_VERSION:
+        raise ValueError(f"Unsupported recording version: {version} (expected {RECORDING_VERSION})")
+    engine = GameEngine(player_name=recording.get("player", "Hero"), clock=LogicalClock(),
+                        rng=random.Random(recording.get("seed")))
+    engine.initialize_world(world_data)
+    return engine
+
+
+def replay(recording: Dict, world_data: Dict = None, source: str = "") -> ReplayResult:
+    """Re-run a recording headlessly and check the final state"""
+    if world_data is None:
+        world_data = load_world(None)
+
+    expected = recording.get("final_state_hash", "")
+    if recording.get("version") != RECORDING_VERSION:
+        return ReplayResult(source, False, 0, 0.0, expected, "",
+                            f"unsupported recording version {recording.get('version')}")
+    if world_hash(world_data) != recording.get("world_hash"):
+        return ReplayResult(source, False, 0, 0.0, expected, "", "world hash mismatch")
+
+    inputs = recording.get("inputs", [])
+    engine = start_engine(recording, world_data)
+
+    start = time.perf_counter()
+    for action in inputs:
+        engine.process_action(action)
+    seconds = time.perf_counter() - start
+
+    actual = state_hash(engine)
+    error = "" if actual == expected else "final state mismatch"
+    return ReplayResult(source, not error, len(inputs), seconds, expected, actual, error)
+
+
+def iter_recordings(paths: Iterable[str]) -> Iterable[str]:
+    """Expand files and directories into recording file paths"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.endswith(".json"):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def replay_corpus(paths: Iterable[str], world_data: Dict = None) -> Dict:
+    """Replay every recording under the given paths and summarize"""
+    if world_data is None:
+        world_data = load_world(None)
+
+    results = []
+    for filename in iter_recordings(paths):
+        with open(filename, 'r', encoding='utf-8') as f:
+            recording = json.load(f)
+        results.append(replay(recording, world_data, source=filename))
+
+    turns = sum(r.turns for r in results)
+    seconds = sum(r.seconds for r in results)
+    return {
+        "sessions": len(results),
+        "failures": [asdict(r) for r in results if not r.ok],
+        "turns": turns,
+        "seconds": seconds,
+        "turns_per_second": turns / seconds if seconds else 0.0
+    }
+
+
+def main(argv: List[str] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Record and replay game sessions")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Record an AI-played session")
+    record_parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    record_parser.add_argument("--playstyle", default="balanced", help="AI playstyle")
+    record_parser.add_argument("--turns", type=int, default=50, help="Maximum turns")
+    record_parser.add_argument("--world", default=None, help="World JSON file")
+    record_parser.add_argument("--out", required=True, help="Recording file to write")
+
+    replay_parser = subparsers.add_parser("replay", help="Replay recordings and verify them")
+    replay_parser.add_argument("paths", nargs="+", help="Recording files or directories")
+    replay_parser.add_argument("--world", default=None, help="World JSON file")
+
+    args = parser.parse_args(argv)
+    world_data = load_world(args.world)
+
+    if args.command == "record":
+        recorder = record_ai_session(world_data, args.seed, args.playstyle, args.turns)
+        recorder.save(args.out)
+        print(f"✅ 已录制 {len(recorder.inputs)} 回合 (seed={recorder.seed}): {args.out}")
+        return 0
+
+    report = replay_corpus(args.paths, world_data)
+    print(f"会话: {report['sessions']}  回合: {report['turns']}  "
+          f"速度: {report['turns_per_second']:.0f} turns/sec")
+    for failure in report["failures"]:
+        print(f"❌ {failure['source']}: {failure['error']}")
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
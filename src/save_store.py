@@ -0,0 +1,245 @@
+"""
+Save Store - Content-addressed, compressed game saves
+Splits saves into hashed chunks so repeated content is stored only once
+"""
+
+import hashlib
+import json
+import lzma
+import os
+import uuid
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+from engine import EngineSnapshot, GameEngine, GameState, Player, Scene, SceneTable
+
+SAVE_FORMAT = 1
+
+# History is chunked in fixed blocks so earlier blocks are shared by later saves
+HISTORY_BLOCK = 32
+
+# One-byte object header naming the codec, so stores can mix codecs
+_CODECS = {
+    "zlib": (b"z", lambda data, level: zlib.compress(data, level), zlib.decompress),
+    "lzma": (b"x", lambda data, level: lzma.compress(data, preset=level), lzma.decompress),
+    "none": (b"-", lambda data, level: data, lambda data: data),
+}
+_DECODERS = {header: decompress for header, _, decompress in _CODECS.values()}
+
+
+def _encode(data) -> bytes:
+    """Canonical JSON bytes, so equal content always hashes the same"""
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+class SaveStore:
+    """Directory of deduplicated, compressed saves
+
+    Each save is a small manifest naming chunks by the SHA-256 of their
+    content: the player, every scene that differs from the base world, and
+    the history in blocks of HISTORY_BLOCK actions. Chunks already in the
+    store are never written again, so thousands of autosaves of similar
+    games cost little more than their manifests.
+
+    Layout: objects/<2 hex>/<62 hex> for chunks and
+    sessions/<session key>/<slot>.json for manifests. All files are written
+    to a temporary name and renamed into place, so concurrent writers and
+    crashes never leave partial files.
+    """
+
+    def __init__(self, root: str, codec: str = "zlib", level: int = 6, memo_size: int = 10000):
+        if codec not in _CODECS:
+            raise ValueError(f"Unknown codec: {codec}")
+        self.root = root
+        self.codec = codec
+        self.level = level
+        self.memo_size = memo_size
+        self._known: set = set()
+        # id(first) -> (first, last, digest) for immutable scenes and history blocks
+        self._memo: "OrderedDict[int, tuple]" = OrderedDict()
+        self.stats_counters = {"saves": 0, "chunks_written": 0, "chunks_reused": 0,
+                               "bytes_in": 0, "bytes_written": 0}
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "sessions"), exist_ok=True)
+
+    # Objects
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest[2:])
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        temp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp, 'wb') as f:
+            f.write(data)
+        os.replace(temp, path)
+
+    def _put(self, raw: bytes) -> str:
+        """Store a chunk unless it is already present and return its digest"""
+        digest = hashlib.sha256(raw).hexdigest()
+        self.stats_counters["bytes_in"] += len(raw)
+        if digest in self._known:
+            self.stats_counters["chunks_reused"] += 1
+            return digest
+
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            self.stats_counters["chunks_reused"] += 1
+        else:
+            header, compress, _ = _CODECS[self.codec]
+            data = header + compress(raw, self.level)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._write_atomic(path, data)
+            self.stats_counters["chunks_written"] += 1
+            self.stats_counters["bytes_written"] += len(data)
+        self._known.add(digest)
+        return digest
+
+    def _get(self, digest: str):
+        with open(self._object_path(digest), 'rb') as f:
+            data = f.read()
+        raw = _DECODERS[data[:1]](data[1:])
+        if hashlib.sha256(raw).hexdigest() != digest:
+            raise ValueError(f"Corrupt save chunk: {digest}")
+        return json.loads(raw)
+
+    def _put_memo(self, key_obj, last_obj, build) -> str:
+        """Store build() once per unchanged immutable object"""
+        entry = self._memo.get(id(key_obj))
+        if entry is not None and entry[0] is key_obj and entry[1] is last_obj:
+            self._memo.move_to_end(id(key_obj))
+            self.stats_counters["chunks_reused"] += 1
+            return entry[2]
+
+        digest = self._put(_encode(build()))
+        self._memo[id(key_obj)] = (key_obj, last_obj, digest)
+        if len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+        return digest
+
+    # Saves
+
+    def _manifest_path(self, session: str, slot: str) -> str:
+        return os.path.join(self.root, "sessions", session, f"{slot}.json")
+
+    def save(self, engine: GameEngine, session: str = None, slot: str = "autosave") -> str:
+        """Save an engine under session/slot and return the session key
+
+        The session key defaults to the engine's game_id.
+        """
+        session = session or engine.game_id
+        history = engine.history
+        blocks = []
+        for start in range(0, len(history), HISTORY_BLOCK):
+            block = history[start:start + HISTORY_BLOCK]
+            if len(block) == HISTORY_BLOCK:
+                # Full blocks never change, remember them by their records
+                blocks.append(self._put_memo(block[0], block[-1], lambda block=block: block))
+            else:
+                blocks.append(self._put(_encode(block)))
+
+        manifest = {
+            "format": SAVE_FORMAT,
+            "saved_at": engine.clock().isoformat(),
+            "world": engine.world_data.get("name"),
+            "game_id": engine.game_id,
+            "state": engine.state.value,
+            "current_scene": engine.current_scene.id if engine.current_scene else None,
+            "player": self._put(_encode(asdict(engine.player))),
+            "scenes": {
+                scene_id: self._put_memo(scene, scene, lambda scene=scene: asdict(scene))
+                for scene_id, scene in engine.scenes.delta.items()
+            },
+            "history": blocks,
+            "history_length": len(history)
+        }
+
+        path = self._manifest_path(session, slot)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = _encode(manifest)
+        self._write_atomic(path, data)
+        self.stats_counters["saves"] += 1
+        self.stats_counters["bytes_written"] += len(data)
+        return session
+
+    def load(self, engine: GameEngine, session: str, slot: str = "autosave"):
+        """Restore a save into an engine whose world is already initialized"""
+        with open(self._manifest_path(session, slot), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("format") != SAVE_FORMAT:
+            raise ValueError(f"Unsupported save format: {manifest.get('format')}")
+        if not engine.scenes:
+            engine.initialize_world()
+
+        delta = {scene_id: Scene(**self._get(digest)) for scene_id, digest in manifest["scenes"].items()}
+        history: List[Dict] = []
+        for digest in manifest["history"]:
+            history.extend(self._get(digest))
+
+        engine.restore(EngineSnapshot(
+            player=Player(**self._get(manifest["player"])),
+            state=GameState(manifest["state"]),
+            scene_id=manifest["current_scene"],
+            scenes=SceneTable(engine.scenes.base, delta),
+            history=history,
+            history_length=len(history),
+            game_id=manifest["game_id"]
+        ))
+
+    def sessions(self) -> List[str]:
+        """Keys of all sessions with at least one save"""
+        return sorted(os.listdir(os.path.join(self.root, "sessions")))
+
+    def slots(self, session: str) -> List[str]:
+        """Save slots of a session"""
+        directory = os.path.join(self.root, "sessions", session)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-5] for name in os.listdir(directory) if name.endswith(".json"))
+
+    def delete(self, session: str, slot: Optional[str] = None):
+        """Delete one slot or a whole session; chunks are freed by collect_garbage()"""
+        for name in ([slot] if slot else self.slots(session)):
+            path = self._manifest_path(session, name)
+            if os.path.exists(path):
+                os.remove(path)
+        directory = os.path.join(self.root, "sessions", session)
+        if os.path.isdir(directory) and not os.listdir(directory):
+            os.rmdir(directory)
+
+    def collect_garbage(self) -> int:
+        """Remove chunks no manifest refers to and return how many"""
+        live = set()
+        for session in self.sessions():
+            for slot in self.slots(session):
+                with open(self._manifest_path(session, slot), 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                live.add(manifest["player"])
+                live.update(manifest["scenes"].values())
+                live.update(manifest["history"])
+
+        removed = 0
+        objects = os.path.join(self.root, "objects")
+        for prefix in os.listdir(objects):
+            for name in os.listdir(os.path.join(objects, prefix)):
+                if prefix + name not in live and not name.endswith(".tmp"):
+                    os.remove(os.path.join(objects, prefix, name))
+                    removed += 1
+        self._known &= live
+        self._memo.clear()
+        return removed
+
+    def stats(self) -> Dict:
+        """Write counters plus the store's current size on disk"""
+        objects = disk_bytes = 0
+        for directory, _, files in os.walk(os.path.join(self.root, "objects")):
+            objects += len(files)
+            disk_bytes += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+        for directory, _, files in os.walk(os.path.join(self.root, "sessions")):
+            disk_bytes += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+
+        stats = dict(self.stats_counters)
+        stats.update({"objects": objects, "disk_bytes": disk_bytes})
+        return stats
@@ -0,0 +1,310 @@
+"""
+Session Memory - Per-session memory accounting and budgets
+Estimates what each game session costs, trims or hibernates sessions over budget
+"""
+
+import sys
+import tracemalloc
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import FunctionType, ModuleType
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from engine import GameEngine
+
+# Footprint components, in the order they are measured
+COMPONENTS = ("player", "scenes", "history", "decisions", "other")
+
+# Never followed when measuring: shared by every object that references them
+_OPAQUE = (type, ModuleType, FunctionType)
+
+
+def deep_size(obj, seen: Set[int] = None) -> int:
+    """Approximate bytes reachable from obj that are not already in seen
+
+    Follows containers, instance dicts and slots. Objects are added to
+    seen, so passing one set to several calls counts shared objects once.
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _OPAQUE):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif not isinstance(obj, (str, bytes, int, float, bool)) and obj is not None:
+            if hasattr(obj, "__dict__"):
+                stack.append(obj.__dict__)
+            for name in getattr(type(obj), "__slots__", ()):
+                if hasattr(obj, name):
+                    stack.append(getattr(obj, name))
+    return total
+
+
+def _shared_objects(engine: GameEngine) -> List:
+    """Objects a session references but shares with other sessions"""
+    return [engine.scenes.base, engine.world_data, engine.parser, engine.clock,
+            engine.metrics, engine.events]
+
+
+def session_footprint(engine: GameEngine, ai_player=None, shared: Iterable = ()) -> Dict[str, int]:
+    """Approximate bytes owned by one session, by component
+
+    The base world, parser, metrics registry and event bus are shared
+    between sessions and not counted, nor is anything in `shared`. The
+    current scene only counts when it differs from the base world.
+    """
+    seen = {id(obj) for obj in _shared_objects(engine)}
+    seen.update(id(obj) for obj in shared)
+    if engine.current_scene is not None and engine.current_scene.id not in engine.scenes.delta:
+        seen.add(id(engine.current_scene))
+
+    footprint = {
+        "player": deep_size(engine.player, seen),
+        "scenes": deep_size(engine.scenes.delta, seen),
+        "history": deep_size(engine.history, seen),
+        "decisions": deep_size(ai_player.decision_history, seen) if ai_player is not None else 0,
+        "other": deep_size(engine, seen)
+    }
+    footprint["total"] = sum(footprint[name] for name in COMPONENTS)
+    return footprint
+
+
+class MemoryTrace:
+    """Allocations made inside a with block, measured with tracemalloc
+
+    Exact but slow: tracemalloc hooks every allocation while it runs. Use
+    it to find what grows, and session_footprint() for routine accounting.
+    """
+
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+        self.net = 0
+        self.peak = 0
+        self.stats: List[tracemalloc.StatisticDiff] = []
+        self._started = False
+        self._before = None
+
+    def __enter__(self) -> "MemoryTrace":
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start(self.frames)
+        tracemalloc.reset_peak()
+        self._before = tracemalloc.take_snapshot()
+        return self
+
+    def __exit__(self, *exc_info):
+        after = tracemalloc.take_snapshot()
+        self.peak = tracemalloc.get_traced_memory()[1]
+        if self._started:
+            tracemalloc.stop()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        self.stats = after.filter_traces(ignore).compare_to(self._before.filter_traces(ignore), "lineno")
+        self.net = sum(stat.size_diff for stat in self.stats)
+        self._before = None
+
+    def top(self, limit: int = 10) -> List[Dict]:
+        """Source lines that grew the most"""
+        rows = []
+        for stat in self.stats[:limit]:
+            frame = stat.traceback[0]
+            rows.append({"file": frame.filename, "line": frame.lineno,
+                         "bytes": stat.size_diff, "blocks": stat.count_diff})
+        return rows
+
+
+@dataclass
+class MemoryBudget:
+    """Per-session memory limits for a SessionHost"""
+    session_bytes: int = 1 << 20
+    keep_history: int = 200
+    keep_decisions: int = 200
+    check_every: int = 32
+
+
+class _HostedSession:
+    """A resident session and its latest measurements"""
+
+    __slots__ = ("engine", "ai_player", "footprint", "actions", "traced")
+
+    def __init__(self, engine: GameEngine, ai_player):
+        self.engine = engine
+        self.ai_player = ai_player
+        self.footprint: Dict[str, int] = {}
+        self.actions = 0
+        self.traced = 0
+
+
+class SessionHost:
+    """Keeps many sessions in one process within memory budgets
+
+    Every budget.check_every actions a session's footprint is measured.
+    A session over budget.session_bytes first has its history and AI
+    decision log trimmed; if it is still over, or resident sessions
+    together exceed total_bytes, sessions are hibernated into the
+    SaveStore (least recently used first) and transparently woken by
+    get() or process_action(). Without a store sessions are only trimmed.
+
+    Hibernation keeps the player, scene changes and remaining history, not
+    attachments such as event buses or timelines. Sessions are woken as
+    plain GameEngines on the same world unless a factory is given.
+
+    With trace=True, each action's net allocation is also measured with
+    tracemalloc and summed per session. That is exact only when one thread
+    plays at a time, and slows every action down.
+    """
+
+    def __init__(self, budget: MemoryBudget = None, total_bytes: int = None, store=None,
+                 factory: Callable[[str], GameEngine] = None, trace: bool = False):
+        self.budget = budget or MemoryBudget()
+        self.total_bytes = total_bytes
+        self.store = store
+        self.factory = factory
+        self.trace = trace
+        self._resident: "OrderedDict[str, _HostedSession]" = OrderedDict()
+        self._hibernated: Dict[str, Tuple[str, Dict, object, object]] = {}
+        self.stats = {"checks": 0, "trimmed": 0, "hibernated": 0, "woken": 0, "over_budget": 0}
+        self._tracing = trace and not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+
+    def close(self):
+        """Stop tracing if this host started it"""
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def add(self, engine: GameEngine, ai_player=None) -> str:
+        """Host a session and return its game id"""
+        self._resident[engine.game_id] = _HostedSession(engine, ai_player)
+        self.check(engine.game_id)
+        return engine.game_id
+
+    def remove(self, game_id: str):
+        """Stop hosting a session and forget its hibernated save"""
+        self._resident.pop(game_id, None)
+        if self._hibernated.pop(game_id, None) is not None:
+            self.store.delete(game_id, "hibernate")
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self._resident or game_id in self._hibernated
+
+    def __len__(self) -> int:
+        return len(self._resident) + len(self._hibernated)
+
+    def get(self, game_id: str) -> GameEngine:
+        """A session's engine, waking it if it was hibernated"""
+        return self._session(game_id).engine
+
+    def _session(self, game_id: str) -> _HostedSession:
+        session = self._resident.get(game_id)
+        if session is None:
+            session = self._wake(game_id)
+        self._resident.move_to_end(game_id)
+        return session
+
+    def process_action(self, game_id: str, action: str):
+        """Play one action in a session and enforce its budget"""
+        session = self._session(game_id)
+        if self.trace:
+            before = tracemalloc.get_traced_memory()[0]
+            result = session.engine.process_action(action)
+            session.traced += tracemalloc.get_traced_memory()[0] - before
+        else:
+            result = session.engine.process_action(action)
+
+        session.actions += 1
+        if session.actions % self.budget.check_every == 0:
+            self.check(game_id)
+        return result
+
+    def check(self, game_id: str) -> Dict[str, int]:
+        """Measure a session now and trim or hibernate it if over budget"""
+        session = self._session(game_id)
+        self.stats["checks"] += 1
+        session.footprint = self._measure(session)
+        if session.footprint["total"] > self.budget.session_bytes:
+            self._trim(session)
+            session.footprint = self._measure(session)
+            if session.footprint["total"] > self.budget.session_bytes:
+                self.stats["over_budget"] += 1
+                if self.store is not None:
+                    footprint = session.footprint
+                    self.hibernate(game_id)
+                    return footprint
+        self._enforce_total()
+        return session.footprint
+
+    def _measure(self, session: _HostedSession) -> Dict[str, int]:
+        footprint = session_footprint(session.engine, session.ai_player)
+        if self.trace:
+            footprint["traced"] = session.traced
+        return footprint
+
+    def _trim(self, session: _HostedSession):
+        dropped = session.engine.trim_history(self.budget.keep_history)
+        if session.ai_player is not None:
+            decisions = session.ai_player.decision_history
+            if len(decisions) > self.budget.keep_decisions:
+                dropped += len(decisions) - self.budget.keep_decisions
+                del decisions[:-self.budget.keep_decisions]
+        self.stats["trimmed"] += bool(dropped)
+
+    def _enforce_total(self):
+        if self.total_bytes is None or self.store is None:
+            return
+        while len(self._resident) > 1 and self.resident_bytes() > self.total_bytes:
+            self.hibernate(next(iter(self._resident)))
+
+    def resident_bytes(self) -> int:
+        """Sum of the last measured footprints of resident sessions"""
+        return sum(session.footprint.get("total", 0) for session in self._resident.values())
+
+    def hibernate(self, game_id: str):
+        """Save a resident session to the store and release it"""
+        if self.store is None:
+            raise RuntimeError("Hibernation needs a SaveStore")
+        session = self._resident.pop(game_id)
+        engine = session.engine
+        # Saved under the host's key, as a restart gives the engine a new game_id
+        self.store.save(engine, session=game_id, slot="hibernate")
+        self._hibernated[game_id] = (engine.player.name, engine.world_data, engine.scenes.base,
+                                     session.ai_player)
+        self.stats["hibernated"] += 1
+
+    def _wake(self, game_id: str) -> _HostedSession:
+        if game_id not in self._hibernated:
+            raise KeyError(game_id)
+        player_name, world_data, base, ai_player = self._hibernated[game_id]
+        if self.factory is not None:
+            engine = self.factory(player_name)
+        else:
+            engine = GameEngine(player_name=player_name)
+            engine.initialize_world(world_data, scenes=base)
+        self.store.load(engine, game_id, slot="hibernate")
+        # Only forgotten once loaded, so a failed wake can be retried
+        del self._hibernated[game_id]
+        session = self._resident[game_id] = _HostedSession(engine, ai_player)
+        session.footprint = self._measure(session)
+        self.stats["woken"] += 1
+        self._enforce_total()
+        return session
+
+    def report(self) -> Dict:
+        """Latest footprint of every resident session and host totals"""
+        return {
+            "sessions": {game_id: dict(session.footprint) for game_id, session in self._resident.items()},
+            "resident": len(self._resident),
+            "hibernated": len(self._hibernated),
+            "resident_bytes": self.resident_bytes(),
+            "stats": dict(self.stats)
+        }
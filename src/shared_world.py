@@ -0,0 +1,188 @@
+"""
+Shared World - Many players in the same scenes
+Scene state is guarded by lock stripes so unrelated scenes never contend
+"""
+
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Callable, Dict, Iterator, List, Optional
+
+from engine import DEFAULT_WORLD, GameEngine, Scene
+
+
+class _Shard:
+    """One lock stripe and its contention counters"""
+
+    __slots__ = ("lock", "acquisitions", "contended", "wait_seconds")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_seconds = 0.0
+
+
+class SharedWorld(Mapping):
+    """Scene table shared by many sessions
+
+    Scenes are immutable values that are swapped under the lock of the
+    scene's shard, so readers never lock and writers only serialize with
+    writers to scenes in the same shard. update() offers an optimistic
+    alternative that builds the new scene outside the lock and retries on a
+    version conflict.
+    """
+
+    def __init__(self, world_data: Dict = None, shards: int = 64):
+        self.world_data = world_data if world_data is not None else DEFAULT_WORLD
+        self._scenes: Dict[str, Scene] = dict(GameEngine._build_scenes(self.world_data))
+        self._versions: Dict[str, int] = {scene_id: 0 for scene_id in self._scenes}
+        self._shards = [_Shard() for _ in range(shards)]
+        self._conflicts = [0] * shards
+
+    def __getitem__(self, scene_id: str) -> Scene:
+        return self._scenes[scene_id]
+
+    def __contains__(self, scene_id) -> bool:
+        return scene_id in self._scenes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._scenes)
+
+    def __len__(self) -> int:
+        return len(self._scenes)
+
+    def _shard_index(self, scene_id: str) -> int:
+        return hash(scene_id) % len(self._shards)
+
+    @contextmanager
+    def locked(self, scene_id: str):
+        """Hold the lock stripe covering a scene"""
+        shard = self._shards[self._shard_index(scene_id)]
+        if shard.lock.acquire(blocking=False):
+            waited = None
+        else:
+            start = time.perf_counter()
+            shard.lock.acquire()
+            waited = time.perf_counter() - start
+        try:
+            shard.acquisitions += 1
+            if waited is not None:
+                shard.contended += 1
+                shard.wait_seconds += waited
+            yield
+        finally:
+            shard.lock.release()
+
+    def version(self, scene_id: str) -> int:
+        """Number of committed updates to a scene"""
+        return self._versions[scene_id]
+
+    def _commit(self, scene: Scene):
+        self._scenes[scene.id] = scene
+        self._versions[scene.id] += 1
+
+    def take_items(self, scene_id: str) -> List[str]:
+        """Atomically remove and return all items in a scene"""
+        with self.locked(scene_id):
+            scene = self._scenes[scene_id]
+            if not scene.items:
+                return []
+            self._commit(replace(scene, items=[]))
+            return list(scene.items)
+
+    def remove_npc(self, scene_id: str, npc: str) -> bool:
+        """Atomically remove an NPC, returning False if someone else got there first"""
+        with self.locked(scene_id):
+            scene = self._scenes[scene_id]
+            if npc not in scene.npcs:
+                return False
+            self._commit(replace(scene, npcs=[n for n in scene.npcs if n != npc]))
+            return True
+
+    def update(self, scene_id: str, change: Callable[[Scene], Scene], retries: int = 10) -> Optional[Scene]:
+        """Apply change() optimistically, retrying if the scene moved on meanwhile"""
+        index = self._shard_index(scene_id)
+        for _ in range(retries):
+            version = self._versions[scene_id]
+            new_scene = change(self._scenes[scene_id])
+            with self.locked(scene_id):
+                if self._versions[scene_id] == version:
+                    self._commit(new_scene)
+                    return new_scene
+                self._conflicts[index] += 1
+        return None
+
+    def contention_stats(self) -> Dict:
+        """Lock and optimistic-update contention across all shards"""
+        acquisitions = sum(s.acquisitions for s in self._shards)
+        contended = sum(s.contended for s in self._shards)
+        return {
+            "shards": len(self._shards),
+            "acquisitions": acquisitions,
+            "contended": contended,
+            "contention_rate": contended / acquisitions if acquisitions else 0.0,
+            "wait_seconds": sum(s.wait_seconds for s in self._shards),
+            "version_conflicts": sum(self._conflicts),
+            "hottest_shards": sorted(
+                ((i, s.contended) for i, s in enumerate(self._shards) if s.contended),
+                key=lambda item: item[1], reverse=True
+            )[:5]
+        }
+
+    def new_session(self, player_name: str = "Hero") -> "SharedGameEngine":
+        """Create a player session in this world"""
+        return SharedGameEngine(self, player_name)
+
+
+class SharedGameEngine(GameEngine):
+    """Game engine whose scenes live in a SharedWorld
+
+    Item pickups go through the shared world; visited flags stay per player.
+    """
+
+    _KEPT_ON_RESTART = GameEngine._KEPT_ON_RESTART + ("world",)
+
+    def __init__(self, world: SharedWorld, player_name: str = "Hero"):
+        super().__init__(player_name)
+        self.world = world
+        self.initialize_world()
+
+    def initialize_world(self, world_data: Dict = None, scenes: Dict[str, Scene] = None):
+        """Join the shared world"""
+        super().initialize_world(self.world.world_data, scenes=self.world)
+        self.visited_scenes = set()
+
+    def process_action(self, action: str):
+        """Process an action against the latest version of the current scene"""
+        if self.current_scene is not None:
+            self.current_scene = self.scenes[self.current_scene.id]
+        return super().process_action(action)
+
+    def _search_area(self) -> List[str]:
+        """Take items through the shared world so only one player gets them"""
+        if not self.current_scene:
+            return []
+        items = self.world.take_items(self.current_scene.id)
+        self.current_scene = self.scenes[self.current_scene.id]
+        return items
+
+    def _defeat_npc(self, npc: str):
+        """Remove the NPC from the shared scene"""
+        self.world.remove_npc(self.current_scene.id, npc)
+        self.current_scene = self.scenes[self.current_scene.id]
+
+    def modify_scene(self, scene_id: str, change: Callable[[Scene], Scene]) -> Optional[Scene]:
+        """Change a scene for every player in the shared world"""
+        if scene_id not in self.world:
+            return None
+        scene = self.world.update(scene_id, change)
+        if self.current_scene is not None and self.current_scene.id == scene_id:
+            self.current_scene = self.scenes[scene_id]
+        return scene
+
+    def _mark_visited(self):
+        """Track visits per player instead of on the shared scene"""
+        self.visited_scenes.add(self.current_scene.id)
@@ -0,0 +1,289 @@
+"""
+SQLite Store - Queryable session and action history persistence
+Writes are queued and group-committed by one writer thread into a WAL-mode database
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from engine import GameEngine, GameState, Player
+from events import ActionProcessed, EventBus, StateChanged
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    game_id TEXT PRIMARY KEY,
+    player TEXT NOT NULL,
+    world TEXT,
+    state TEXT NOT NULL,
+    scene_id TEXT,
+    health INTEGER,
+    gold INTEGER,
+    inventory TEXT,
+    quests TEXT,
+    actions INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_scene ON sessions (scene_id);
+CREATE INDEX IF NOT EXISTS sessions_state ON sessions (state);
+
+CREATE TABLE IF NOT EXISTS actions (
+    id INTEGER PRIMARY KEY,
+    game_id TEXT NOT NULL,
+    time REAL NOT NULL,
+    scene_id TEXT,
+    action TEXT NOT NULL,
+    action_type TEXT,
+    result TEXT,
+    success INTEGER
+);
+CREATE INDEX IF NOT EXISTS actions_game ON actions (game_id, id);
+CREATE INDEX IF NOT EXISTS actions_scene ON actions (scene_id, game_id);
+"""
+
+_UPSERT_SESSION = """
+INSERT INTO sessions (game_id, player, world, state, scene_id, health, gold, inventory, quests,
+                      actions, created_at, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (game_id) DO UPDATE SET
+    player = excluded.player, world = excluded.world, state = excluded.state,
+    scene_id = excluded.scene_id, health = excluded.health, gold = excluded.gold,
+    inventory = excluded.inventory, quests = excluded.quests,
+    actions = sessions.actions + excluded.actions, updated_at = excluded.updated_at
+"""
+
+_INSERT_ACTION = """
+INSERT INTO actions (game_id, time, scene_id, action, action_type, result, success)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SESSION_COLUMNS = ("game_id", "player", "world", "state", "scene_id", "health", "gold",
+                    "inventory", "quests", "actions", "created_at", "updated_at")
+
+_STOP = object()
+
+
+class SQLiteStore:
+    """Sessions, players and action history in one SQLite database
+
+    Callers only enqueue writes. A writer thread commits whatever has
+    queued up within flush_interval seconds (or batch_size actions) in a
+    single transaction, and repeated updates of one session within a batch
+    are merged into one. The database runs in WAL mode, so readers on
+    other threads are never blocked by the writer. Each thread gets its own
+    connection with its own prepared-statement cache.
+
+    A crash loses at most the last flush_interval of writes; call flush()
+    where a write must be durable before continuing.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.05, batch_size: int = 5000):
+        if path == ":memory:":
+            raise ValueError("SQLiteStore needs a file path so threads can share the database")
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.errors: List[Exception] = []
+        self.stats = {"batches": 0, "actions": 0, "session_updates": 0}
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA busy_timeout=5000")
+        with self._connections_lock:
+            self._connections.append(connection)
+        return connection
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's reader connection"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+            connection.row_factory = sqlite3.Row
+        return connection
+
+    # Writes
+
+    def _write_loop(self):
+        connection = self._connect()
+        while True:
+            op = self._queue.get()
+            actions, sessions, waiters = [], {}, []
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if op is _STOP:
+                    stop = True
+                elif isinstance(op, threading.Event):
+                    waiters.append(op)
+                elif op[0] == "action":
+                    actions.append(op[1])
+                else:
+                    game_id, row = op[1], op[2]
+                    previous = sessions.get(game_id)
+                    if previous is not None:
+                        # Keep the first creation time and sum the action counts
+                        row = row[:9] + (previous[9] + row[9], previous[10], row[11])
+                    sessions[game_id] = row
+                if stop or waiters or len(actions) >= self.batch_size:
+                    break
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    op = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+
+            if actions or sessions:
+                try:
+                    with connection:
+                        connection.executemany(_INSERT_ACTION, actions)
+                        connection.executemany(_UPSERT_SESSION, list(sessions.values()))
+                    self.stats["batches"] += 1
+                    self.stats["actions"] += len(actions)
+                    self.stats["session_updates"] += len(sessions)
+                except Exception as e:
+                    # Any failure only loses this batch; the writer must
+                    # live on to release waiters and later writes
+                    self.errors.append(e)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+    def record_action(self, game_id: str, scene_id: str, action: str, action_type: str = None,
+                      result: str = None, success: bool = True):
+        """Queue one action for the history"""
+        self._queue.put(("action", (game_id, time.time(), scene_id, action, action_type, result, int(success))))
+
+    def save_session(self, engine: GameEngine, new_actions: int = 0):
+        """Queue the current state of a session"""
+        player = engine.player
+        now = time.time()
+        self._queue.put(("session", engine.game_id, (
+            engine.game_id, player.name, engine.world_data.get("name"), engine.state.value,
+            engine.current_scene.id if engine.current_scene else None, player.health, player.gold,
+            json.dumps(player.inventory, ensure_ascii=False), json.dumps(player.quests, ensure_ascii=False),
+            new_actions, now, now
+        )))
+
+    def attach(self, engine: GameEngine) -> List:
+        """Persist a session and every action it processes from now on"""
+        if engine.events is None:
+            engine.events = EventBus()
+
+        def on_action(event: ActionProcessed):
+            self.record_action(event.game_id, event.scene_id, event.action, event.action_type,
+                               event.result, event.success)
+            self.save_session(engine, new_actions=1)
+
+        self.save_session(engine)
+        return [
+            engine.events.subscribe(ActionProcessed, on_action),
+            engine.events.subscribe(StateChanged, lambda event: self.save_session(engine))
+        ]
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until everything queued so far is committed
+
+        Returns False on timeout and raises RuntimeError if the writer
+        thread has stopped, as nothing would ever be committed.
+        """
+        done = threading.Event()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._queue.put(done)
+        while True:
+            wait = 0.1 if deadline is None else min(0.1, deadline - time.monotonic())
+            if done.wait(max(0.0, wait)):
+                return True
+            if not self._writer.is_alive():
+                # It may have released us just before stopping
+                if done.is_set():
+                    return True
+                raise RuntimeError("SQLiteStore writer thread has stopped")
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self):
+        """Commit pending writes and close every connection"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    # Queries
+
+    def _session_dict(self, row: sqlite3.Row) -> Dict:
+        session = dict(row)
+        session["inventory"] = json.loads(session["inventory"] or "[]")
+        session["quests"] = json.loads(session["quests"] or "[]")
+        return session
+
+    def session(self, game_id: str) -> Optional[Dict]:
+        """One session by game id"""
+        row = self._connection().execute(
+            f"SELECT {', '.join(_SESSION_COLUMNS)} FROM sessions WHERE game_id = ?", (game_id,)
+        ).fetchone()
+        return self._session_dict(row) if row else None
+
+    def sessions_in_scene(self, scene_id: str, state: str = None) -> List[Dict]:
+        """Sessions whose player is currently in a scene"""
+        sql = f"SELECT {', '.join(_SESSION_COLUMNS)} FROM sessions WHERE scene_id = ?"
+        params = [scene_id]
+        if state is not None:
+            sql += " AND state = ?"
+            params.append(state)
+        return [self._session_dict(row) for row in self._connection().execute(sql, params)]
+
+    def sessions_visited(self, scene_id: str) -> List[str]:
+        """Ids of sessions that took any action in a scene"""
+        rows = self._connection().execute(
+            "SELECT DISTINCT game_id FROM actions WHERE scene_id = ?", (scene_id,)
+        )
+        return [row[0] for row in rows]
+
+    def history(self, game_id: str, limit: int = None) -> List[Dict]:
+        """A session's actions, oldest first (the last `limit` if given)"""
+        rows = self._connection().execute(
+            "SELECT time, scene_id, action, action_type, result, success FROM actions "
+            "WHERE game_id = ? ORDER BY id DESC LIMIT ?",
+            (game_id, -1 if limit is None else limit)
+        ).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def restore(self, engine: GameEngine, game_id: str) -> bool:
+        """Put a stored session's player, state and scene back into an engine
+
+        Scene changes are not stored here; use a SaveStore for full saves.
+        """
+        session = self.session(game_id)
+        if session is None:
+            return False
+        engine.player = Player(name=session["player"], health=session["health"], gold=session["gold"],
+                               inventory=session["inventory"], quests=session["quests"])
+        engine.state = GameState(session["state"])
+        engine.game_id = game_id
+        if session["scene_id"] in engine.scenes:
+            engine.current_scene = engine.scenes[session["scene_id"]]
+        return True
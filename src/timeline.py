@@ -0,0 +1,81 @@
+"""
+Timeline - Keyframed time travel for the game engine
+Supports undo and seeking to any turn of a session
+"""
+
+from typing import Dict, List
+
+
+class Timeline:
+    """Keyframed action log attached to a GameEngine
+
+    A snapshot is taken every `keyframe_interval` actions and the actions in
+    between are kept as deltas, so seeking replays at most that many actions.
+    """
+
+    def __init__(self, engine, keyframe_interval: int = 10):
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+
+        self.engine = engine
+        self.keyframe_interval = keyframe_interval
+        self.actions: List[str] = []
+        self.keyframes: Dict = {0: engine.snapshot()}
+        self.position = 0
+        self._replaying = False
+
+        engine.timeline = self
+
+    def record(self, action: str):
+        """Record an action the engine has just applied"""
+        if self._replaying:
+            return
+
+        # A new action after seeking back starts a new branch
+        if self.position < len(self.actions):
+            del self.actions[self.position:]
+            for turn in [t for t in self.keyframes if t > self.position]:
+                del self.keyframes[turn]
+
+        self.actions.append(action)
+        self.position += 1
+
+        if self.position % self.keyframe_interval == 0:
+            self.keyframes[self.position] = self.engine.snapshot()
+
+    def seek(self, turn: int):
+        """Move the engine to the state after `turn` actions"""
+        turn = max(0, min(turn, len(self.actions)))
+        keyframe_turn = turn - turn % self.keyframe_interval
+
+        engine = self.engine
+        engine.restore(self.keyframes[keyframe_turn])
+        # Replayed actions already happened once: subscribers (clocks, quests,
+        # stores) and metrics must not see them again
+        events, metrics = engine.events, engine.metrics
+        engine.events = engine.metrics = None
+        self._replaying = True
+        try:
+            for action in self.actions[keyframe_turn:turn]:
+                engine.process_action(action)
+        finally:
+            self._replaying = False
+            engine.events, engine.metrics = events, metrics
+
+        self.position = turn
+
+    def undo(self, steps: int = 1):
+        """Step back through the timeline"""
+        self.seek(self.position - steps)
+
+    def redo(self, steps: int = 1):
+        """Step forward again after an undo"""
+        self.seek(self.position + steps)
+
+    def detach(self):
+        """Stop recording actions"""
+        if self.engine.timeline is self:
+            self.engine.timeline = None
+
+    def __len__(self) -> int:
+        return len(self.actions)
@@ -0,0 +1,349 @@
+"""
+Turn Scheduler - Fair turn dispatch for sessions sharing a host
+Priority classes keep human turns snappy while bots play in large batched slices
+"""
+
+import heapq
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+from engine import GameEngine, GameState
+from events import ActionProcessed, EventBus
+from metrics import Histogram, MetricsRegistry
+
+
+@dataclass(frozen=True)
+class TurnClass:
+    """A priority class of sessions
+
+    Lower priority numbers are served first. A slice is how many turns a
+    session may play once picked, cut short after slice_seconds or when a
+    higher class has work. A class whose oldest waiting turn has waited
+    longer than latency_target is served ahead of the classes above it,
+    so no class starves.
+    """
+    name: str
+    priority: int
+    slice_turns: int = 1
+    slice_seconds: float = 0.005
+    latency_target: float = 0.05
+
+
+DEFAULT_CLASSES = (
+    TurnClass("interactive", priority=0, slice_turns=1, latency_target=0.05),
+    TurnClass("bot", priority=1, slice_turns=64, slice_seconds=0.02, latency_target=1.0)
+)
+
+
+class _Session:
+    """A scheduled session: queued turns, or a bot that makes its own"""
+
+    __slots__ = ("engine", "turn_class", "weight", "finish", "ready_since", "turns", "ai_player",
+                 "max_turns", "played", "subscription", "running")
+
+    def __init__(self, engine: GameEngine, turn_class: TurnClass, weight: float, ai_player=None,
+                 max_turns: int = None):
+        self.engine = engine
+        self.turn_class = turn_class
+        self.weight = weight
+        self.finish = 0.0
+        self.ready_since: Optional[float] = None
+        self.turns: Deque[Tuple[str, Future, float]] = deque()
+        self.ai_player = ai_player
+        self.max_turns = max_turns
+        self.played = 0
+        self.subscription = None
+        self.running = False
+
+    def has_turn(self) -> bool:
+        if self.ai_player is None:
+            return bool(self.turns)
+        return (self.engine.state == GameState.PLAYING and self.engine.current_scene is not None
+                and (self.max_turns is None or self.played < self.max_turns))
+
+
+class _ClassQueue:
+    """Ready sessions of one class, by virtual finish time and by age"""
+
+    def __init__(self, turn_class: TurnClass):
+        self.turn_class = turn_class
+        self.heap: List[Tuple[float, int, _Session]] = []
+        self.oldest: "OrderedDict[int, _Session]" = OrderedDict()
+        self.virtual_time = 0.0
+        self.depth = 0
+        self.served = 0
+        self.slices = 0
+        self.preempted = 0
+        self.over_target = 0
+        self.waits = Histogram()
+
+    def oldest_wait(self, now: float) -> float:
+        if not self.oldest:
+            return 0.0
+        return now - next(iter(self.oldest.values())).ready_since
+
+
+class TurnScheduler:
+    """Dispatches the turns of many sessions in priority and fair-share order
+
+    Interactive sessions queue turns with submit() and get a Future for
+    each result. Bot sessions added with add_bot() are always ready and
+    choose their own actions, one slice of turns at a time. Classes are
+    served strictly by priority (unless a lower one is over its latency
+    target), and within a class sessions share turns in proportion to
+    their weights by start-time fair queuing: each session carries a
+    virtual finish time that grows by turns played / weight, and the
+    ready session with the smallest one goes next.
+
+    Turns run on the threads that call run_once(), or on worker threads
+    from start(). A session is only ever played by one thread at a time.
+    """
+
+    def __init__(self, classes: Tuple[TurnClass, ...] = DEFAULT_CLASSES, metrics: MetricsRegistry = None,
+                 clock=time.perf_counter):
+        self.classes = {turn_class.name: turn_class for turn_class in classes}
+        self.metrics = metrics
+        self.clock = clock
+        self._queues = [_ClassQueue(turn_class) for turn_class in sorted(classes, key=lambda c: c.priority)]
+        self._by_name = {queue.turn_class.name: queue for queue in self._queues}
+        self._sessions: Dict[str, _Session] = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+    # Sessions
+
+    def add_session(self, engine: GameEngine, turn_class: str = "interactive", weight: float = 1.0) -> str:
+        """Schedule a session whose turns arrive through submit()"""
+        return self._add(_Session(engine, self.classes[turn_class], weight))
+
+    def add_bot(self, engine: GameEngine, ai_player, turn_class: str = "bot", weight: float = 1.0,
+                max_turns: int = None) -> str:
+        """Schedule a bot that plays until its game ends or max_turns
+
+        Bots that play for long should be created with keep_history=False,
+        as every decision is otherwise kept.
+        """
+        session = _Session(engine, self.classes[turn_class], weight, ai_player, max_turns)
+        if engine.events is None:
+            engine.events = EventBus()
+        session.subscription = engine.events.subscribe(ActionProcessed, ai_player.on_action_processed)
+        game_id = self._add(session)
+        with self._lock:
+            self._make_ready(session, self.clock())
+        return game_id
+
+    def _add(self, session: _Session) -> str:
+        game_id = session.engine.game_id
+        with self._lock:
+            if game_id in self._sessions:
+                raise ValueError(f"Session already scheduled: {game_id}")
+            self._sessions[game_id] = session
+        return game_id
+
+    def remove(self, game_id: str):
+        """Stop scheduling a session; its queued turns are cancelled"""
+        with self._lock:
+            session = self._sessions.pop(game_id)
+            self._make_idle(session)
+            for _, future, _ in session.turns:
+                future.cancel()
+            session.turns.clear()
+        if session.subscription is not None:
+            session.engine.events.unsubscribe(session.subscription)
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def submit(self, game_id: str, action: str) -> Future:
+        """Queue a turn; the Future resolves to process_action()'s result"""
+        future = Future()
+        with self._lock:
+            session = self._sessions[game_id]
+            now = self.clock()
+            session.turns.append((action, future, now))
+            self._by_name[session.turn_class.name].depth += 1
+            if not session.running and session.ready_since is None:
+                self._make_ready(session, now)
+        return future
+
+    # Ready queues, all called with the lock held
+
+    def _make_ready(self, session: _Session, now: float):
+        queue = self._by_name[session.turn_class.name]
+        # A session returning from idle starts at the class's virtual time
+        # rather than claiming the share it missed while it had no turns
+        session.finish = max(session.finish, queue.virtual_time)
+        session.ready_since = session.turns[0][2] if session.turns else now
+        self._sequence += 1
+        heapq.heappush(queue.heap, (session.finish, self._sequence, session))
+        queue.oldest[id(session)] = session
+        self._ready.notify()
+
+    def _make_idle(self, session: _Session):
+        if session.ready_since is not None:
+            queue = self._by_name[session.turn_class.name]
+            queue.oldest.pop(id(session), None)
+            queue.depth -= len(session.turns)
+            session.ready_since = None
+
+    def _pick(self, now: float) -> Optional[_Session]:
+        """The next session to play: overdue classes first, then by priority"""
+        chosen = None
+        for queue in self._queues:
+            if queue.oldest:
+                if chosen is None:
+                    chosen = queue
+                if queue.oldest_wait(now) > queue.turn_class.latency_target:
+                    chosen = queue
+                    break
+        if chosen is None:
+            return None
+
+        heap = chosen.heap
+        while True:
+            _, _, session = heapq.heappop(heap)
+            # Entries of removed or idle sessions are dropped lazily
+            if session.ready_since is not None and id(session) in chosen.oldest and not session.running:
+                break
+        chosen.virtual_time = session.finish
+        del chosen.oldest[id(session)]
+        session.running = True
+        return session
+
+    # Dispatch
+
+    def _higher_waiting(self, turn_class: TurnClass) -> bool:
+        for queue in self._queues:
+            if queue.turn_class.priority >= turn_class.priority:
+                return False
+            if queue.oldest:
+                return True
+        return False
+
+    def run_once(self, timeout: float = 0.0) -> int:
+        """Play one slice of the next session, waiting up to timeout for one; returns turns played"""
+        with self._lock:
+            session = self._pick(self.clock())
+            if session is None and timeout:
+                self._ready.wait(timeout)
+                session = self._pick(self.clock())
+            if session is None:
+                return 0
+
+        turn_class = session.turn_class
+        queue = self._by_name[turn_class.name]
+        start = self.clock()
+        played = 0
+        preempted = False
+        try:
+            while played < turn_class.slice_turns:
+                if played:
+                    if self._higher_waiting(turn_class):
+                        preempted = True
+                        break
+                    if self.clock() - start >= turn_class.slice_seconds:
+                        break
+                if not self._play_turn(session, queue, start if played == 0 else None):
+                    break
+                played += 1
+        finally:
+            with self._lock:
+                session.running = False
+                session.ready_since = None
+                session.finish += played / session.weight
+                queue.served += played
+                queue.slices += 1
+                queue.preempted += preempted
+                if session.engine.game_id in self._sessions and session.has_turn():
+                    self._make_ready(session, self.clock())
+        return played
+
+    def _play_turn(self, session: _Session, queue: _ClassQueue, dispatched: Optional[float]) -> bool:
+        """Play the session's next turn, returning False if it has none
+
+        A bot's wait is recorded once per slice, as the time from becoming
+        ready to `dispatched`; queued turns each record their own wait.
+        """
+        if session.ai_player is not None:
+            if not session.has_turn():
+                return False
+            if dispatched is not None:
+                self._record_wait(queue, dispatched - session.ready_since)
+            engine = session.engine
+            action = session.ai_player.choose_action(engine.current_scene, engine)
+            engine.process_action(action)
+            session.played += 1
+            return True
+
+        with self._lock:
+            if not session.turns:
+                return False
+            action, future, enqueued = session.turns.popleft()
+            queue.depth -= 1
+        self._record_wait(queue, self.clock() - enqueued)
+        if not future.set_running_or_notify_cancel():
+            return True
+        try:
+            future.set_result(session.engine.process_action(action))
+        except Exception as error:
+            future.set_exception(error)
+        session.played += 1
+        return True
+
+    def _record_wait(self, queue: _ClassQueue, wait: float):
+        queue.waits.observe(wait)
+        if wait > queue.turn_class.latency_target:
+            queue.over_target += 1
+        if self.metrics is not None:
+            self.metrics.observe("scheduler_wait_seconds", wait, turn_class=queue.turn_class.name)
+
+    # Worker threads
+
+    def start(self, threads: int = 1):
+        """Run turns on background threads until stop()"""
+        self._running = True
+        for _ in range(threads):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while self._running:
+            self.run_once(timeout=0.05)
+
+    def stop(self):
+        """Stop the worker threads after their current slice"""
+        self._running = False
+        with self._lock:
+            self._ready.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def stats(self) -> Dict[str, Dict]:
+        """Queue depth, waiting sessions and wait times per class"""
+        now = self.clock()
+        with self._lock:
+            return {queue.turn_class.name: {
+                "depth": queue.depth + sum(1 for session in queue.oldest.values() if session.ai_player),
+                "waiting_sessions": len(queue.oldest),
+                "oldest_wait_s": queue.oldest_wait(now),
+                "served": queue.served,
+                "slices": queue.slices,
+                "preempted": queue.preempted,
+                "wait_p50_s": queue.waits.quantile(0.5),
+                "wait_p99_s": queue.waits.quantile(0.99),
+                "wait_mean_s": queue.waits.sum / queue.waits.count if queue.waits.count else 0.0,
+                "over_target": queue.over_target,
+                "latency_target_s": queue.turn_class.latency_target
+            } for queue in self._queues}
@@ -0,0 +1,308 @@
+"""
+World Clock - Game time and timed world events
+Time of day, weather, item respawns and wandering NPCs on a hierarchical timer wheel
+"""
+
+import random
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional, Set
+
+from engine import GameEngine
+from events import ActionProcessed, EventBus, ItemFound
+
+# Each wheel level has 2**SLOT_BITS slots; level n slots span 64**n ticks
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+SLOT_MASK = SLOTS - 1
+LEVELS = 4
+HORIZON = SLOTS ** LEVELS
+
+MINUTES_PER_DAY = 24 * 60
+
+# (start minute, time of day, announcement) in the order they occur
+TIMES_OF_DAY = (
+    (5 * 60, "dawn", "🌅 天边泛起鱼肚白，黎明来临。"),
+    (7 * 60, "day", "☀️ 太阳升起，白昼开始了。"),
+    (19 * 60, "night", "🌙 夜幕降临，四周暗了下来。")
+)
+
+WEATHER = {
+    "clear": "🌤️ 天空放晴了。",
+    "rain": "🌧️ 开始下雨了。",
+    "fog": "🌫️ 起雾了。"
+}
+
+
+class Timer:
+    """A scheduled callback; cancel() is O(1) and takes effect lazily"""
+
+    __slots__ = ("deadline", "callback", "args", "cancelled")
+
+    def __init__(self, deadline: int, callback: Callable, args: tuple):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        # Release what the timer refers to now rather than when it is reached
+        self.callback = None
+        self.args = ()
+
+
+class TimerWheel:
+    """Hierarchical timing wheel over integer ticks
+
+    Level 0 holds timers due within SLOTS ticks, one slot per tick; each
+    higher level covers SLOTS times the span of the one below. When level 0
+    wraps around, the next slot of level 1 is redistributed into it, and so
+    on upwards, so a timer is moved at most LEVELS - 1 times before it
+    fires. Scheduling, cancelling and firing are O(1) amortized however
+    many timers are pending. Timers further out than HORIZON ticks wait in
+    an overflow list that is redistributed once per full turn.
+    """
+
+    def __init__(self, now: int = 0):
+        self.now = now
+        self.pending = 0
+        self._wheels: List[List[List[Timer]]] = [[[] for _ in range(SLOTS)] for _ in range(LEVELS)]
+        self._overflow: List[Timer] = []
+
+    def schedule(self, delay: int, callback: Callable, *args) -> Timer:
+        """Call callback(*args) once `delay` ticks from now (at least one)"""
+        timer = Timer(self.now + max(1, delay), callback, args)
+        self._insert(timer)
+        self.pending += 1
+        return timer
+
+    def _insert(self, timer: Timer):
+        distance = timer.deadline - self.now
+        for level in range(LEVELS):
+            if distance < 1 << (SLOT_BITS * (level + 1)):
+                slot = (timer.deadline >> (SLOT_BITS * level)) & SLOT_MASK
+                self._wheels[level][slot].append(timer)
+                return
+        self._overflow.append(timer)
+
+    def _cascade(self, level: int) -> int:
+        """Redistribute the current slot of a level, returning its index"""
+        index = (self.now >> (SLOT_BITS * level)) & SLOT_MASK
+        wheel = self._wheels[level]
+        timers, wheel[index] = wheel[index], []
+        for timer in timers:
+            if timer.cancelled:
+                self.pending -= 1
+            else:
+                self._insert(timer)
+        return index
+
+    def advance(self, ticks: int = 1) -> int:
+        """Move time forward, firing every timer that comes due, and return how many fired"""
+        fired = 0
+        target = self.now + ticks
+        level0 = self._wheels[0]
+        while self.now < target:
+            self.now += 1
+            index = self.now & SLOT_MASK
+            if index == 0:
+                level = 1
+                while level < LEVELS and self._cascade(level) == 0:
+                    level += 1
+                if level == LEVELS and self._overflow:
+                    overflow, self._overflow = self._overflow, []
+                    for timer in overflow:
+                        self._insert(timer)
+            elif not level0[index]:
+                # Skip ahead to the next busy slot, the end of this turn or the target
+                busy = index + 1
+                limit = min(SLOTS, index + target - self.now + 1)
+                while busy < limit and not level0[busy]:
+                    busy += 1
+                self.now += busy - index - 1
+                continue
+            # Callbacks may schedule timers due now, which land in this slot again
+            while level0[index]:
+                timers, level0[index] = level0[index], []
+                for timer in timers:
+                    self.pending -= 1
+                    if not timer.cancelled:
+                        fired += 1
+                        timer.callback(*timer.args)
+        return fired
+
+
+class _Attached:
+    """An engine's subscriptions and pending timers on a WorldClock"""
+
+    __slots__ = ("engine", "subscriptions", "timers")
+
+    def __init__(self, engine: GameEngine):
+        self.engine: Optional[GameEngine] = engine
+        self.subscriptions: List = []
+        self.timers: Set[Timer] = set()
+
+
+class WorldClock:
+    """Game time shared by the sessions attached to it
+
+    Time is counted in minutes on a TimerWheel and advances by
+    minutes_per_action whenever an attached engine processes an action.
+    The clock moves between dawn, day and night and changes the weather
+    every few hours; attached engines also get taken items back after
+    respawn_minutes, and NPCs listed with wander() walk to a neighbouring
+    scene on their own schedule. Announcements collect in take_messages().
+
+    When several sessions share one clock, time advances with their
+    combined actions.
+    """
+
+    def __init__(self, start_minute: int = 8 * 60, minutes_per_action: int = 10,
+                 respawn_minutes: int = 6 * 60, weather_minutes: int = 3 * 60,
+                 rng: random.Random = None):
+        self.minutes_per_action = minutes_per_action
+        self.respawn_minutes = respawn_minutes
+        self.weather_minutes = weather_minutes
+        self.rng = rng if rng is not None else random.Random()
+        self.wheel = TimerWheel(start_minute)
+        self.weather = "clear"
+        self.time_of_day = self._phase(start_minute)[1]
+        self.messages: List[str] = []
+        # By engine identity, as game ids change on load, restore and restart
+        self._attached: Dict[int, _Attached] = {}
+
+        self._schedule_next_phase()
+        if weather_minutes:
+            self.wheel.schedule(weather_minutes, self._change_weather)
+
+    @property
+    def minute(self) -> int:
+        """Minutes since day 0 began"""
+        return self.wheel.now
+
+    @property
+    def day(self) -> int:
+        return self.minute // MINUTES_PER_DAY
+
+    def clock_text(self) -> str:
+        """Time as 第N天 HH:MM"""
+        minute = self.minute % MINUTES_PER_DAY
+        return f"第{self.day + 1}天 {minute // 60:02d}:{minute % 60:02d}"
+
+    def context(self) -> Dict:
+        """Scene context for AIDungeonMaster.describe_scene()"""
+        return {"time_of_day": self.time_of_day, "weather": self.weather}
+
+    def advance(self, minutes: int) -> int:
+        """Let time pass, firing due events"""
+        return self.wheel.advance(minutes)
+
+    def take_messages(self) -> List[str]:
+        """Announcements since the last call"""
+        messages, self.messages = self.messages, []
+        return messages
+
+    # Time of day and weather
+
+    @staticmethod
+    def _phase(minute: int):
+        """The time of day phase a minute falls in"""
+        minute %= MINUTES_PER_DAY
+        current = TIMES_OF_DAY[-1]
+        for phase in TIMES_OF_DAY:
+            if minute >= phase[0]:
+                current = phase
+        return current
+
+    def _schedule_next_phase(self):
+        minute = self.minute % MINUTES_PER_DAY
+        starts = [phase[0] for phase in TIMES_OF_DAY]
+        upcoming = [start for start in starts if start > minute]
+        next_start = upcoming[0] if upcoming else starts[0] + MINUTES_PER_DAY
+        self.wheel.schedule(next_start - minute, self._change_phase)
+
+    def _change_phase(self):
+        _, self.time_of_day, message = self._phase(self.minute)
+        self.messages.append(message)
+        self._schedule_next_phase()
+
+    def _change_weather(self):
+        weather = self.rng.choice(sorted(WEATHER))
+        if weather != self.weather:
+            self.weather = weather
+            self.messages.append(WEATHER[weather])
+        self.wheel.schedule(self.weather_minutes, self._change_weather)
+
+    # Sessions
+
+    def _session(self, engine: GameEngine) -> _Attached:
+        session = self._attached.get(id(engine))
+        if session is None:
+            session = self._attached[id(engine)] = _Attached(engine)
+        return session
+
+    def _schedule(self, session: _Attached, delay: int, callback: Callable, *args) -> Timer:
+        """Schedule callback(engine, *args), cancelled if the engine is detached first"""
+        timer = self.wheel.schedule(delay, self._fire, session, None, callback, args)
+        # The timer removes itself from the session when it fires
+        timer.args = (session, timer, callback, args)
+        session.timers.add(timer)
+        return timer
+
+    def _fire(self, session: _Attached, timer: Timer, callback: Callable, args: tuple):
+        session.timers.discard(timer)
+        if session.engine is not None:
+            callback(session.engine, *args)
+
+    def attach(self, engine: GameEngine):
+        """Advance with the engine's actions and respawn the items it takes"""
+        if engine.events is None:
+            engine.events = EventBus()
+        session = self._session(engine)
+        if session.subscriptions:
+            return
+        session.subscriptions = [
+            engine.events.subscribe(ActionProcessed, lambda event: self.advance(self.minutes_per_action)),
+            engine.events.subscribe(ItemFound, lambda event: self._on_items_found(session, event))
+        ]
+
+    def detach(self, engine: GameEngine):
+        """Stop following an engine and cancel its respawns and wandering NPCs"""
+        session = self._attached.pop(id(engine), None)
+        if session is None:
+            return
+        for subscription in session.subscriptions:
+            engine.events.unsubscribe(subscription)
+        for timer in session.timers:
+            timer.cancel()
+        session.timers.clear()
+        session.engine = None
+
+    def _on_items_found(self, session: _Attached, event: ItemFound):
+        if self.respawn_minutes:
+            self._schedule(session, self.respawn_minutes, self._respawn, event.scene_id, event.items)
+
+    @staticmethod
+    def _respawn(engine: GameEngine, scene_id: str, items):
+        def restock(scene):
+            return replace(scene, items=scene.items + [item for item in items if item not in scene.items])
+        engine.modify_scene(scene_id, restock)
+
+    def wander(self, engine: GameEngine, npc: str, scene_id: str, every: int = 60) -> Optional[Timer]:
+        """Move an NPC to a random neighbouring scene every `every` minutes, until detach()"""
+        if scene_id not in engine.scenes or npc not in engine.scenes[scene_id].npcs:
+            return None
+        return self._schedule(self._session(engine), every, self._wander, npc, scene_id, every)
+
+    def _wander(self, engine: GameEngine, npc: str, scene_id: str, every: int):
+        scene = engine.scenes.get(scene_id)
+        if scene is None or npc not in scene.npcs:
+            return  # defeated or moved by someone else
+        exits = [opt["target"] for opt in scene.options
+                 if opt.get("action") == "move" and opt.get("target") in engine.scenes]
+        if exits:
+            target = self.rng.choice(exits)
+            engine.modify_scene(scene_id, lambda s: replace(s, npcs=[n for n in s.npcs if n != npc]))
+            engine.modify_scene(target, lambda s: replace(s, npcs=s.npcs + [npc]))
+            scene_id = target
+        self._schedule(self._attached[id(engine)], every, self._wander, npc, scene_id, every)
@@ -0,0 +1,428 @@
+"""
+World Explorer - Exhaustive state-space search over a world
+Walks every reachable state to find broken moves, unreachable goals, dead ends and softlocks
+"""
+
+import argparse
+import json
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from engine import DEFAULT_WORLD
+
+# Compiled option kinds
+MOVE, SEARCH, FIGHT = 0, 1, 2
+
+# How many shortest example states to keep per problem
+EXAMPLES = 5
+
+# Model used by pool workers, set once per process by _init_worker
+_worker_model: Optional["WorldModel"] = None
+
+
+class WorldModel:
+    """A world compiled for state-space search
+
+    A state is one int: the scene number in the low bits, then one bit per
+    scene with items (set once it has been searched) and one bit per
+    distinct NPC of a scene (set once defeated). The inventory is the
+    items of the searched scenes, so (scene, inventory, scene items) is
+    encoded without storing any lists, and states hash and compare as
+    plain ints.
+
+    Transitions follow GameEngine: moves to existing scenes, searching
+    takes all of a scene's items, fighting the scene's first NPC is either
+    won or lost, and reaching the victory scene ends the game. Restart,
+    quit and every other action leave the state unchanged and are ignored.
+    """
+
+    def __init__(self, world_data: Dict):
+        scenes = world_data.get("scenes", {})
+        self.scene_ids: List[str] = list(scenes)
+        number = {scene_id: i for i, scene_id in enumerate(self.scene_ids)}
+
+        start = world_data.get("start_scene", "forest_entrance")
+        if start not in number:
+            raise ValueError(f"Start scene not in world: {start}")
+        self.victory_id = world_data.get("victory_scene", "victory")
+        self.victory = number.get(self.victory_id, -1)
+
+        self.scene_bits = max(1, len(self.scene_ids).bit_length())
+        self.scene_mask = (1 << self.scene_bits) - 1
+        bit = self.scene_bits
+
+        # Per scene: items and the bit recording they were taken
+        self.items: List[List[str]] = []
+        self.item_bit: List[int] = []
+        # Per scene: (npc, bit) in fight order
+        self.npcs: List[List[Tuple[str, int]]] = []
+        # Per scene: compiled (kind, argument, option text)
+        self.options: List[List[Tuple[int, int, str]]] = []
+        self.missing_targets: List[Tuple[str, str, str]] = []
+
+        for scene_id in self.scene_ids:
+            scene = scenes[scene_id]
+            items = list(scene.get("items") or [])
+            self.items.append(items)
+            if items:
+                self.item_bit.append(1 << bit)
+                bit += 1
+            else:
+                self.item_bit.append(0)
+
+            npcs = []
+            for npc in scene.get("npcs") or []:
+                if all(npc != name for name, _ in npcs):
+                    npcs.append((npc, 1 << bit))
+                    bit += 1
+            self.npcs.append(npcs)
+
+            options = []
+            for option in scene.get("options") or []:
+                action, text = option.get("action", ""), option.get("text", "")
+                if action == "move":
+                    target = option.get("target")
+                    if target in number:
+                        options.append((MOVE, number[target], text))
+                    else:
+                        self.missing_targets.append((scene_id, text, target))
+                elif action == "search":
+                    options.append((SEARCH, 0, text))
+                elif action == "fight":
+                    options.append((FIGHT, 0, text))
+            self.options.append(options)
+
+        self.bits = bit
+        self.initial = number[start]
+
+    def successors(self, state: int) -> Tuple[Set[int], bool]:
+        """States one action away, and whether some action can lose the game"""
+        scene = state & self.scene_mask
+        result = set()
+        can_lose = False
+        for kind, argument, _ in self.options[scene]:
+            if kind == MOVE:
+                result.add((state & ~self.scene_mask) | argument)
+            elif kind == SEARCH:
+                taken = self.item_bit[scene]
+                if taken and not state & taken:
+                    result.add(state | taken)
+            else:
+                for _, defeated in self.npcs[scene]:
+                    if not state & defeated:
+                        result.add(state | defeated)
+                        can_lose = True
+                        break
+        result.discard(state)
+        return result, can_lose
+
+    def step(self, state: int, successor: int) -> str:
+        """Text of an option leading from one state to another"""
+        scene = state & self.scene_mask
+        for kind, argument, text in self.options[scene]:
+            if kind == MOVE and (state & ~self.scene_mask) | argument == successor:
+                return text
+            if kind == SEARCH and state | self.item_bit[scene] == successor:
+                return text
+            if kind == FIGHT and any(state | defeated == successor for _, defeated in self.npcs[scene]):
+                return text
+        return "?"
+
+    def inventory(self, state: int) -> List[str]:
+        """Items held in a state, in scene order"""
+        return [item for items, taken in zip(self.items, self.item_bit) if state & taken for item in items]
+
+    def defeated(self, state: int) -> List[str]:
+        """NPCs defeated in a state"""
+        return [npc for npcs in self.npcs for npc, bit in npcs if state & bit]
+
+    def describe(self, state: int) -> Dict:
+        """A state in readable form"""
+        return {"scene": self.scene_ids[state & self.scene_mask],
+                "inventory": self.inventory(state), "defeated": self.defeated(state)}
+
+
+def _init_worker(model: WorldModel):
+    global _worker_model
+    _worker_model = model
+
+
+def _expand_chunk(states: List[int]) -> List[Tuple[Set[int], bool]]:
+    return [_worker_model.successors(state) for state in states]
+
+
+@dataclass
+class ExplorationReport:
+    """What exploring a world found"""
+    states: int = 0
+    transitions: int = 0
+    won_states: int = 0
+    losing_states: int = 0
+    scenes: int = 0
+    unreachable_scenes: List[str] = field(default_factory=list)
+    missing_targets: List[Tuple[str, str, str]] = field(default_factory=list)
+    victory_scene: str = "victory"
+    victory_reachable: bool = False
+    dead_ends: int = 0
+    softlocks: Optional[int] = None
+    unreachable_quests: List[str] = field(default_factory=list)
+    examples: Dict[str, List[Dict]] = field(default_factory=dict)
+    truncated: bool = False
+    seconds: float = 0.0
+
+    def ok(self) -> bool:
+        """True if nothing is wrong with the world"""
+        return (not self.missing_targets and not self.unreachable_scenes and self.victory_reachable
+                and not self.dead_ends and not self.softlocks and not self.unreachable_quests)
+
+    def lines(self) -> List[str]:
+        """Human-readable summary"""
+        lines = [f"状态数: {self.states:,}  转移数: {self.transitions:,}  "
+                 f"用时: {self.seconds:.2f}s{'  (已截断)' if self.truncated else ''}"]
+        for scene_id, text, target in self.missing_targets:
+            lines.append(f"❌ 场景 {scene_id} 的选项「{text}」指向不存在的场景 {target}")
+        for scene_id in self.unreachable_scenes:
+            lines.append(f"⚠️ 无法到达场景 {scene_id}")
+        if not self.victory_reachable:
+            lines.append(f"❌ 无法到达胜利场景 {self.victory_scene}")
+        for quest_id in self.unreachable_quests:
+            lines.append(f"⚠️ 无法完成任务 {quest_id}")
+        if self.dead_ends:
+            lines.append(f"❌ {self.dead_ends:,} 个死路状态 (没有任何可改变状态的行动)")
+        if self.softlocks:
+            lines.append(f"❌ {self.softlocks:,} 个软锁状态 (再也无法获胜)")
+        for kind, examples in self.examples.items():
+            for example in examples:
+                lines.append(f"   {kind}: {example['scene']} 背包={example['inventory']} "
+                             f"路径={' → '.join(example['path'])}")
+        if self.ok():
+            lines.append("✅ 没有发现问题")
+        return lines
+
+
+class WorldExplorer:
+    """Breadth-first search over every reachable state of a world
+
+    States are deduplicated in a dict from encoded state to state number.
+    Each BFS level is expanded in this process or, with workers > 1 and a
+    large enough frontier, split across a process pool; either way the
+    parent owns the visited set, so results do not depend on workers.
+
+    Edges are kept in flat arrays so that after the search the states that
+    can still reach victory are found by one backwards pass; the others
+    are softlocks. Search stops adding states at max_states.
+    """
+
+    def __init__(self, world_data: Dict = None, workers: int = 1, max_states: int = 5_000_000,
+                 chunk_size: int = 20_000):
+        self.world_data = world_data if world_data is not None else DEFAULT_WORLD
+        self.model = WorldModel(self.world_data)
+        self.workers = workers
+        self.max_states = max_states
+        self.chunk_size = chunk_size
+
+    def explore(self) -> ExplorationReport:
+        """Walk the state space and report problems"""
+        start = time.perf_counter()
+        model = self.model
+        report = ExplorationReport(scenes=len(model.scene_ids), victory_scene=model.victory_id,
+                                   missing_targets=list(model.missing_targets))
+
+        index: Dict[int, int] = {model.initial: 0}
+        states = [model.initial]
+        parent = array("I", [0])
+        sources, targets = array("I"), array("I")
+        won: List[int] = []
+        dead_ends: List[int] = []
+
+        frontier = [model.initial]
+        if model.initial == model.victory:
+            won.append(0)
+            frontier = []
+
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(model,))
+        lookup, victory, scene_mask = index.get, model.victory, model.scene_mask
+        add_source, add_target = sources.append, targets.append
+        try:
+            while frontier:
+                next_frontier = []
+                for state, (successors, can_lose) in zip(frontier, self._expand(frontier, pool)):
+                    number = index[state]
+                    report.losing_states += can_lose
+                    if not successors:
+                        dead_ends.append(number)
+                    for successor in successors:
+                        target = lookup(successor)
+                        if target is None:
+                            target = len(states)
+                            if target >= self.max_states:
+                                report.truncated = True
+                                continue
+                            index[successor] = target
+                            states.append(successor)
+                            parent.append(number)
+                            if successor & scene_mask == victory:
+                                won.append(target)
+                            else:
+                                next_frontier.append(successor)
+                        add_source(number)
+                        add_target(target)
+                frontier = next_frontier
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        reached = set(state & model.scene_mask for state in states)
+        report.unreachable_scenes = [scene_id for i, scene_id in enumerate(model.scene_ids) if i not in reached]
+        report.states = len(states)
+        report.transitions = len(sources)
+        report.won_states = len(won)
+        report.victory_reachable = bool(won)
+        report.dead_ends = len(dead_ends)
+        report.unreachable_quests = self._unreachable_quests(states, reached)
+
+        def example(number: int) -> Dict:
+            described = model.describe(states[number])
+            path = []
+            while number:
+                path.append(model.step(states[parent[number]], states[number]))
+                number = parent[number]
+            described["path"] = path[::-1]
+            return described
+
+        if dead_ends:
+            report.examples["dead_end"] = [example(number) for number in dead_ends[:EXAMPLES]]
+        # Without victory, or with part of the space cut off, every state looks stuck
+        if won and not report.truncated:
+            softlocks = self._softlocks(len(states), sources, targets, won)
+            report.softlocks = len(softlocks)
+            if softlocks:
+                report.examples["softlock"] = [example(number) for number in softlocks[:EXAMPLES]]
+
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def _expand(self, frontier: List[int], pool) -> List[Tuple[Set[int], bool]]:
+        if pool is None or len(frontier) < 2 * self.chunk_size:
+            return [self.model.successors(state) for state in frontier]
+        size = max(self.chunk_size, -(-len(frontier) // (4 * self.workers)))
+        chunks = [frontier[i:i + size] for i in range(0, len(frontier), size)]
+        return [result for chunk in pool.map(_expand_chunk, chunks) for result in chunk]
+
+    @staticmethod
+    def _softlocks(count: int, sources: array, targets: array, won: List[int]) -> List[int]:
+        """States, in BFS order, from which no path leads to victory"""
+        # Reverse edges in compressed sparse row form
+        starts = array("I", bytes(4 * (count + 1)))
+        for target in targets:
+            starts[target + 1] += 1
+        for i in range(count):
+            starts[i + 1] += starts[i]
+        fill = array("I", starts)
+        predecessors = array("I", bytes(4 * len(sources)))
+        for source, target in zip(sources, targets):
+            predecessors[fill[target]] = source
+            fill[target] += 1
+
+        can_win = bytearray(count)
+        stack = list(won)
+        for number in stack:
+            can_win[number] = 1
+        while stack:
+            number = stack.pop()
+            for i in range(starts[number], starts[number + 1]):
+                source = predecessors[i]
+                if not can_win[source]:
+                    can_win[source] = 1
+                    stack.append(source)
+        return [number for number in range(count) if not can_win[number]]
+
+    def _unreachable_quests(self, states: List[int], reached: Set[int]) -> List[str]:
+        """Quests no reachable state can complete
+
+        Item and defeat conditions must hold together in one state; enter
+        conditions only need the scene to be reachable. Items granted by
+        completable quests and triggers count as obtainable everywhere.
+        """
+        model = self.model
+        item_masks: Dict[str, int] = {}
+        for items, taken in zip(model.items, model.item_bit):
+            for item in items:
+                item_masks[item] = item_masks.get(item, 0) | taken
+        npc_masks: Dict[str, int] = {}
+        for npcs in model.npcs:
+            for npc, bit in npcs:
+                npc_masks[npc] = npc_masks.get(npc, 0) | bit
+        number = {scene_id: i for i, scene_id in enumerate(model.scene_ids)}
+        # Conditions are checked against each reachable combination of taken
+        # items and defeated NPCs once, not against every state that has it
+        progress_masks = {state & ~model.scene_mask for state in states}
+
+        rules = {}
+        for spec in self.world_data.get("quests", []):
+            rules[spec["id"]] = ([next(iter(c.items())) for c in spec.get("conditions", [])],
+                                 spec.get("rewards", {}).get("items", []))
+        for spec in self.world_data.get("triggers", []):
+            rules["trigger:" + spec["id"]] = ([next(iter(spec["on"].items()))],
+                                              spec.get("effects", {}).get("items", []))
+
+        granted: Set[str] = set()
+        done: Set[str] = set()
+        progress = True
+        while progress:
+            progress = False
+            for rule_id, (conditions, rewards) in rules.items():
+                if rule_id in done:
+                    continue
+                masks = []
+                possible = True
+                for kind, entity in conditions:
+                    if kind == "enter":
+                        possible = number.get(entity, -1) in reached
+                    elif kind == "item" and entity not in granted:
+                        masks.append(item_masks.get(entity, 0))
+                    elif kind == "defeat":
+                        masks.append(npc_masks.get(entity, 0))
+                    if not possible or (masks and not masks[-1]):
+                        break
+                else:
+                    if not masks or any(all(held & mask for mask in masks) for held in progress_masks):
+                        done.add(rule_id)
+                        granted.update(rewards)
+                        progress = True
+        return [rule_id for rule_id in rules if rule_id not in done and not rule_id.startswith("trigger:")]
+
+
+def main(argv: List[str] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Explore every reachable state of a world")
+    parser.add_argument("world", nargs="?", default=None, help="World JSON file (default: built-in world)")
+    parser.add_argument("--workers", type=int, default=1, help="Processes expanding large frontiers")
+    parser.add_argument("--max-states", type=int, default=5_000_000, help="Stop adding states after this many")
+    parser.add_argument("--out", default=None, help="Write the report JSON here")
+    args = parser.parse_args(argv)
+
+    world_data = None
+    if args.world:
+        with open(args.world, 'r', encoding='utf-8') as f:
+            world_data = json.load(f)
+
+    report = WorldExplorer(world_data, args.workers, args.max_states).explore()
+    for line in report.lines():
+        print(line)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(asdict(report), f, ensure_ascii=False, indent=2)
+
+    return 0 if report.ok() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+World Watcher - Hot reload of world files into live sessions
+Diffs edited worlds scene by scene and patches running engines in place
+"""
+
+import json
+import os
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from engine import GameEngine, Scene
+
+SCENE_FIELDS = ("name", "description", "options", "items", "npcs")
+
+
+@dataclass
+class SceneChange:
+    """Authored changes to one scene"""
+    fields: List[str]
+    options_added: List[str] = field(default_factory=list)
+    options_removed: List[str] = field(default_factory=list)
+    options_changed: List[str] = field(default_factory=list)
+
+
+@dataclass
+class WorldDiff:
+    """Scene-level difference between two versions of a world"""
+    added: Dict[str, Dict] = field(default_factory=dict)
+    removed: List[str] = field(default_factory=list)
+    changed: Dict[str, SceneChange] = field(default_factory=dict)
+    start_scene_changed: bool = False
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed or self.start_scene_changed)
+
+
+def _diff_options(change: SceneChange, old: List[Dict], new: List[Dict]):
+    """Fill in option changes, matching options by their text"""
+    old_by_text = {opt["text"]: opt for opt in old}
+    new_by_text = {opt["text"]: opt for opt in new}
+    change.options_added = [text for text in new_by_text if text not in old_by_text]
+    change.options_removed = [text for text in old_by_text if text not in new_by_text]
+    change.options_changed = [text for text, opt in new_by_text.items()
+                              if text in old_by_text and old_by_text[text] != opt]
+
+
+def diff_worlds(old: Dict, new: Dict) -> WorldDiff:
+    """Compute the scene-level diff from one world to another"""
+    old_scenes = old.get("scenes", {})
+    new_scenes = new.get("scenes", {})
+    diff = WorldDiff(start_scene_changed=old.get("start_scene") != new.get("start_scene"))
+
+    for scene_id, data in new_scenes.items():
+        previous = old_scenes.get(scene_id)
+        if previous is None:
+            diff.added[scene_id] = data
+        elif previous != data:
+            fields = [name for name in SCENE_FIELDS if previous.get(name) != data.get(name)]
+            change = SceneChange(fields=fields)
+            if "options" in fields:
+                _diff_options(change, previous.get("options") or [], data.get("options") or [])
+            diff.changed[scene_id] = change
+
+    diff.removed = [scene_id for scene_id in old_scenes if scene_id not in new_scenes]
+    return diff
+
+
+class WorldWatcher:
+    """Serves one world file to many sessions and hot-reloads edits
+
+    Sessions share the watcher's scene table. On a change only the added,
+    removed and edited scenes are rebuilt into a new table, and every live
+    session switches to it at its next action.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.world_data = self._load()
+        self.scenes: Dict[str, Scene] = GameEngine._build_scenes(self.world_data)
+        self.sessions = weakref.WeakSet()
+        self.last_error: Optional[str] = None
+        self._signature = self._stat()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _load(self) -> Dict:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _stat(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def new_session(self, player_name: str = "Hero") -> GameEngine:
+        """Create an engine on the shared world"""
+        engine = GameEngine(player_name=player_name)
+        self.attach(engine)
+        return engine
+
+    def attach(self, engine: GameEngine):
+        """Start an engine on the shared world and keep it patched"""
+        with self._lock:
+            engine.initialize_world(self.world_data, scenes=self.scenes)
+            self.sessions.add(engine)
+
+    def check(self) -> Optional[WorldDiff]:
+        """Reload the file if it changed and return the applied diff"""
+        signature = self._stat()
+        if signature == self._signature:
+            return None
+        self._signature = signature
+
+        # Keep serving the last good version while the file is mid-edit or invalid
+        try:
+            new_world = self._load()
+            diff = diff_worlds(self.world_data, new_world)
+            if not diff.is_empty():
+                self.apply(new_world, diff)
+        except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            return None
+        self.last_error = None
+        return diff
+
+    def apply(self, new_world: Dict, diff: WorldDiff):
+        """Publish an edited world as a new scene table and hand it to live sessions
+
+        Every new scene is built before anything changes, so an invalid
+        world raises without touching the current one. The shared table is
+        never mutated: sessions switch to the new one from their own thread
+        at their next action (see GameEngine.queue_world_patch).
+        """
+        new_scenes = new_world["scenes"]
+        rebuilt = {scene_id: Scene(**new_scenes[scene_id]) for scene_id in list(diff.added) + list(diff.changed)}
+        changed = {scene_id: change.fields for scene_id, change in diff.changed.items()}
+
+        with self._lock:
+            old_base = self.scenes
+            base = dict(old_base)
+            base.update(rebuilt)
+            for scene_id in diff.removed:
+                base.pop(scene_id, None)
+            self.scenes = base
+            self.world_data = new_world
+
+            for engine in list(self.sessions):
+                if engine.world_base() is not old_base:
+                    # The session restarted or loaded another world
+                    self.sessions.discard(engine)
+                    continue
+                engine.queue_world_patch(new_world, old_base, base, changed, diff.removed)
+
+    def start(self, interval: float = 1.0):
+        """Poll the file from a background thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def poll():
+            while not self._stop.wait(interval):
+                self.check()
+
+        self._thread = threading.Thread(target=poll, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,56 @@
+"""
+Tests for headless batch mode
+"""
+
+import json
+
+from batch import read_sessions, run_batch
+
+WORLD = {
+    "name": "小世界",
+    "start_scene": "hall",
+    "scenes": {
+        "hall": {
+            "id": "hall", "name": "大厅", "description": "",
+            "options": [
+                {"text": "去花园", "action": "move", "target": "garden"},
+                {"text": "重新开始", "action": "restart"}
+            ]
+        },
+        "garden": {
+            "id": "garden", "name": "花园", "description": "",
+            "options": [{"text": "回大厅", "action": "move", "target": "hall"}]
+        }
+    }
+}
+
+
+def _sessions(world_path: str, count: int):
+    return [{"id": f"s{i}", "world": world_path, "commands": ["重新开始", "去花园", "回大厅"]}
+            for i in range(count)]
+
+
+def test_restart_with_packed_world_matches_single_process(tmp_path):
+    world_path = tmp_path / "world.json"
+    world_path.write_text(json.dumps(WORLD, ensure_ascii=False), encoding="utf-8")
+
+    serial = list(run_batch(_sessions(str(world_path), 3), workers=1))
+    parallel = list(run_batch(_sessions(str(world_path), 3), workers=2))
+
+    for result in parallel:
+        assert result["ok"]
+        assert result["status"]["current_scene"] == "hall"
+        assert [step["scene"] for step in result["transcript"]] == ["hall", "garden", "hall"]
+    assert [result["status"] for result in parallel] == [result["status"] for result in serial]
+
+
+def test_malformed_lines_are_reported_and_skipped(tmp_path):
+    path = tmp_path / "sessions.jsonl"
+    path.write_text('{"id": "a", "commands": ["1"]}\n{bad\n[1, 2]\n{"commands": ["2"]}\n', encoding="utf-8")
+
+    results = list(run_batch(read_sessions([str(path)]), workers=1, transcript=False))
+
+    assert [result["ok"] for result in results] == [True, False, False, True]
+    assert results[1]["id"] == f"{path}:2"
+    assert results[2]["error"].startswith("TypeError")
+    assert results[3]["executed"] == 1
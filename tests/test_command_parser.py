@@ -0,0 +1,50 @@
+"""
+Tests for natural-language option matching in the built-in world
+"""
+
+import pytest
+
+from command_parser import CommandParser
+from engine import GameEngine
+
+
+@pytest.fixture
+def scenes():
+    engine = GameEngine()
+    engine.initialize_world()
+    return engine.scenes
+
+
+def _parsed(scenes, scene_id: str, text: str):
+    match = CommandParser().parse(scenes[scene_id], text)
+    return match.option["text"] if match else None
+
+
+@pytest.mark.parametrize("scene_id, text, expected", [
+    ("forest_entrance", "找", "检查周围环境"),
+    ("forest_entrance", "检查", "检查周围环境"),
+    ("forest_entrance", "背包", "查看背包"),
+    ("forest_entrance", "去森林", "走进森林深处"),
+    ("path", "回去", "返回森林入口"),
+    ("deep_forest", "打", "拔出武器"),
+    ("deep_forest", "逃", "转身逃跑"),
+])
+def test_resolves(scenes, scene_id, text, expected):
+    assert _parsed(scenes, scene_id, text) == expected
+
+
+@pytest.mark.parametrize("scene_id, text", [
+    # Both exits are moves, so a bare verb names neither
+    ("forest_entrance", "回去"),
+    ("forest_entrance", "走"),
+    ("path", "走"),
+    ("forest_entrance", "不存在的选项"),
+])
+def test_ambiguous_or_unknown_input_resolves_to_nothing(scenes, scene_id, text):
+    assert _parsed(scenes, scene_id, text) is None
+
+
+def test_verbs_in_option_text_do_not_override_its_action(scenes):
+    # "查看背包" contains 查看 (search) but is an inventory action
+    matches = CommandParser().rank(scenes["forest_entrance"], "搜索")
+    assert [match.option["action"] for match in matches] == ["search"]
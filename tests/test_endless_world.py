@@ -0,0 +1,58 @@
+"""
+Tests for the endless generated world
+"""
+
+import os
+import threading
+
+from endless_world import EndlessWorld
+
+
+def _walk_east(engine, steps: int):
+    for _ in range(steps):
+        engine.process_action("检查周围环境")
+        engine.process_action("向东走")
+
+
+def test_close_removes_spill_files(tmp_path):
+    world = EndlessWorld(seed=1, chunk_size=2, cache_chunks=2, spill_dir=str(tmp_path))
+    engine = world.new_session("Tester", max_delta=2)
+    _walk_east(engine, 20)
+    session_dir = tmp_path / engine.session_scenes.session_id
+    assert world.stats["spilled"] > 0 and os.listdir(session_dir)
+
+    engine.close()
+
+    assert not session_dir.exists()
+
+
+def test_restart_removes_the_old_sessions_spill_files(tmp_path):
+    world = EndlessWorld(seed=1, chunk_size=2, cache_chunks=2, spill_dir=str(tmp_path))
+    engine = world.new_session("Tester", max_delta=2)
+    _walk_east(engine, 20)
+    old_dir = tmp_path / engine.session_scenes.session_id
+
+    engine._restart()
+
+    assert not old_dir.exists()
+    assert engine.current_scene.id == "0,0"
+
+
+def test_sessions_share_a_world_across_threads():
+    world = EndlessWorld(seed=2, chunk_size=2, cache_chunks=3)
+    errors = []
+
+    def play(index: int):
+        try:
+            _walk_east(world.new_session(f"bot{index}", max_delta=4), 60)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=play, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert world.cache_stats()["cached_chunks"] <= 3
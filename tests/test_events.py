@@ -0,0 +1,23 @@
+"""
+Tests for the event bus
+"""
+
+import pytest
+
+from events import ASYNC, BATCHED, SYNC, EventBus, StateChanged
+
+
+@pytest.mark.parametrize("mode", [SYNC, BATCHED, ASYNC])
+def test_publish_after_close_reaches_no_one(mode):
+    bus = EventBus()
+    received = []
+    bus.subscribe(StateChanged, received.append, mode=mode)
+    bus.publish(StateChanged("g1", "start", "playing"))
+    bus.close()
+    delivered = len(received)
+
+    bus.publish(StateChanged("g1", "playing", "game_over"))
+    bus.flush()
+
+    assert delivered == 1
+    assert len(received) == 1
@@ -0,0 +1,30 @@
+"""
+Tests for session recording and replay
+"""
+
+import pytest
+
+from replay import RECORDING_VERSION, record_ai_session, replay, start_engine
+
+
+def _recording() -> dict:
+    return record_ai_session(seed=7, max_turns=10).to_dict()
+
+
+def test_replay_reproduces_the_recording():
+    result = replay(_recording())
+
+    assert result.ok, result.error
+
+
+@pytest.mark.parametrize("version", [None, RECORDING_VERSION - 1, RECORDING_VERSION + 1])
+def test_other_recording_versions_are_rejected(version):
+    recording = _recording()
+    recording["version"] = version
+
+    result = replay(recording)
+
+    assert not result.ok
+    assert result.error == f"unsupported recording version {version}"
+    with pytest.raises(ValueError, match="Unsupported recording version"):
+        start_engine(recording, {})
@@ -0,0 +1,49 @@
+"""
+Tests for session hibernation
+"""
+
+import pytest
+
+from engine import GameEngine
+from save_store import SaveStore
+from session_memory import SessionHost
+
+
+def _engine() -> GameEngine:
+    engine = GameEngine(player_name="Tester")
+    engine.initialize_world()
+    return engine
+
+
+def test_wake_after_restart(tmp_path):
+    host = SessionHost(store=SaveStore(str(tmp_path)))
+    engine = _engine()
+    game_id = host.add(engine)
+    engine._restart()
+    assert engine.game_id != game_id
+    engine.process_action("检查周围环境")
+
+    host.hibernate(game_id)
+    woken = host.get(game_id)
+
+    assert woken.player.inventory == ["地图"]
+    assert game_id in host
+    assert host.report()["hibernated"] == 0
+
+
+def test_failed_wake_keeps_the_session(tmp_path, monkeypatch):
+    store = SaveStore(str(tmp_path))
+    host = SessionHost(store=store)
+    game_id = host.add(_engine())
+    host.hibernate(game_id)
+
+    def fail(*args, **kwargs):
+        raise OSError("disk")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(store, "load", fail)
+        with pytest.raises(OSError):
+            host.get(game_id)
+
+    assert game_id in host
+    assert host.get(game_id).player.name == "Tester"
@@ -0,0 +1,28 @@
+"""
+Tests for the SQLite session store
+"""
+
+import pytest
+
+from sqlite_store import SQLiteStore
+
+
+def test_failed_batch_does_not_stop_the_writer(tmp_path):
+    store = SQLiteStore(str(tmp_path / "game.db"))
+    # Too large for an SQLite integer: OverflowError, not sqlite3.Error
+    store.record_action("g1", "start", "look", success=2 ** 70)
+    assert store.flush(timeout=5)
+    store.record_action("g1", "start", "look")
+
+    assert store.flush(timeout=5)
+    assert isinstance(store.errors[0], OverflowError)
+    assert [record["action"] for record in store.history("g1")] == ["look"]
+    store.close()
+
+
+def test_flush_after_close_raises(tmp_path):
+    store = SQLiteStore(str(tmp_path / "game.db"))
+    store.close()
+
+    with pytest.raises(RuntimeError):
+        store.flush()
@@ -0,0 +1,21 @@
+"""
+Tests for the world clock
+"""
+
+from engine import GameEngine
+from world_clock import WorldClock
+
+
+def test_fired_timers_leave_the_session():
+    engine = GameEngine(player_name="Tester")
+    engine.initialize_world()
+    clock = WorldClock()
+    clock.attach(engine)
+    engine.process_action("检查周围环境")
+    session = clock._attached[id(engine)]
+    assert len(session.timers) == 1
+
+    clock.advance(clock.respawn_minutes)
+
+    assert not session.timers
+    assert "地图" in engine.current_scene.items